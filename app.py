@@ -1,115 +1,562 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal
+from datetime import datetime
 import uvicorn
+import json
+from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+from src.infra.Metrics import Metrics, PROMETHEUS_MEDIA_TYPE
+from src.infra.TimingMiddleware import TimingMiddleware
+from src.infra.ReadSessionMiddleware import ReadSessionMiddleware
+from src.infra.TableVersions import TableVersions, build_validators, is_not_modified
+from src.infra.ChangeFeed import ChangeFeed, ENTITIES
+from src.infra.Migrations import Migrations
+from src.infra.Columnar import ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE, to_arrow_ipc, to_parquet
 from src.controllers.AssetController import AssetController
 from src.controllers.IndicatorController import IndicatorController
 from src.controllers.CategoryController import CategoryController
+from src.controllers.DecisionController import DecisionController
+from src.controllers.IndicatorHistoryController import IndicatorHistoryController
+from src.controllers.CategoryStatsController import CategoryStatsController
+from src.controllers.BatchController import BatchController
+from src.controllers.FileExporter import FileExporter, EXPORT_FORMATS
+from src.controllers.Downsampling import METHODS as DOWNSAMPLING_METHODS
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(Migrations().migrate_on_startup)
+    await Connection.open_async_pool()
+    await changeFeed.start()
+    yield
+    await changeFeed.stop()
+    await Connection.close_async_pool()
+    Connection.close_pool()
+
+app = FastAPI(lifespan=lifespan)
+# Upper bound on the IDs a batch route accepts, which also keeps its URL within common proxy limits.
+MAX_BATCH_IDS = 1000
+if Metrics.shared().enabled:
+    app.add_middleware(TimingMiddleware)
+# Only needed when reads can go to a replica.
+if Connection().get_replica_conninfos():
+    app.add_middleware(ReadSessionMiddleware, sticky_seconds=Connection().get_routing_settings()["sticky_seconds"])
 
 # Controllers
 assetController = AssetController()
 indicatorController = IndicatorController()
 categoryController = CategoryController()
+decisionController = DecisionController()
+indicatorHistoryController = IndicatorHistoryController()
+categoryStatsController = CategoryStatsController()
+batchController = BatchController()
+fileExporter = FileExporter()
+tableVersions = TableVersions()
+changeFeed = ChangeFeed.shared()
+
+# Tables whose write counters validate each group of routes.
+ASSET_TABLES = ("assets",)
+CATEGORY_TABLES = ("categories",)
+INDICATOR_TABLES = ("indicators",)
+DECISION_TABLES = ("assets", "categories", "indicators")
+HISTORY_TABLES = ("indicator_history",)
+ASSET_HISTORY_TABLES = ("indicators", "indicator_history")
+CATEGORY_STATS_TABLES = ("category_indicator_stats",)
+PEER_TABLES = ("assets", "indicators", "category_indicator_stats")
+
+class RankingCriterion(BaseModel):
+    indicator: str
+    weight: float = Field(1.0, ge=0, allow_inf_nan=False)
+    direction: Literal["max", "min"] = "max"
+
+class RankingRequest(BaseModel):
+    criteria: list[RankingCriterion] = Field(min_length=1)
+    method: Literal["weighted_sum", "topsis"] = "topsis"
+    k: int = Field(10, ge=1, le=10000)
+    category_ids: list[int] | None = None
+    asset_types: list[str] | None = None
+
+    @model_validator(mode="after")
+    def check_weights(self):
+        # All-zero weights cannot be normalized; rejected here (422) rather than ranked as nothing.
+        if sum(criterion.weight for criterion in self.criteria) <= 0:
+            raise ValueError("At least one criterion must have a positive weight")
+        return self
+
+class BatchRef(BaseModel):
+    # The ID produced or targeted by an earlier operation of the same batch.
+    ref: int = Field(ge=0)
+
+class BatchOperation(BaseModel):
+    op: Literal["insert", "update", "delete"]
+    entity: Literal[ENTITIES]
+    id: int | BatchRef | None = None
+    values: dict[str, BatchRef | int | float | str | None] = {}
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(min_length=1, max_length=10000)
+
+class HistoryPointIn(BaseModel):
+    recorded_at: datetime
+    value: float
+
+class HistoryAppendRequest(BaseModel):
+    points: list[HistoryPointIn] = Field(min_length=1, max_length=100000)
+
+def ndjson_response(items, batch_size=500):
+    # Rows are encoded in small batches so memory stays flat regardless of the table size.
+    # Models are slotted dataclasses, so their fields are read from __slots__ rather than __dict__.
+    async def lines():
+        batch = []
+        async for item in items:
+            batch.append(json.dumps({field: getattr(item, field) for field in item.__slots__}, default=float))
+            if len(batch) >= batch_size:
+                yield "\n".join(batch) + "\n"
+                batch = []
+        if batch:
+            yield "\n".join(batch) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def sse_response(events):
+    # Server-Sent Events: each change goes out as it is committed. A comment line during quiet
+    # periods keeps proxies from closing the connection and lets clients detect a dead one.
+    async def lines():
+        yield "retry: 3000\n\n"
+        async for event in events:
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            event_id, change = event
+            name = "resync" if change["op"] == "resync" else "change"
+            yield f"id: {changeFeed.format_event_id(event_id)}\nevent: {name}\ndata: {json.dumps(change)}\n\n"
+    return StreamingResponse(lines(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def encode_json(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "__slots__"):
+        return {field: getattr(value, field) for field in value.__slots__}
+    return float(value)
+
+def json_response(items, headers=None):
+    # Encodes slotted models directly, which is several times faster than FastAPI's generic
+    # encoder on long lists such as chart points.
+    return Response(json.dumps(items, default=encode_json), media_type="application/json", headers=headers)
+
+def columnar_format(request: Request):
+    accept = request.headers.get("accept", "")
+    if ARROW_MEDIA_TYPE in accept:
+        return "arrow"
+    if PARQUET_MEDIA_TYPE in accept:
+        return "parquet"
+    return None
+
+async def table_response(table, format, headers=None):
+    if format == "parquet":
+        return Response(await run_in_threadpool(to_parquet, table), media_type=PARQUET_MEDIA_TYPE, headers=headers)
+    return Response(await run_in_threadpool(to_arrow_ipc, table), media_type=ARROW_MEDIA_TYPE, headers=headers)
+
+async def not_modified(request: Request, response: Response, tables, format=None):
+    # Reads the tables' write counters (one primary-key lookup) and answers 304 when the client's
+    # copy is current, so the route's own query never runs. Otherwise the validators go on the response.
+    # `format` is the columnar format the route will actually send (None for JSON); routes that only
+    # send JSON leave it out, whatever the Accept header asks for.
+    versions = await tableVersions.get_versions_async(tables)
+    if not versions:
+        return None
+    Cache.shared().observe_versions(versions)
+    validators = build_validators(versions, format or "json")
+    if is_not_modified(request.headers, validators):
+        return Response(status_code=304, headers=validators)
+    response.headers.update(validators)
+    return None
+
+def bulk_format(request: Request, format: str | None):
+    if format:
+        return format
+    return "csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson"
 
 # ---------------------------
 # Routes for AssetController
 # ---------------------------
 @app.get("/assets/new")
-def create_asset(name: str, type: str, category_id: str):
-    assetController.insert_asset(name, type, category_id)
+async def create_asset(name: str, type: str, category_id: str):
+    await assetController.insert_asset_async(name, type, category_id)
     return {"message": f"Asset '{name}' created successfully"}
 
 @app.get("/assets")
-def get_assets():
-    return assetController.get_assets()
+async def get_assets(request: Request, response: Response, limit: int = Query(None, ge=1, le=10000), after_id: int = None, stream: bool = False):
+    if stream:
+        return ndjson_response(assetController.iter_assets_async(after_id))
+    # Pages are always JSON, so only a full list is served (and validated) as Arrow or Parquet.
+    format = None if limit else columnar_format(request)
+    unchanged = await not_modified(request, response, ASSET_TABLES, format)
+    if unchanged:
+        return unchanged
+    if limit:
+        return await assetController.get_assets_page_async(limit, after_id)
+    if format:
+        return await table_response(await assetController.get_assets_table_async(), format, response.headers)
+    return await assetController.get_assets_async()
+
+@app.post("/assets/bulk")
+async def bulk_insert_assets(request: Request, format: str = Query(None, pattern="^(ndjson|csv)$"), batch_size: int = Query(5000, ge=1, le=100000)):
+    return await assetController.bulk_insert_assets_async(request.stream(), bulk_format(request, format), batch_size)
+
+@app.get("/assets/search")
+async def search_assets(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100)):
+    return await assetController.search_assets_async(q, limit)
+
+@app.get("/assets/typeahead")
+async def typeahead_assets(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=25)):
+    return await assetController.typeahead_assets_async(q, limit)
+
+@app.get("/assets/batch")
+async def get_assets_by_ids(request: Request, response: Response, asset_ids: list[int] = Query(..., max_length=MAX_BATCH_IDS)):
+    unchanged = await not_modified(request, response, ASSET_TABLES)
+    if unchanged:
+        return unchanged
+    return await assetController.get_assets_by_ids_async(asset_ids)
 
 @app.get("/assets/{asset_id}")
-def get_asset(asset_id: int):
-    asset = assetController.get_asset_by_id(asset_id)
+async def get_asset(request: Request, response: Response, asset_id: int):
+    unchanged = await not_modified(request, response, ASSET_TABLES)
+    if unchanged:
+        return unchanged
+    asset = await assetController.get_asset_by_id_async(asset_id)
     return asset if asset else {"error": f"Asset with ID {asset_id} not found"}
 
+@app.get("/assets/{asset_id}/history")
+async def get_asset_history(
+    request: Request,
+    response: Response,
+    asset_id: int,
+    names: list[str] = Query(None),
+    start: datetime = None,
+    end: datetime = None,
+    points: int = Query(500, ge=3, le=10000),
+    method: Literal[DOWNSAMPLING_METHODS] = "lttb",
+):
+    format = columnar_format(request)
+    unchanged = await not_modified(request, response, ASSET_HISTORY_TABLES, format)
+    if unchanged:
+        return unchanged
+    if format:
+        table = await indicatorHistoryController.get_asset_history_table_async(asset_id, names, start, end, points, method)
+        return await table_response(table, format, response.headers)
+    return json_response(await indicatorHistoryController.get_asset_history_async(asset_id, names, start, end, points, method), response.headers)
+
+@app.get("/assets/{asset_id}/peers")
+async def get_asset_peers(request: Request, response: Response, asset_id: int):
+    unchanged = await not_modified(request, response, PEER_TABLES)
+    if unchanged:
+        return unchanged
+    return await categoryStatsController.get_peer_comparison_async(asset_id)
+
 @app.get("/assets/{asset_id}/update")
-def update_asset(asset_id: int, name: str = None, type: str = None, category_id: str = None):
-    assetController.update_asset(asset_id, name, type, category_id)
+async def update_asset(asset_id: int, name: str = None, type: str = None, category_id: str = None):
+    await assetController.update_asset_async(asset_id, name, type, category_id)
     return {"message": f"Asset ID {asset_id} updated successfully"}
 
 @app.get("/assets/{asset_id}/delete")
-def delete_asset(asset_id: int):
-    assetController.delete_asset(asset_id)
+async def delete_asset(asset_id: int):
+    await assetController.delete_asset_async(asset_id)
     return {"message": f"Asset ID {asset_id} deleted successfully"}
 
 @app.get("/assets/category_id/{category_id}")
-def get_assets_by_category(category_id: id):
-    return assetController.get_assets_by_category(category_id)
+async def get_assets_by_category(request: Request, response: Response, category_id: int):
+    unchanged = await not_modified(request, response, ASSET_TABLES)
+    if unchanged:
+        return unchanged
+    return await assetController.get_assets_by_category_async(category_id)
 
 @app.get("/assets/type/{type}")
-def get_assets_by_type(type: str):
-    return assetController.get_assets_by_type(type)
+async def get_assets_by_type(request: Request, response: Response, type: str):
+    unchanged = await not_modified(request, response, ASSET_TABLES)
+    if unchanged:
+        return unchanged
+    return await assetController.get_assets_by_type_async(type)
 
 @app.get("/assets/name/{name}")
-def get_assets_by_name(name: str):
-    return assetController.get_assets_by_name(name)
+async def get_assets_by_name(name: str, limit: int = Query(100, ge=1, le=1000)):
+    return await assetController.get_assets_by_name_async(name, limit)
 
 @app.get("/indicators/new")
-def create_indicator(name: str, value: float, asset_id: int):
-    indicatorController.insert_indicator(name, value, asset_id)
+async def create_indicator(name: str, value: float, asset_id: int):
+    await indicatorController.insert_indicator_async(name, value, asset_id)
     return {"message": f"Indicator '{name}' created successfully"}
 
 @app.get("/indicators")
-def get_indicators():
-    return indicatorController.get_indicators()
+async def get_indicators(request: Request, response: Response, limit: int = Query(None, ge=1, le=10000), after_id: int = None, stream: bool = False):
+    if stream:
+        return ndjson_response(indicatorController.iter_indicators_async(after_id))
+    # Pages are always JSON, so only a full list is served (and validated) as Arrow or Parquet.
+    format = None if limit else columnar_format(request)
+    unchanged = await not_modified(request, response, INDICATOR_TABLES, format)
+    if unchanged:
+        return unchanged
+    if limit:
+        return await indicatorController.get_indicators_page_async(limit, after_id)
+    if format:
+        return await table_response(await indicatorController.get_indicators_table_async(), format, response.headers)
+    return await indicatorController.get_indicators_async()
+
+@app.post("/indicators/bulk")
+async def bulk_insert_indicators(request: Request, format: str = Query(None, pattern="^(ndjson|csv)$"), batch_size: int = Query(5000, ge=1, le=100000)):
+    return await indicatorController.bulk_insert_indicators_async(request.stream(), bulk_format(request, format), batch_size)
+
+@app.get("/indicators/search")
+async def search_indicators(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100)):
+    return await indicatorController.search_indicators_async(q, limit)
+
+@app.get("/indicators/typeahead")
+async def typeahead_indicator_names(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=25)):
+    return await indicatorController.typeahead_indicator_names_async(q, limit)
+
+@app.get("/indicators/value")
+async def get_indicators_by_value(name: str, min_value: float = None, max_value: float = None, limit: int = Query(1000, ge=1, le=10000)):
+    return await indicatorController.get_indicators_by_value_async(name, min_value, max_value, limit)
+
+@app.get("/indicators/distribution")
+async def get_indicator_distribution(name: str, bins: int = Query(20, ge=1, le=200), min_value: float = None, max_value: float = None):
+    return await indicatorController.get_value_distribution_async(name, bins, min_value, max_value)
+
+@app.get("/indicators/batch")
+async def get_indicators_by_assets(request: Request, response: Response, asset_ids: list[int] = Query(..., max_length=MAX_BATCH_IDS)):
+    unchanged = await not_modified(request, response, INDICATOR_TABLES)
+    if unchanged:
+        return unchanged
+    return await indicatorController.get_indicators_by_assets_async(asset_ids)
 
 @app.get("/indicators/{indicator_id}")
-def get_indicator(indicator_id: int):
-    indicator = indicatorController.get_indicator_by_id(indicator_id)
+async def get_indicator(request: Request, response: Response, indicator_id: int):
+    unchanged = await not_modified(request, response, INDICATOR_TABLES)
+    if unchanged:
+        return unchanged
+    indicator = await indicatorController.get_indicator_by_id_async(indicator_id)
     return indicator if indicator else {"error": f"Indicator with ID {indicator_id} not found"}
 
+@app.get("/indicators/{indicator_id}/history")
+async def get_indicator_history(
+    request: Request,
+    response: Response,
+    indicator_id: int,
+    start: datetime = None,
+    end: datetime = None,
+    points: int = Query(500, ge=3, le=10000),
+    method: Literal[DOWNSAMPLING_METHODS] = "lttb",
+):
+    # At most `points` points of the range, so a chart over years of data stays small.
+    format = columnar_format(request)
+    unchanged = await not_modified(request, response, HISTORY_TABLES, format)
+    if unchanged:
+        return unchanged
+    if format:
+        table = await indicatorHistoryController.get_history_table_async([indicator_id], start, end, points, method)
+        return await table_response(table.select(["recorded_at", "value"]), format, response.headers)
+    return json_response(await indicatorHistoryController.get_indicator_history_async(indicator_id, start, end, points, method), response.headers)
+
+@app.post("/indicators/{indicator_id}/history")
+async def append_indicator_history(indicator_id: int, request: HistoryAppendRequest):
+    # Backfills past values; the indicator's current value only changes through update.
+    points = [(point.recorded_at, point.value) for point in request.points]
+    return {"appended": await indicatorHistoryController.append_history_async(indicator_id, points)}
+
 @app.get("/indicators/{indicator_id}/update")
-def update_indicator(indicator_id: int, name: str = None, value: float = None, asset_id: int = None):
-    indicatorController.update_indicator(indicator_id, name, value, asset_id)
+async def update_indicator(indicator_id: int, name: str = None, value: float = None, asset_id: int = None):
+    await indicatorController.update_indicator_async(indicator_id, name, value, asset_id)
     return {"message": f"Indicator ID {indicator_id} updated successfully"}
 
 @app.get("/indicators/{indicator_id}/delete")
-def delete_indicator(indicator_id: int):
-    indicatorController.delete_indicator(indicator_id)
+async def delete_indicator(indicator_id: int):
+    await indicatorController.delete_indicator_async(indicator_id)
     return {"message": f"Indicator ID {indicator_id} deleted successfully"}
 
 @app.get("/indicators/asset/{asset_id}")
-def get_indicators_by_asset(asset_id: int):
-    return indicatorController.get_indicators_by_asset(asset_id)
+async def get_indicators_by_asset(request: Request, response: Response, asset_id: int):
+    unchanged = await not_modified(request, response, INDICATOR_TABLES)
+    if unchanged:
+        return unchanged
+    return await indicatorController.get_indicators_by_asset_async(asset_id)
 
 @app.get("/indicators/name/{name}")
-def get_indicators_by_name(name: str):
-    return indicatorController.get_indicators_by_name(name)
-
-@app.get("/indicators/value")
-def get_indicators_by_value(min_value: float, max_value: float):
-    return indicatorController.get_indicators_by_value(min_value, max_value)
+async def get_indicators_by_name(name: str, limit: int = Query(100, ge=1, le=1000)):
+    return await indicatorController.get_indicators_by_name_async(name, limit)
 
 @app.get("/categories")
-def get_categories():
-    return categoryController.get_categories()
+async def get_categories(request: Request, response: Response):
+    format = columnar_format(request)
+    unchanged = await not_modified(request, response, CATEGORY_TABLES, format)
+    if unchanged:
+        return unchanged
+    if format:
+        return await table_response(await categoryController.get_categories_table_async(), format, response.headers)
+    return await categoryController.get_categories_async()
 
 @app.get("/categories/new")
-def create_category(name: str, description: str):
-    categoryController.insert_category(name, description)
+async def create_category(name: str, description: str):
+    await categoryController.insert_category_async(name, description)
     return {"message": f"Category '{name}' created successfully"}
 
 @app.get("/categories/{category_id}")
-def get_category(category_id: int):
-    category = categoryController.get_category_by_id(category_id)
+async def get_category(request: Request, response: Response, category_id: int):
+    unchanged = await not_modified(request, response, CATEGORY_TABLES)
+    if unchanged:
+        return unchanged
+    category = await categoryController.get_category_by_id_async(category_id)
     return category if category else {"error": f"Category with ID {category_id} not found"}
 
+@app.get("/categories/{category_id}/indicator-stats")
+async def get_category_indicator_stats(request: Request, response: Response, category_id: int, names: list[str] = Query(None)):
+    unchanged = await not_modified(request, response, CATEGORY_STATS_TABLES)
+    if unchanged:
+        return unchanged
+    return await categoryStatsController.get_category_stats_async(category_id, names)
+
 @app.get("/categories/{category_id}/update")
-def update_category(category_id: int, name: str = None):
-    categoryController.update_category(category_id, name)
+async def update_category(category_id: int, name: str = None):
+    await categoryController.update_category_async(category_id, name)
     return {"message": f"Category ID {category_id} updated successfully"}
 
 @app.get("/categories/{category_id}/delete")
-def delete_category(category_id: int):
-    categoryController.delete_category(category_id)
+async def delete_category(category_id: int):
+    await categoryController.delete_category_async(category_id)
     return {"message": f"Category ID {category_id} deleted successfully"}
 
+# ---------------------------
+# Routes for DecisionController
+# ---------------------------
+@app.get("/decision/view")
+async def get_decision_view(
+    request: Request,
+    response: Response,
+    asset_ids: list[int] = Query(None),
+    category_ids: list[int] = Query(None),
+    indicator_names: list[str] = Query(None),
+    limit: int = Query(10000, ge=1, le=100000)
+):
+    # Unfiltered, the view would be every indicator of every asset cut at `limit` rows.
+    if not (asset_ids or category_ids or indicator_names):
+        response.status_code = 422
+        return {"detail": "Pass at least one of asset_ids, category_ids or indicator_names"}
+    format = columnar_format(request)
+    unchanged = await not_modified(request, response, DECISION_TABLES, format)
+    if unchanged:
+        return unchanged
+    # One row past the limit tells whether the result was cut, which X-Truncated reports.
+    if format:
+        table = await decisionController.get_decision_view_table_async(asset_ids, category_ids, indicator_names, limit + 1)
+        if table.num_rows > limit:
+            table = table.slice(0, limit)
+            response.headers["X-Truncated"] = "true"
+        return await table_response(table, format, response.headers)
+    rows = await decisionController.get_decision_view_async(asset_ids, category_ids, indicator_names, limit + 1)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Truncated"] = "true"
+    return rows
+
+@app.get("/decision/matrix")
+async def get_decision_matrix(
+    request: Request,
+    response: Response,
+    category_ids: list[int] = Query(None),
+    asset_types: list[str] = Query(None),
+    asset_ids: list[int] = Query(None),
+    indicator_names: list[str] = Query(None)
+):
+    format = columnar_format(request)
+    unchanged = await not_modified(request, response, DECISION_TABLES, format)
+    if unchanged:
+        return unchanged
+    matrix = await decisionController.get_matrix_async(category_ids, asset_types, asset_ids, indicator_names)
+    # Large matrices hold millions of cells, so they are encoded off the event loop.
+    if format:
+        return await table_response(await run_in_threadpool(matrix.to_table), format, response.headers)
+    return StreamingResponse(iterate_in_threadpool(matrix.iter_json()), media_type="application/json", headers=response.headers)
+
+@app.post("/decision/rank")
+async def rank_assets(request: RankingRequest, response: Response):
+    criteria = [criterion.model_dump() for criterion in request.criteria]
+    result = await decisionController.rank_assets_async(criteria, request.method, request.k, request.category_ids, request.asset_types)
+    if "unknown_indicators" in result:
+        response.status_code = 422
+    return result
+
+@app.get("/decision/indicator-names")
+async def get_indicator_names(request: Request, response: Response):
+    unchanged = await not_modified(request, response, INDICATOR_TABLES)
+    if unchanged:
+        return unchanged
+    return await decisionController.get_indicator_names_async()
+
+# ---------------------------
+# Atomic batches
+# ---------------------------
+@app.post("/batch")
+async def apply_batch(request: BatchRequest, response: Response):
+    # All operations commit together or not at all: 422 names the first invalid operation,
+    # 409 reports the database error that rolled the batch back.
+    result = await batchController.apply_batch_async([operation.model_dump() for operation in request.operations])
+    if not result["committed"]:
+        response.status_code = 422 if "operation" in result else 409
+    return result
+
+# ---------------------------
+# Dataset export
+# ---------------------------
+@app.get("/export")
+async def export_dataset(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    asset_ids: list[int] = Query(None),
+    category_ids: list[int] = Query(None),
+    asset_types: list[str] = Query(None),
+    indicator_names: list[str] = Query(None),
+    min_value: float = None,
+    max_value: float = None
+):
+    filters = {"asset_ids": asset_ids, "category_ids": category_ids, "asset_types": asset_types, "indicator_names": indicator_names, "min_value": min_value, "max_value": max_value}
+    blocks = fileExporter.iter_export(format, filters)
+    # The first block is read before the response starts, so an export that cannot run at all
+    # answers 503 instead of an empty 200. A failure later on aborts the response mid-stream.
+    try:
+        first = await run_in_threadpool(next, blocks, b"")
+    except Exception:
+        return Response(status_code=503)
+
+    async def body():
+        try:
+            yield first
+            async for block in iterate_in_threadpool(blocks):
+                yield block
+        finally:
+            # A client that disconnects early cancels the query and frees the connection.
+            await run_in_threadpool(blocks.close)
+    headers = {"Content-Disposition": f'attachment; filename="export.{format}"'}
+    return StreamingResponse(body(), media_type=EXPORT_FORMATS[format], headers=headers)
+
+# ---------------------------
+# Change notifications
+# ---------------------------
+@app.get("/changes")
+async def stream_changes(request: Request, entities: list[Literal[ENTITIES]] = Query(None)):
+    if not changeFeed.enabled:
+        return Response(status_code=503)
+    # EventSource sends Last-Event-ID when it reconnects, so missed changes are replayed.
+    return sse_response(changeFeed.events(entities, request.headers.get("last-event-id")))
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return Cache.shared().stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    text = Metrics.shared().render(Connection.get_pool_stats(), Cache.shared().stats())
+    return Response(text, media_type=PROMETHEUS_MEDIA_TYPE)
+
 # ---------------------------
 # Main server entry point
 # ---------------------------
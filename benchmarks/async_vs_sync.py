@@ -0,0 +1,76 @@
+# Compares the async routes in app.py with the same reads served by sync (threadpool) routes.
+# Usage: python -m benchmarks.async_vs_sync --requests 5000 --concurrency 200
+from contextlib import asynccontextmanager
+import argparse
+import json
+
+from fastapi import FastAPI
+import httpx
+
+from benchmarks.common import run_server, run_load
+from src.controllers.AssetController import AssetController
+from src.controllers.IndicatorController import IndicatorController
+from src.controllers.CategoryController import CategoryController
+from src.infra.Connection import Connection
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    Connection.close_pool()
+
+sync_app = FastAPI(lifespan=lifespan)
+
+assetController = AssetController()
+indicatorController = IndicatorController()
+categoryController = CategoryController()
+
+@sync_app.get("/assets")
+def get_assets():
+    return assetController.get_assets()
+
+@sync_app.get("/assets/{asset_id}")
+def get_asset(asset_id: int):
+    asset = assetController.get_asset_by_id(asset_id)
+    return asset if asset else {"error": f"Asset with ID {asset_id} not found"}
+
+@sync_app.get("/indicators/asset/{asset_id}")
+def get_indicators_by_asset(asset_id: int):
+    return indicatorController.get_indicators_by_asset(asset_id)
+
+@sync_app.get("/categories/{category_id}")
+def get_category(category_id: int):
+    category = categoryController.get_category_by_id(category_id)
+    return category if category else {"error": f"Category with ID {category_id} not found"}
+
+def build_paths(base_url, sample):
+    assets = httpx.get(f"{base_url}/assets", timeout=60).json()[:sample]
+    if not assets:
+        raise SystemExit("The database has no assets; seed it before running the benchmark.")
+    paths = []
+    for asset in assets:
+        paths.append(f"/assets/{asset['id']}")
+        paths.append(f"/indicators/asset/{asset['id']}")
+        if asset["category_id"]:
+            paths.append(f"/categories/{asset['category_id']}")
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async API benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--sample", type=int, default=100, help="number of asset IDs to spread the load over")
+    parser.add_argument("--port", type=int, default=8010)
+    args = parser.parse_args()
+
+    results = {}
+    for mode, target in (("sync", "benchmarks.async_vs_sync:sync_app"), ("async", "app:app")):
+        with run_server(target, port=args.port) as base_url:
+            paths = build_paths(base_url, args.sample)
+            run_load(base_url, paths, total=min(200, args.requests), concurrency=10)
+            results[mode] = run_load(base_url, paths, total=args.requests, concurrency=args.concurrency)
+        print(f"{mode:>5}: {results[mode]['rps']:>8} req/s  p50 {results[mode]['p50_ms']} ms  p99 {results[mode]['p99_ms']} ms  errors {results[mode]['errors']}")
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
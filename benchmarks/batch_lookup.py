@@ -0,0 +1,101 @@
+# Compares loading a dashboard of N assets and their indicators one ID at a time (2N requests)
+# with the batch routes (2 requests), over HTTP with the cache disabled so every lookup reaches the database.
+# Seeded rows use type "bench_batch" and are deleted afterwards unless --keep is given.
+# Usage: python -m benchmarks.batch_lookup --assets 200 --rounds 20
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import httpx
+
+from benchmarks.common import run_server, summarize
+from src.infra.Connection import Connection
+
+BENCH_TYPE = "bench_batch"
+
+def seed(assets, indicators_per_asset, rng):
+    conn = Connection().get_connection()
+    with conn, conn.cursor() as cursor:
+        with cursor.copy("COPY assets (name, type) FROM STDIN") as copy:
+            for i in range(assets):
+                copy.write_row((f"bench batch asset {i}", BENCH_TYPE))
+        cursor.execute("SELECT id FROM assets WHERE type = %s ORDER BY id", (BENCH_TYPE,))
+        asset_ids = [row[0] for row in cursor.fetchall()]
+        with cursor.copy("COPY indicators (name, value, asset_id) FROM STDIN") as copy:
+            for asset_id in asset_ids:
+                for j in range(indicators_per_asset):
+                    copy.write_row((f"bench_batch_ind_{j}", round(rng.uniform(0, 100), 2), asset_id))
+        cursor.execute("ANALYZE assets")
+        cursor.execute("ANALYZE indicators")
+    conn.close()
+    return asset_ids
+
+def cleanup():
+    # Indicators go with their assets (ON DELETE CASCADE).
+    conn = Connection().get_connection()
+    with conn:
+        conn.execute("DELETE FROM assets WHERE type = %s", (BENCH_TYPE,))
+    conn.close()
+
+async def one_by_one(client, asset_ids, concurrency):
+    # What a client without batch routes does: one request per asset and per asset's indicators.
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(path):
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    await asyncio.gather(*(fetch(f"/assets/{asset_id}") for asset_id in asset_ids))
+    await asyncio.gather(*(fetch(f"/indicators/asset/{asset_id}") for asset_id in asset_ids))
+
+async def batched(client, asset_ids, concurrency):
+    params = [("asset_ids", asset_id) for asset_id in asset_ids]
+    (await client.get("/assets/batch", params=params)).raise_for_status()
+    (await client.get("/indicators/batch", params=params)).raise_for_status()
+
+async def measure(base_url, load, asset_ids, rounds, concurrency):
+    latencies = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        await load(client, asset_ids, concurrency)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            round_start = time.perf_counter()
+            await load(client, asset_ids, concurrency)
+            latencies.append(time.perf_counter() - round_start)
+        return summarize(latencies, time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-ID lookups versus batch lookups")
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--indicators-per-asset", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10, help="parallel requests in the one-by-one mode")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    # The server inherits these, so neither mode is helped by cached lookups.
+    os.environ.update({"CACHE_TTL_ASSET": "0", "CACHE_TTL_INDICATOR": "0", "CACHE_NEGATIVE_TTL": "0"})
+    asset_ids = seed(args.assets, args.indicators_per_asset, random.Random(args.seed))
+    try:
+        with run_server("app:app", port=args.port) as base_url:
+            results = {
+                "assets": args.assets,
+                "indicators_per_asset": args.indicators_per_asset,
+                "one_by_one": asyncio.run(measure(base_url, one_by_one, asset_ids, args.rounds, args.concurrency)),
+                "batched": asyncio.run(measure(base_url, batched, asset_ids, args.rounds, args.concurrency)),
+            }
+    finally:
+        if not args.keep:
+            cleanup()
+        Connection.close_pool()
+    results["speedup_p50"] = round(results["one_by_one"]["p50_ms"] / results["batched"]["p50_ms"], 1)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Compares row-at-a-time indicator inserts (/indicators/new) with the COPY-backed /indicators/bulk.
+# Usage: python -m benchmarks.bulk_ingest --rows 5000 --bulk-rows 200000
+import argparse
+import json
+import time
+
+import httpx
+
+from benchmarks.common import run_server, run_load
+from src.infra.Connection import Connection
+
+BENCH_NAME = "bench_bulk"
+
+def ndjson_body(asset_ids, rows):
+    for i in range(rows):
+        yield (json.dumps({"name": BENCH_NAME, "value": i % 10000 / 100, "asset_id": asset_ids[i % len(asset_ids)]}) + "\n").encode()
+
+def cleanup():
+    conn = Connection().get_connection()
+    with conn:
+        conn.execute("DELETE FROM indicators WHERE name = %s", (BENCH_NAME,))
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-at-a-time vs bulk COPY indicator ingestion")
+    parser.add_argument("--rows", type=int, default=5000, help="rows sent through /indicators/new")
+    parser.add_argument("--bulk-rows", type=int, default=200000, help="rows sent through /indicators/bulk")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8010)
+    args = parser.parse_args()
+
+    with run_server("app:app", port=args.port) as base_url:
+        asset_ids = [asset["id"] for asset in httpx.get(f"{base_url}/assets", timeout=60).json()]
+        if not asset_ids:
+            raise SystemExit("The database has no assets; seed it before running the benchmark.")
+
+        paths = [
+            f"/indicators/new?name={BENCH_NAME}&value={i % 10000 / 100}&asset_id={asset_ids[i % len(asset_ids)]}"
+            for i in range(args.rows)
+        ]
+        row_result = run_load(base_url, paths, total=args.rows, concurrency=args.concurrency)
+        row_rate = row_result["rps"]
+
+        start = time.perf_counter()
+        response = httpx.post(
+            f"{base_url}/indicators/bulk",
+            params={"format": "ndjson", "batch_size": args.batch_size},
+            content=ndjson_body(asset_ids, args.bulk_rows),
+            timeout=None,
+        )
+        elapsed = time.perf_counter() - start
+        report = response.json()
+        bulk_rate = round(report["inserted"] / elapsed, 1) if elapsed else 0.0
+
+    cleanup()
+
+    results = {
+        "row_at_a_time": {"rows": args.rows, "rows_per_s": row_rate, "p99_ms": row_result["p99_ms"]},
+        "bulk_copy": {"rows": args.bulk_rows, "inserted": report["inserted"], "rejected": report["rejected_count"],
+                      "elapsed_s": round(elapsed, 3), "rows_per_s": bulk_rate},
+        "speedup": round(bulk_rate / row_rate, 1) if row_rate else None,
+    }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import subprocess
+import threading
+import asyncio
+import socket
+import time
+import sys
+
+import httpx
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(latencies, elapsed, errors=0):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Server on {host}:{port} did not start within {timeout}s")
+
+@contextmanager
+def run_server(target, host="127.0.0.1", port=8010, workers=1):
+    # The server runs in its own process so the load generator does not compete for the GIL.
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--host", host, "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"]
+    )
+    try:
+        wait_for_port(host, port)
+        yield f"http://{host}:{port}"
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+async def _load(base_url, paths, total, concurrency, timeout):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(paths[i % len(paths)])
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def worker():
+            nonlocal errors
+            while True:
+                try:
+                    request = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                # A request is either a GET path or a (method, path, httpx keyword arguments) tuple.
+                method, path, options = ("GET", request, {}) if isinstance(request, str) else request
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **options)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed, errors)
+
+def run_load(base_url, paths, total=2000, concurrency=50, timeout=30):
+    return asyncio.run(_load(base_url, paths, total, concurrency, timeout))
+
+def run_calls(fn, total=2000, concurrency=1):
+    # In-process counterpart of run_load: fn(i) is called total times from concurrency threads.
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def call(i):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            fn(i)
+        except Exception:
+            with lock:
+                errors += 1
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(total)))
+    return summarize(latencies, time.perf_counter() - start, errors)
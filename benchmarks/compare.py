@@ -0,0 +1,50 @@
+# Compares two benchmark suite result files and fails when a benchmark regressed past the threshold.
+# Usage: python -m benchmarks.compare baseline.json current.json --threshold 0.10
+import argparse
+import json
+import sys
+
+def compare(baseline, current, threshold=0.10, min_delta_ms=1.0):
+    # A benchmark regresses when its p95 grows by more than threshold (and by more than min_delta_ms,
+    # so sub-millisecond noise on fast routes is ignored) or its throughput drops by more than threshold.
+    comparison = {}
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        p95_change = (result["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        rps_change = (result["rps"] - base["rps"]) / base["rps"] if base["rps"] else 0.0
+        slower = p95_change > threshold and result["p95_ms"] - base["p95_ms"] > min_delta_ms
+        comparison[name] = {
+            "baseline_p95_ms": base["p95_ms"],
+            "p95_ms": result["p95_ms"],
+            "p95_change": round(p95_change, 4),
+            "baseline_rps": base["rps"],
+            "rps": result["rps"],
+            "rps_change": round(rps_change, 4),
+            "regression": slower or rps_change < -threshold,
+        }
+    return comparison
+
+def regressions(comparison):
+    return sorted(name for name, result in comparison.items() if result["regression"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark suite result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    comparison = compare(baseline, current, args.threshold, args.min_delta_ms)
+    print(json.dumps({"comparison": comparison, "regressions": regressions(comparison)}, indent=2))
+    if regressions(comparison):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Times GET /decision/matrix and POST /decision/rank end to end (query, matrix build, encoding) on a seeded assets x indicators
+# fixture, with the share spent in the repository and in the NumPy build, and checks that the event
+# loop keeps answering a light route while the matrix is built.
+# Seeded assets use type "bench_matrix" and are deleted afterwards unless --keep is given. The fixture
+# is written with row triggers off (history, category stats, change notifications), so seeding and
+# cleaning up 5M rows takes minutes rather than the hours the per-row history cascade would; this
+# needs a role that may set session_replication_role (the database owner in a local setup).
+# Usage: python -m benchmarks.decision_matrix --assets 100000 --indicators 50
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import run_server, summarize
+from src.controllers.DecisionController import DecisionController
+from src.infra.Connection import Connection
+
+BENCH_TYPE = "bench_matrix"
+TARGET_S = 1.0
+
+def seed(assets, indicators):
+    conn = Connection().get_connection()
+    with conn, conn.cursor() as cursor:
+        cursor.execute("SET LOCAL session_replication_role = replica")
+        cursor.execute("INSERT INTO assets (name, type) SELECT 'bench matrix asset ' || g, %s FROM generate_series(1, %s) g", (BENCH_TYPE, assets))
+        cursor.execute(
+            "INSERT INTO indicators (name, value, asset_id)"
+            " SELECT 'bench_matrix_ind_' || lpad(j::text, 3, '0'), round((random() * 1000)::numeric, 2), a.id"
+            " FROM assets a CROSS JOIN generate_series(1, %s) j WHERE a.type = %s",
+            (indicators, BENCH_TYPE)
+        )
+        # The skipped statement triggers would have bumped these; ETags and caches depend on them.
+        cursor.execute("UPDATE table_versions SET version = version + 1, modified_at = now() WHERE name IN ('assets', 'indicators')")
+    conn.close()
+    conn = Connection().get_connection()
+    conn.autocommit = True
+    conn.execute("ANALYZE assets")
+    conn.execute("ANALYZE indicators")
+    conn.close()
+
+def cleanup():
+    # With triggers off there is no cascade, so the indicators are deleted first.
+    conn = Connection().get_connection()
+    with conn, conn.cursor() as cursor:
+        cursor.execute("SET LOCAL session_replication_role = replica")
+        cursor.execute("DELETE FROM indicators WHERE asset_id IN (SELECT id FROM assets WHERE type = %s)", (BENCH_TYPE,))
+        cursor.execute("DELETE FROM assets WHERE type = %s", (BENCH_TYPE,))
+        cursor.execute("UPDATE table_versions SET version = version + 1, modified_at = now() WHERE name IN ('assets', 'indicators')")
+    conn.close()
+
+def best_of(rounds, fn):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def breakdown(rounds):
+    # The same work as the routes, in process and split into their stages.
+    controller = DecisionController()
+    fetch_s, (columns, assets) = best_of(rounds, lambda: controller.decision_repository.get_matrix_columns(asset_types=[BENCH_TYPE]))
+    build_s, matrix = best_of(rounds, lambda: controller.build_matrix(columns, assets))
+    criteria = [{"indicator": name, "weight": 1.0, "direction": "max"} for name in matrix.indicators]
+    score_s, _ = best_of(rounds, lambda: controller.score_matrix(matrix, criteria))
+    return {"shape": list(matrix.values.shape), "repository_ms": round(fetch_s * 1000, 1), "build_ms": round(build_s * 1000, 1), "score_ms": round(score_s * 1000, 1)}
+
+async def measure(base_url, request, rounds, probe_interval=0.05):
+    # While each heavy request runs, a light route is polled; its worst latency shows whether the
+    # heavy request held the event loop.
+    latencies = []
+    probes = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        async def probe(done):
+            while not done.is_set():
+                start = time.perf_counter()
+                (await client.get("/cache/stats")).raise_for_status()
+                probes.append(time.perf_counter() - start)
+                await asyncio.sleep(probe_interval)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            done = asyncio.Event()
+            prober = asyncio.create_task(probe(done))
+            round_start = time.perf_counter()
+            method, path, options = request
+            (await client.request(method, path, **options)).raise_for_status()
+            latencies.append(time.perf_counter() - round_start)
+            done.set()
+            await prober
+        result = summarize(latencies, time.perf_counter() - start)
+    result["probe_max_ms"] = round(max(probes, default=0.0) * 1000, 1)
+    result["within_target"] = min(latencies) <= TARGET_S
+    return result
+
+def routes(indicators):
+    criteria = [{"indicator": f"bench_matrix_ind_{j:03d}", "weight": 1.0, "direction": "max" if j % 2 else "min"} for j in range(1, indicators + 1)]
+    return {
+        "GET /decision/matrix [json]": ("GET", "/decision/matrix", {"params": {"asset_types": BENCH_TYPE}}),
+        "GET /decision/matrix [arrow]": ("GET", "/decision/matrix", {"params": {"asset_types": BENCH_TYPE}, "headers": {"Accept": "application/vnd.apache.arrow.stream"}}),
+        "POST /decision/rank": ("POST", "/decision/rank", {"json": {"criteria": criteria, "method": "topsis", "k": 10, "asset_types": [BENCH_TYPE]}}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end timing of the decision matrix route")
+    parser.add_argument("--assets", type=int, default=100000)
+    parser.add_argument("--indicators", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    seed(args.assets, args.indicators)
+    try:
+        results = {"assets": args.assets, "indicators": args.indicators, "target_s": TARGET_S, "breakdown": breakdown(args.rounds)}
+        with run_server("app:app", port=args.port) as base_url:
+            for name, request in routes(args.indicators).items():
+                results[name] = asyncio.run(measure(base_url, request, args.rounds))
+    finally:
+        if not args.keep:
+            cleanup()
+        Connection.close_pool()
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
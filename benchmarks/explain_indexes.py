@@ -0,0 +1,459 @@
+# Calls every repository method against the database and runs EXPLAIN on each statement it executes,
+# with sequential scans disabled: a Seq Scan in a plan then means no index can serve the query, even on
+# a small table where the planner would otherwise prefer one. The statements are captured by the
+# connection's cursors (ExplainCursor), so the check always sees the SQL the repositories actually run.
+# Each call runs in a savepoint that is rolled back and the repositories' commits are skipped, so the
+# database is left as it was. tests/test_query_plans.py runs the same check under pytest.
+# Usage: python -m benchmarks.explain_indexes
+from contextlib import contextmanager, asynccontextmanager
+from datetime import datetime, timedelta, timezone
+import asyncio
+import inspect
+import json
+import sys
+
+import psycopg
+from psycopg import Cursor, AsyncCursor, ServerCursor, AsyncServerCursor
+
+from src.infra.Connection import Connection
+from src.infra.TableVersions import TableVersions
+from src.controllers.IndicatorController import QUANTILES
+from src.data_acess.AssetRepository import AssetRepository
+from src.data_acess.AsyncAssetRepository import AsyncAssetRepository
+from src.data_acess.CategoryRepository import CategoryRepository
+from src.data_acess.AsyncCategoryRepository import AsyncCategoryRepository
+from src.data_acess.CategoryStatsRepository import CategoryStatsRepository
+from src.data_acess.AsyncCategoryStatsRepository import AsyncCategoryStatsRepository
+from src.data_acess.DecisionRepository import DecisionRepository
+from src.data_acess.AsyncDecisionRepository import AsyncDecisionRepository
+from src.data_acess.ExportRepository import ExportRepository
+from src.data_acess.ImportRepository import ImportRepository
+from src.data_acess.IndicatorHistoryRepository import IndicatorHistoryRepository
+from src.data_acess.AsyncIndicatorHistoryRepository import AsyncIndicatorHistoryRepository
+from src.data_acess.IndicatorRepository import IndicatorRepository
+from src.data_acess.AsyncIndicatorRepository import AsyncIndicatorRepository
+from src.data_acess.UnitOfWork import UnitOfWork
+from src.data_acess.AsyncUnitOfWork import AsyncUnitOfWork
+
+# Statements EXPLAIN can plan. COPY ... TO STDOUT is planned through its inner query; COPY FROM,
+# DDL and SET are captured but not planned.
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "MERGE")
+
+# Calls that read whole tables on purpose: the tables and why. Async mirrors share these entries.
+FULL_READS = {
+    "AssetRepository.get_assets": (("assets",), "lists every asset"),
+    "CategoryRepository.get_categories": (("categories",), "lists every category"),
+    "IndicatorRepository.get_indicators": (("indicators",), "lists every indicator"),
+    "ImportRepository.get_keys [assets]": (("assets",), "resolves every asset name once per import"),
+    "ImportRepository.get_keys [categories]": (("categories",), "resolves every category name once per import"),
+    "IndicatorHistoryRepository.append_history": (("indicator_history_staging",), "merges the whole staging table of the call"),
+}
+
+# UnitOfWork methods that only queue an operation; they run inside the commit call.
+QUEUE_ONLY = ("queue", "insert", "update", "delete")
+
+NOW = datetime.now(timezone.utc)
+FILE_ROW = "explain_indicator_file,2.5,{asset}\n"
+
+# Arguments of every repository method, given the IDs of the rows seeded for the check. The async
+# mirrors take the same arguments. A label in brackets tells apart calls of the same method.
+ASSET_CALLS = {
+    "get_assets": lambda repo, ids: repo.get_assets(),
+    "insert_asset": lambda repo, ids: repo.insert_asset("explain asset 2", "explain", ids["category"]),
+    "delete_asset": lambda repo, ids: repo.delete_asset(ids["asset"]),
+    "update_asset": lambda repo, ids: repo.update_asset(ids["asset"], "explain asset 3", "explain", ids["category"]),
+    "get_asset_by_id": lambda repo, ids: repo.get_asset_by_id(ids["asset"]),
+    "get_assets_by_ids": lambda repo, ids: repo.get_assets_by_ids([ids["asset"]]),
+    "get_assets_by_category": lambda repo, ids: repo.get_assets_by_category(ids["category"]),
+    "get_assets_by_type": lambda repo, ids: repo.get_assets_by_type("explain"),
+    "get_assets_by_name": lambda repo, ids: repo.get_assets_by_name("explain asset"),
+    "search_assets": lambda repo, ids: repo.search_assets("explain asset"),
+    "search_assets [typeahead]": lambda repo, ids: repo.search_assets("explain as", typeahead=True),
+    "get_assets_page": lambda repo, ids: repo.get_assets_page(100, ids["asset"] - 1),
+    "iter_assets": lambda repo, ids: repo.iter_assets(ids["asset"] - 1, 10),
+    "get_existing_category_ids": lambda repo, ids: repo.get_existing_category_ids([ids["category"]]),
+    "copy_assets": lambda repo, ids: repo.copy_assets([("explain asset 4", "explain", ids["category"])]),
+    "get_assets_table": lambda repo, ids: repo.get_assets_table(),
+}
+
+CATEGORY_CALLS = {
+    "get_categories": lambda repo, ids: repo.get_categories(),
+    "insert_category": lambda repo, ids: repo.insert_category("explain category 2", "explain"),
+    "delete_category": lambda repo, ids: repo.delete_category(ids["category"]),
+    "update_category": lambda repo, ids: repo.update_category(ids["category"], "explain category 3"),
+    "get_category_by_id": lambda repo, ids: repo.get_category_by_id(ids["category"]),
+    "get_categories_by_name": lambda repo, ids: repo.get_categories_by_name("explain category"),
+    "get_categories_table": lambda repo, ids: repo.get_categories_table(),
+}
+
+CATEGORY_STATS_CALLS = {
+    "get_category_stats": lambda repo, ids: repo.get_category_stats(ids["category"]),
+    "get_category_stats [names]": lambda repo, ids: repo.get_category_stats(ids["category"], ["explain_indicator"]),
+    "get_peer_rows": lambda repo, ids: repo.get_peer_rows(ids["asset"]),
+}
+
+DECISION_CALLS = {
+    "get_decision_view [assets]": lambda repo, ids: repo.get_decision_view(asset_ids=[ids["asset"]]),
+    "get_decision_view [categories]": lambda repo, ids: repo.get_decision_view(category_ids=[ids["category"]], indicator_names=["explain_indicator"], limit=100),
+    "get_decision_view_table": lambda repo, ids: repo.get_decision_view_table(category_ids=[ids["category"]]),
+    "get_indicator_names": lambda repo, ids: repo.get_indicator_names(),
+    "get_matrix_columns [categories]": lambda repo, ids: repo.get_matrix_columns(category_ids=[ids["category"]]),
+    "get_matrix_columns [assets]": lambda repo, ids: repo.get_matrix_columns(asset_ids=[ids["asset"]], indicator_names=["explain_indicator"]),
+    "get_matrix_columns [types]": lambda repo, ids: repo.get_matrix_columns(asset_types=["explain"]),
+    "get_matrix_columns [all]": lambda repo, ids: repo.get_matrix_columns(),
+}
+
+EXPORT_CALLS = {
+    "iter_export [categories]": lambda repo, ids: repo.iter_export("csv", {"category_ids": [ids["category"]]}),
+    "iter_export [assets]": lambda repo, ids: repo.iter_export("ndjson", {"asset_ids": [ids["asset"]]}),
+    "iter_export [values]": lambda repo, ids: repo.iter_export("rows", {"indicator_names": ["explain_indicator"], "min_value": 0, "max_value": 10}),
+    "iter_export [all]": lambda repo, ids: repo.iter_export("csv", {}),
+}
+
+IMPORT_CALLS = {
+    "get_keys [assets]": lambda repo, ids: repo.get_keys("assets"),
+    "get_keys [categories]": lambda repo, ids: repo.get_keys("categories"),
+    "get_imported_batches": lambda repo, ids: repo.get_imported_batches("explain"),
+    "copy_batch": lambda repo, ids: repo.copy_batch("indicators", ["name", "value", "asset_id"], FILE_ROW.format(asset=ids["asset"]), "explain", 0, 1, True),
+    "refresh_category_stats": lambda repo, ids: repo.refresh_category_stats(),
+}
+
+HISTORY_CALLS = {
+    "get_history_table": lambda repo, ids: repo.get_history_table([ids["indicator"]], NOW - timedelta(days=1), NOW + timedelta(days=1)),
+    "get_history_buckets_table": lambda repo, ids: repo.get_history_buckets_table([ids["indicator"]], NOW - timedelta(days=1), NOW + timedelta(days=1), timedelta(hours=1)),
+    "get_history_extremes_table": lambda repo, ids: repo.get_history_extremes_table([ids["indicator"]], NOW - timedelta(days=1), NOW + timedelta(days=1), timedelta(hours=1)),
+    "get_history_summary": lambda repo, ids: repo.get_history_summary([ids["indicator"]]),
+    "append_history": lambda repo, ids: repo.append_history([(ids["indicator"], NOW - timedelta(days=400), 1.0)]),
+}
+
+INDICATOR_CALLS = {
+    "get_indicators": lambda repo, ids: repo.get_indicators(),
+    "insert_indicator": lambda repo, ids: repo.insert_indicator("explain_indicator_2", 2.5, ids["asset"]),
+    "delete_indicator": lambda repo, ids: repo.delete_indicator(ids["indicator"]),
+    "update_indicator": lambda repo, ids: repo.update_indicator(ids["indicator"], "explain_indicator_3", 3.5, ids["asset"]),
+    "get_indicator_by_id": lambda repo, ids: repo.get_indicator_by_id(ids["indicator"]),
+    "get_indicators_by_name": lambda repo, ids: repo.get_indicators_by_name("explain_indicator"),
+    "search_indicators": lambda repo, ids: repo.search_indicators("explain_indicator"),
+    "search_indicators [typeahead]": lambda repo, ids: repo.search_indicators("explain_ind", typeahead=True),
+    "get_indicator_names_by_prefix": lambda repo, ids: repo.get_indicator_names_by_prefix("explain"),
+    "get_indicators_by_asset": lambda repo, ids: repo.get_indicators_by_asset(ids["asset"]),
+    "get_indicators_by_assets": lambda repo, ids: repo.get_indicators_by_assets([ids["asset"]]),
+    "get_indicators_by_value": lambda repo, ids: repo.get_indicators_by_value("explain_indicator", 0, 10),
+    "get_value_distribution": lambda repo, ids: repo.get_value_distribution("explain_indicator", 20, QUANTILES, 0, 10),
+    "get_indicators_page": lambda repo, ids: repo.get_indicators_page(100, ids["indicator"] - 1),
+    "iter_indicators": lambda repo, ids: repo.iter_indicators(ids["indicator"] - 1, 10),
+    "get_existing_asset_ids": lambda repo, ids: repo.get_existing_asset_ids([ids["asset"]]),
+    "copy_indicators": lambda repo, ids: repo.copy_indicators([("explain_indicator_4", 4.5, ids["asset"])]),
+    "get_indicators_table": lambda repo, ids: repo.get_indicators_table(),
+}
+
+def run_unit_of_work(unit, ids):
+    category = unit.insert("categories", {"name": "explain category 4", "description": "explain"})
+    asset = unit.insert("assets", {"name": "explain asset 5", "type": "explain", "category_id": category})
+    unit.update("indicators", ids["indicator"], {"value": 5.5, "asset_id": asset})
+    unit.delete("assets", ids["asset"])
+    return unit.commit()
+
+UNIT_OF_WORK_CALLS = {"commit": run_unit_of_work}
+
+SYNC_CALLS = [
+    (AssetRepository, ASSET_CALLS),
+    (CategoryRepository, CATEGORY_CALLS),
+    (CategoryStatsRepository, CATEGORY_STATS_CALLS),
+    (DecisionRepository, DECISION_CALLS),
+    (ExportRepository, EXPORT_CALLS),
+    (ImportRepository, IMPORT_CALLS),
+    (IndicatorHistoryRepository, HISTORY_CALLS),
+    (IndicatorRepository, INDICATOR_CALLS),
+    (UnitOfWork, UNIT_OF_WORK_CALLS),
+    (TableVersions, {"get_versions": lambda repo, ids: repo.get_versions(("assets", "categories", "indicators"))}),
+]
+
+ASYNC_CALLS = [
+    (AsyncAssetRepository, ASSET_CALLS),
+    (AsyncCategoryRepository, CATEGORY_CALLS),
+    (AsyncCategoryStatsRepository, CATEGORY_STATS_CALLS),
+    (AsyncDecisionRepository, DECISION_CALLS),
+    (AsyncIndicatorHistoryRepository, HISTORY_CALLS),
+    (AsyncIndicatorRepository, INDICATOR_CALLS),
+    (AsyncUnitOfWork, UNIT_OF_WORK_CALLS),
+    (TableVersions, {"get_versions_async": lambda repo, ids: repo.get_versions_async(("assets", "categories", "indicators"))}),
+]
+
+# Statements captured by the cursors below, in execution order: (statement, relations read by a
+# Seq Scan or None when the statement is not planned, EXPLAIN error).
+captured = []
+
+def plan_nodes(plan):
+    yield plan["Node Type"], plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+def explain_statement(query):
+    if query.startswith("COPY (") and ") TO STDOUT" in query:
+        query = query[len("COPY ("):query.rindex(") TO STDOUT")]
+    if query.lstrip().split(None, 1)[0].upper() not in EXPLAINABLE:
+        return None
+    return f"EXPLAIN (FORMAT JSON) {query}"
+
+def record_plan(query, row):
+    plan = row[0][0]["Plan"]
+    captured.append((query, sorted({relation for node, relation in plan_nodes(plan) if node == "Seq Scan"}), None))
+
+def explain(conn, query, params):
+    # In a savepoint, so the SET LOCAL ends with it and a failed EXPLAIN leaves the call's transaction usable.
+    statement = explain_statement(query)
+    if statement is None:
+        captured.append((query, None, None))
+        return
+    try:
+        with conn.transaction(force_rollback=True), Cursor(conn) as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(statement, params)
+            record_plan(query, cursor.fetchone())
+    except psycopg.Error as e:
+        captured.append((query, [], str(e)))
+
+async def explain_async(conn, query, params):
+    statement = explain_statement(query)
+    if statement is None:
+        captured.append((query, None, None))
+        return
+    try:
+        async with conn.transaction(force_rollback=True), AsyncCursor(conn) as cursor:
+            await cursor.execute("SET LOCAL enable_seqscan = off")
+            await cursor.execute(statement, params)
+            record_plan(query, await cursor.fetchone())
+    except psycopg.Error as e:
+        captured.append((query, [], str(e)))
+
+def skipped(query):
+    # Every call already runs inside the check's transaction, where the isolation level is fixed.
+    return query.startswith("SET TRANSACTION")
+
+class ExplainCursor(Cursor):
+    def execute(self, query, params=None, **kwargs):
+        if skipped(query):
+            return self
+        explain(self.connection, query, params)
+        return super().execute(query, params, **kwargs)
+
+    def executemany(self, query, params_seq, **kwargs):
+        params_seq = list(params_seq)
+        if params_seq:
+            explain(self.connection, query, params_seq[0])
+        return super().executemany(query, params_seq, **kwargs)
+
+    @contextmanager
+    def copy(self, statement, params=None, **kwargs):
+        explain(self.connection, statement, params)
+        with super().copy(statement, params, **kwargs) as copy:
+            yield copy
+
+class ExplainServerCursor(ServerCursor):
+    def execute(self, query, params=None, **kwargs):
+        explain(self.connection, query, params)
+        return super().execute(query, params, **kwargs)
+
+class AsyncExplainCursor(AsyncCursor):
+    async def execute(self, query, params=None, **kwargs):
+        if skipped(query):
+            return self
+        await explain_async(self.connection, query, params)
+        return await super().execute(query, params, **kwargs)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        params_seq = list(params_seq)
+        if params_seq:
+            await explain_async(self.connection, query, params_seq[0])
+        return await super().executemany(query, params_seq, **kwargs)
+
+    @asynccontextmanager
+    async def copy(self, statement, params=None, **kwargs):
+        await explain_async(self.connection, statement, params)
+        async with super().copy(statement, params, **kwargs) as copy:
+            yield copy
+
+class AsyncExplainServerCursor(AsyncServerCursor):
+    async def execute(self, query, params=None, **kwargs):
+        await explain_async(self.connection, query, params)
+        return await super().execute(query, params, **kwargs)
+
+class ExplainConnection:
+    # What the repositories get from the pools: the check's connection with commit() skipped, so the
+    # savepoint around the call can undo it.
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def commit(self):
+        pass
+
+class AsyncExplainConnection(ExplainConnection):
+    async def commit(self):
+        pass
+
+class ExplainPool:
+    def __init__(self, conn):
+        self.conn = ExplainConnection(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        yield self.conn
+
+    read_connection = write_connection = connection
+
+class AsyncExplainPool:
+    def __init__(self, conn):
+        self.conn = AsyncExplainConnection(conn)
+
+    @asynccontextmanager
+    async def connection(self, timeout=None):
+        yield self.conn
+
+    read_connection = write_connection = connection
+
+@contextmanager
+def explained_pools(pool, async_pool):
+    # Repositories take their pools from Connection when they are built.
+    getters = {"get_pool": pool, "get_read_pool": pool, "get_async_pool": async_pool, "get_async_read_pool": async_pool}
+    saved = {name: getattr(Connection, name) for name in getters}
+    for name, value in getters.items():
+        setattr(Connection, name, lambda self, value=value: value)
+    try:
+        yield
+    finally:
+        for name, method in saved.items():
+            setattr(Connection, name, method)
+
+SEED_QUERIES = (
+    ("category", "INSERT INTO categories (name, description) VALUES ('explain category', 'explain') RETURNING id", ()),
+    ("asset", "INSERT INTO assets (name, type, category_id) VALUES ('explain asset', 'explain', %s) RETURNING id", ("category",)),
+    ("indicator", "INSERT INTO indicators (name, value, asset_id) VALUES ('explain_indicator', 1.5, %s) RETURNING id", ("asset",)),
+)
+
+def seed(conn):
+    # Rows the calls can find; they live in the check's transaction and are rolled back with it.
+    ids = {}
+    with Cursor(conn) as cursor:
+        for name, query, refs in SEED_QUERIES:
+            cursor.execute(query, [ids[ref] for ref in refs])
+            ids[name] = cursor.fetchone()[0]
+    return ids
+
+async def seed_async(conn):
+    ids = {}
+    async with AsyncCursor(conn) as cursor:
+        for name, query, refs in SEED_QUERIES:
+            await cursor.execute(query, [ids[ref] for ref in refs])
+            ids[name] = (await cursor.fetchone())[0]
+    return ids
+
+def call_label(cls, name):
+    return f"{cls.__name__}.{name}"
+
+def summarize(cls, name, statements):
+    label = call_label(cls, name)
+    planned = [(query, seq_scans, error) for query, seq_scans, error in statements if seq_scans is not None]
+    seq_scans = sorted({relation for _, relations, _ in planned for relation in relations})
+    errors = [error for _, _, error in planned if error]
+    tables, reason = FULL_READS.get(label.removeprefix("Async"), ((), None))
+    failed = not statements or errors or any(relation not in tables for relation in seq_scans)
+    result = {"call": label, "status": "fail" if failed else "ok", "statements": len(statements), "planned": len(planned), "seq_scans": seq_scans}
+    if errors:
+        result["errors"] = errors
+    if seq_scans and reason:
+        result["allowed"] = reason
+    return result
+
+def run_sync(conninfo):
+    results = []
+    conn = psycopg.connect(conninfo, cursor_factory=ExplainCursor)
+    conn.server_cursor_factory = ExplainServerCursor
+    try:
+        ids = seed(conn)
+        with explained_pools(ExplainPool(conn), AsyncExplainPool(None)):
+            repos = [(cls(), cls, calls) for cls, calls in SYNC_CALLS]
+        for repo, cls, calls in repos:
+            for name, call in calls.items():
+                captured.clear()
+                with conn.transaction(force_rollback=True):
+                    try:
+                        result = call(repo, ids)
+                        if inspect.isgenerator(result):
+                            list(result)
+                    except Exception:
+                        # Repositories log and re-raise some errors; the plans captured so far still count.
+                        pass
+                results.append(summarize(cls, name, list(captured)))
+    finally:
+        conn.rollback()
+        conn.close()
+    return results
+
+async def run_async(conninfo):
+    results = []
+    conn = await psycopg.AsyncConnection.connect(conninfo, cursor_factory=AsyncExplainCursor)
+    conn.server_cursor_factory = AsyncExplainServerCursor
+    try:
+        ids = await seed_async(conn)
+        with explained_pools(ExplainPool(None), AsyncExplainPool(conn)):
+            repos = [(cls(), cls, calls) for cls, calls in ASYNC_CALLS]
+        for repo, cls, calls in repos:
+            for name, call in calls.items():
+                captured.clear()
+                async with conn.transaction(force_rollback=True):
+                    try:
+                        result = call(repo, ids)
+                        if inspect.isasyncgen(result):
+                            async for _ in result:
+                                pass
+                        elif inspect.isawaitable(result):
+                            await result
+                    except Exception:
+                        pass
+                results.append(summarize(cls, name, list(captured)))
+    finally:
+        await conn.rollback()
+        await conn.close()
+    return results
+
+def check_plans():
+    # The sync and async runs each seed their own rows, one after the other, so neither waits on the
+    # other's uncommitted inserts.
+    conninfo = Connection().get_conninfo()
+    return run_sync(conninfo) + asyncio.run(run_async(conninfo))
+
+def uncovered_methods():
+    # Public methods of the repositories that no entry of SYNC_CALLS or ASYNC_CALLS calls.
+    covered = {}
+    for cls, calls in SYNC_CALLS + ASYNC_CALLS:
+        covered.setdefault(cls, set()).update(name.split(" [")[0] for name in calls)
+    missing = []
+    for cls, names in covered.items():
+        for name, member in inspect.getmembers(cls, inspect.isfunction):
+            if name.startswith("_") or name.startswith("build_") or name in names:
+                continue
+            if cls in (UnitOfWork, AsyncUnitOfWork) and name in QUEUE_ONLY:
+                continue
+            missing.append(call_label(cls, name))
+    return missing
+
+def database_available():
+    try:
+        psycopg.connect(Connection().get_conninfo(), connect_timeout=3).close()
+        return True
+    except psycopg.Error:
+        return False
+
+def main():
+    missing = uncovered_methods()
+    results = check_plans()
+    print(json.dumps({"uncovered": missing, "results": results}, indent=2))
+    if missing or any(result["status"] == "fail" for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Times the vectorized weighted-sum and TOPSIS scoring against a naive per-asset loop.
+# Usage: python -m benchmarks.ranking --assets 100000 --indicators 50
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from src.controllers import Ranking
+
+def naive_weighted_sum(values, weights, benefit):
+    weights = [w / sum(weights) for w in weights]
+    columns = list(zip(*values))
+    lows = [min(column) for column in columns]
+    highs = [max(column) for column in columns]
+    scores = []
+    for row in values:
+        total = 0.0
+        for j, value in enumerate(row):
+            spread = highs[j] - lows[j]
+            if spread > 0:
+                scaled = (value - lows[j]) / spread
+                total += weights[j] * (scaled if benefit[j] else 1.0 - scaled)
+        scores.append(total)
+    return scores
+
+def naive_topsis(values, weights, benefit):
+    weights = [w / sum(weights) for w in weights]
+    norms = [math.sqrt(sum(value * value for value in column)) for column in zip(*values)]
+    weighted = [[(value / norms[j] if norms[j] else 0.0) * weights[j] for j, value in enumerate(row)] for row in values]
+    columns = list(zip(*weighted))
+    ideal = [max(column) if benefit[j] else min(column) for j, column in enumerate(columns)]
+    anti_ideal = [min(column) if benefit[j] else max(column) for j, column in enumerate(columns)]
+    scores = []
+    for row in weighted:
+        to_ideal = math.sqrt(sum((value - ideal[j]) ** 2 for j, value in enumerate(row)))
+        to_anti_ideal = math.sqrt(sum((value - anti_ideal[j]) ** 2 for j, value in enumerate(row)))
+        total = to_ideal + to_anti_ideal
+        scores.append(to_anti_ideal / total if total else 0.0)
+    return scores
+
+def best_of(repeats, fn):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized vs naive multi-criteria ranking")
+    parser.add_argument("--assets", type=int, default=100000)
+    parser.add_argument("--indicators", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    values = rng.uniform(-100, 1000, size=(args.assets, args.indicators))
+    weights = rng.uniform(0.1, 1.0, size=args.indicators)
+    benefit = rng.random(args.indicators) > 0.3
+    rows = values.tolist()
+
+    results = {"assets": args.assets, "indicators": args.indicators}
+    for method, naive in (("weighted_sum", naive_weighted_sum), ("topsis", naive_topsis)):
+        vector_s, scores = best_of(args.repeats, lambda: Ranking.top_k(Ranking.score(values, weights, benefit, method), args.k))
+        naive_s, naive_scores = best_of(1, lambda: naive(rows, weights.tolist(), benefit.tolist()))
+        naive_top = sorted(range(len(naive_scores)), key=lambda i: -naive_scores[i])[:args.k]
+        results[method] = {
+            "vectorized_ms": round(vector_s * 1000, 2),
+            "naive_ms": round(naive_s * 1000, 2),
+            "speedup": round(naive_s / vector_s, 1),
+            "same_top_k": scores.tolist() == naive_top,
+        }
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Compares the old row handling (SELECT * tuples rebuilt into __dict__ classes in a second pass)
+# with slotted dataclasses built by a psycopg row factory while the rows are fetched.
+# Usage: python -m benchmarks.row_models --limit 100000
+import argparse
+import json
+import time
+import tracemalloc
+
+from psycopg.rows import args_row
+
+from src.infra.Connection import Connection
+from src.models.Asset import Asset
+from src.models.Indicator import Indicator
+from src.data_acess.AssetRepository import ASSET_COLUMNS
+from src.data_acess.IndicatorRepository import INDICATOR_COLUMNS
+
+class LegacyAsset:
+    def __init__(self, asset_id, asset_name, asset_type, asset_category_id):
+        self.id = asset_id
+        self.name = asset_name
+        self.type = asset_type
+        self.category_id = asset_category_id
+
+class LegacyIndicator:
+    def __init__(self, indicator_id, indicator_name, indicator_value, asset_id):
+        self.id = indicator_id
+        self.name = indicator_name
+        self.value = indicator_value
+        self.asset_id = asset_id
+
+def fetch_legacy(pool, table, model, limit):
+    with pool.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(f"SELECT * FROM {table} ORDER BY id LIMIT %s", (limit,))
+        rows = cursor.fetchall()
+    start = time.perf_counter()
+    objects = [model(row[0], row[1], row[2], row[3]) for row in rows]
+    return objects, time.perf_counter() - start
+
+def fetch_compact(pool, table, model, columns, limit):
+    with pool.connection() as conn, conn.cursor(row_factory=args_row(model)) as cursor:
+        cursor.execute(f"SELECT {columns} FROM {table} ORDER BY id LIMIT %s", (limit,))
+        return cursor.fetchall(), 0.0
+
+def measure(fetch, repeats):
+    # Fetch time is the best of several runs; memory is what the returned objects keep alive.
+    best_total = best_convert = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        objects, convert_s = fetch()
+        best_total = min(best_total, time.perf_counter() - start)
+        best_convert = min(best_convert, convert_s)
+        del objects
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    objects, _ = fetch()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(objects) or 1
+    return {
+        "rows": len(objects),
+        "fetch_ms": round(best_total * 1000, 2),
+        "second_pass_ms": round(best_convert * 1000, 2),
+        "retained_bytes_per_row": round((retained - baseline) / count, 1),
+        "peak_bytes_per_row": round((peak - baseline) / count, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy vs compact row models")
+    parser.add_argument("--limit", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    pool = Connection().get_pool()
+    results = {}
+    for table, legacy, model, columns in (
+        ("assets", LegacyAsset, Asset, ASSET_COLUMNS),
+        ("indicators", LegacyIndicator, Indicator, INDICATOR_COLUMNS),
+    ):
+        results[table] = {
+            "before": measure(lambda: fetch_legacy(pool, table, legacy, args.limit), args.repeats),
+            "after": measure(lambda: fetch_compact(pool, table, model, columns, args.limit), args.repeats),
+        }
+    Connection.close_pool()
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
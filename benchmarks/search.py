@@ -0,0 +1,97 @@
+# Measures name search and typeahead latency (p50/p95/p99) over a large seeded asset table.
+# Seeded rows use type "bench_search" and are deleted afterwards unless --keep is given.
+# Usage: python -m benchmarks.search --rows 1000000 --queries 2000
+import argparse
+import json
+import random
+import time
+
+from benchmarks.common import run_server, run_load, summarize
+from src.infra.Connection import Connection
+from src.data_acess.AssetRepository import AssetRepository
+
+BENCH_TYPE = "bench_search"
+TARGET_P95_MS = 20
+SYLLABLES = ["ba", "ca", "ção", "de", "é", "fi", "gu", "lá", "mo", "nú", "pe", "qui", "ra", "sô", "ta", "vi", "xo", "zé"]
+
+def make_words(rng, count):
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize())
+    return sorted(words)
+
+def seed(rows, rng):
+    words = make_words(rng, 2000)
+    conn = Connection().get_connection()
+    with conn, conn.cursor() as cursor:
+        with cursor.copy("COPY assets (name, type) FROM STDIN") as copy:
+            for i in range(rows):
+                copy.write_row((f"{rng.choice(words)} {rng.choice(words)} {i}", BENCH_TYPE))
+        cursor.execute("ANALYZE assets")
+    conn.close()
+    return words
+
+def cleanup():
+    conn = Connection().get_connection()
+    with conn:
+        conn.execute("DELETE FROM assets WHERE type = %s", (BENCH_TYPE,))
+    conn.close()
+
+def sample_terms(words, rng, count):
+    # What people type: short prefixes, whole words, lower case and without accents.
+    terms = []
+    for _ in range(count):
+        word = rng.choice(words)
+        term = word[:rng.randint(1, len(word))]
+        if rng.random() < 0.5:
+            term = term.lower()
+        terms.append(term)
+    return terms
+
+def time_calls(fn, terms):
+    latencies = []
+    start = time.perf_counter()
+    for term in terms:
+        call_start = time.perf_counter()
+        fn(term)
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Name search and typeahead latency")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_start = time.perf_counter()
+    words = seed(args.rows, rng)
+    seed_s = time.perf_counter() - seed_start
+    terms = sample_terms(words, rng, args.queries)
+
+    try:
+        repository = AssetRepository()
+        results = {
+            "rows": args.rows,
+            "seed_s": round(seed_s, 1),
+            "typeahead": time_calls(lambda term: repository.search_assets(term, 10, typeahead=True), terms),
+            "search": time_calls(lambda term: repository.search_assets(term, 20), terms),
+        }
+        Connection.close_pool()
+        with run_server("app:app", port=args.port) as base_url:
+            paths = [f"/assets/typeahead?q={term}&limit=10" for term in terms]
+            results["http_typeahead"] = run_load(base_url, paths, total=args.queries, concurrency=args.concurrency)
+        results["typeahead_p95_target_ms"] = TARGET_P95_MS
+        results["typeahead_meets_target"] = results["typeahead"]["p95_ms"] < TARGET_P95_MS
+    finally:
+        if not args.keep:
+            cleanup()
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Measures how long each Streamlit page takes to render against a running API, on the first load
+# and on reruns (what every widget interaction triggers), using Streamlit's headless AppTest runner.
+# Pass --script to time another version of the front end, e.g. one saved with
+# git show HEAD~1:streamlit_app.py > /tmp/old_app.py
+# Usage: python -m benchmarks.streamlit_render --reruns 20
+import argparse
+import json
+import os
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.common import run_server, summarize
+
+PAGES = ["Página Principal", "Gerenciar Dados"]
+
+def time_run(app):
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return elapsed
+
+def measure_page(script, page, reruns):
+    app = AppTest.from_file(script, default_timeout=120)
+    first = time_run(app)
+    if app.sidebar.selectbox[0].value != page:
+        app.sidebar.selectbox[0].select(page)
+        first = time_run(app)
+    latencies = [time_run(app) for _ in range(reruns)]
+    return {"first_ms": round(first * 1000, 1), "reruns": summarize(latencies, sum(latencies))}
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit page render time")
+    parser.add_argument("--script", default="streamlit_app.py")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8000, help="API port the front end points to")
+    args = parser.parse_args()
+
+    os.environ["API_URL"] = f"http://127.0.0.1:{args.port}"
+    with run_server("app:app", port=args.port):
+        results = {page: measure_page(args.script, page, args.reruns) for page in PAGES}
+    print(json.dumps({"script": args.script, "pages": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+# Seeds a reproducible dataset and measures every route in app.py and every sync repository method
+# (throughput and p50/p95/p99), writing the results to a JSON file that benchmarks.compare can diff.
+# Seeded rows are named "bench_suite..." and are deleted afterwards unless --keep is given.
+# Usage: python -m benchmarks.suite --indicators 100000 --requests 200 --concurrency 10 --output results.json
+#        python -m benchmarks.suite --indicators 100000 --output new.json --compare results.json --threshold 0.10
+from datetime import datetime, timedelta, timezone
+import argparse
+import inspect
+import json
+import platform
+import random
+import subprocess
+import sys
+
+from benchmarks.common import run_server, run_load, run_calls
+from benchmarks.compare import compare, regressions
+from src.infra.Connection import Connection
+from src.infra.Migrations import Migrations
+from src.data_acess.AssetRepository import AssetRepository
+from src.data_acess.CategoryRepository import CategoryRepository
+from src.data_acess.IndicatorRepository import IndicatorRepository
+from src.data_acess.DecisionRepository import DecisionRepository
+
+PREFIX = "bench_suite"
+INDICATOR_NAMES = [f"{PREFIX}_ind_{i:02d}" for i in range(30)]
+ASSET_TYPES = [f"{PREFIX}_type_{i}" for i in range(5)]
+ARROW = {"headers": {"Accept": "application/vnd.apache.arrow.stream"}}
+# Routes and methods that read whole tables get this fraction of the requests.
+HEAVY_SHARE = 0.05
+# Indicators that get an hourly history series, so the history routes have points to downsample.
+HISTORY_SERIES = 20
+HISTORY_POINTS = 2000
+
+def seed(categories, assets, indicators, victims, rng):
+    conn = Connection().get_connection()
+    with conn, conn.cursor() as cursor:
+        with cursor.copy("COPY categories (name, description) FROM STDIN") as copy:
+            for i in range(categories):
+                copy.write_row((f"{PREFIX}_category_{i}", "benchmark category"))
+            for i in range(victims):
+                copy.write_row((f"{PREFIX}_victim_{i}", "deleted by the benchmark"))
+        cursor.execute("SELECT id FROM categories WHERE name LIKE %s ORDER BY id", (f"{PREFIX}\\_category\\_%",))
+        category_ids = [row[0] for row in cursor.fetchall()]
+
+        with cursor.copy("COPY assets (name, type, category_id) FROM STDIN") as copy:
+            for i in range(assets):
+                copy.write_row((f"{PREFIX} asset {i}", ASSET_TYPES[i % len(ASSET_TYPES)], category_ids[i % len(category_ids)]))
+            for i in range(victims):
+                copy.write_row((f"{PREFIX} victim {i}", ASSET_TYPES[0], None))
+        cursor.execute("SELECT id FROM assets WHERE name LIKE %s ORDER BY id", (f"{PREFIX} asset %",))
+        asset_ids = [row[0] for row in cursor.fetchall()]
+
+        with cursor.copy("COPY indicators (name, value, asset_id) FROM STDIN") as copy:
+            for i in range(indicators):
+                copy.write_row((INDICATOR_NAMES[i % len(INDICATOR_NAMES)], round(rng.uniform(0, 100), 2), rng.choice(asset_ids)))
+            for i in range(victims):
+                copy.write_row((f"{PREFIX}_victim", 0, asset_ids[0]))
+        cursor.execute("ANALYZE categories")
+        cursor.execute("ANALYZE assets")
+        cursor.execute("ANALYZE indicators")
+
+        ids = {"categories": category_ids, "assets": asset_ids}
+        cursor.execute("SELECT id FROM indicators WHERE asset_id = ANY(%s) AND name <> %s ORDER BY id LIMIT 10000", (asset_ids, f"{PREFIX}_victim"))
+        ids["indicators"] = [row[0] for row in cursor.fetchall()]
+        ids["history_indicators"] = ids["indicators"][:HISTORY_SERIES]
+        cursor.execute("SELECT ensure_indicator_history_partitions(now() - %s * interval '1 hour', now())", (HISTORY_POINTS,))
+        cursor.execute(
+            "INSERT INTO indicator_history (indicator_id, recorded_at, value)"
+            " SELECT i, date_trunc('hour', now()) - g * interval '1 hour', round((random() * 100)::numeric, 2)"
+            " FROM unnest(%s::int[]) AS i, generate_series(1, %s) AS g",
+            (ids["history_indicators"], HISTORY_POINTS)
+        )
+        cursor.execute("ANALYZE indicator_history")
+        cursor.execute("SELECT DISTINCT asset_id FROM indicators WHERE id = ANY(%s) ORDER BY asset_id", (ids["history_indicators"],))
+        ids["history_assets"] = [row[0] for row in cursor.fetchall()]
+        for key, query, pattern in (
+            ("victim_categories", "SELECT id FROM categories WHERE name LIKE %s ORDER BY id", f"{PREFIX}\\_victim\\_%"),
+            ("victim_assets", "SELECT id FROM assets WHERE name LIKE %s ORDER BY id", f"{PREFIX} victim %"),
+            ("victim_indicators", "SELECT id FROM indicators WHERE name = %s ORDER BY id", f"{PREFIX}_victim"),
+        ):
+            cursor.execute(query, (pattern,))
+            ids[key] = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return ids
+
+def cleanup():
+    # Indicators go with their assets (ON DELETE CASCADE).
+    conn = Connection().get_connection()
+    with conn:
+        conn.execute("DELETE FROM assets WHERE name LIKE %s", (f"{PREFIX}%",))
+        conn.execute("DELETE FROM indicators WHERE name LIKE %s", (f"{PREFIX}%",))
+        conn.execute("DELETE FROM categories WHERE name LIKE %s", (f"{PREFIX}%",))
+    conn.close()
+
+def pick(values, i):
+    # Deterministic spread over the seeded IDs, so runs with the same seed hit the same rows.
+    return values[i * 7919 % len(values)]
+
+def ndjson(records):
+    return {"content": "".join(json.dumps(record) + "\n" for record in records), "headers": {"Content-Type": "application/x-ndjson"}}
+
+def history_body(i):
+    # Backfilled points a day or more in the past, between the seeded hourly points.
+    base = datetime.now(timezone.utc) - timedelta(days=1, seconds=30)
+    return {"points": [{"recorded_at": (base - timedelta(minutes=i * 100 + j)).isoformat(), "value": j % 100} for j in range(100)]}
+
+def batch_body(i, cat, ind):
+    # A new asset with indicators that refer to it, plus an update: the shape of a typical form save.
+    operations = [{"op": "insert", "entity": "assets", "values": {"name": f"{PREFIX} batch {i}", "type": ASSET_TYPES[2], "category_id": pick(cat, i)}}]
+    operations += [{"op": "insert", "entity": "indicators", "values": {"name": INDICATOR_NAMES[j], "value": j, "asset_id": {"ref": 0}}} for j in range(10)]
+    operations.append({"op": "update", "entity": "indicators", "id": pick(ind, i), "values": {"value": i % 100}})
+    return {"operations": operations}
+
+def route_benchmarks(ids):
+    # (name, heavy, request builder). Names are "METHOD /path" as declared in app.py, plus an optional [variant].
+    cat, asset, ind = ids["categories"], ids["assets"], ids["indicators"]
+    series, series_assets = ids["history_indicators"], ids["history_assets"]
+    rank_body = {
+        "criteria": [
+            {"indicator": INDICATOR_NAMES[0], "weight": 2, "direction": "max"},
+            {"indicator": INDICATOR_NAMES[1], "weight": 1, "direction": "min"},
+        ],
+        "method": "topsis",
+        "k": 10,
+        "category_ids": cat[:5],
+    }
+    return [
+        ("GET /assets", True, lambda i: "/assets"),
+        ("GET /assets [page]", False, lambda i: f"/assets?limit=100&after_id={pick(asset, i) - 1}"),
+        ("GET /assets [stream]", True, lambda i: "/assets?stream=true"),
+        ("GET /assets [arrow]", True, lambda i: ("GET", "/assets", ARROW)),
+        ("GET /assets/new", False, lambda i: f"/assets/new?name={PREFIX} new {i}&type={ASSET_TYPES[0]}&category_id={pick(cat, i)}"),
+        ("POST /assets/bulk", False, lambda i: ("POST", "/assets/bulk", ndjson(
+            {"name": f"{PREFIX} bulk {i} {j}", "type": ASSET_TYPES[1], "category_id": pick(cat, j)} for j in range(20)))),
+        ("GET /assets/search", False, lambda i: f"/assets/search?q={PREFIX} asset {i % 1000}"),
+        ("GET /assets/typeahead", False, lambda i: f"/assets/typeahead?q={PREFIX} asset {i % 100}"),
+        ("GET /assets/batch", False, lambda i: ("GET", "/assets/batch", {"params": [("asset_ids", pick(asset, i + j)) for j in range(200)]})),
+        ("GET /assets/{asset_id}", False, lambda i: f"/assets/{pick(asset, i)}"),
+        ("GET /assets/{asset_id}/history", False, lambda i: f"/assets/{pick(series_assets, i)}/history?points=500"),
+        ("GET /assets/{asset_id}/peers", False, lambda i: f"/assets/{pick(asset, i)}/peers"),
+        ("GET /assets/{asset_id}/update", False, lambda i: f"/assets/{pick(asset, i)}/update?type={ASSET_TYPES[i % len(ASSET_TYPES)]}"),
+        ("GET /assets/{asset_id}/delete", False, lambda i: f"/assets/{ids['victim_assets'].pop()}/delete"),
+        ("GET /assets/category_id/{category_id}", False, lambda i: f"/assets/category_id/{pick(cat, i)}"),
+        ("GET /assets/type/{type}", False, lambda i: f"/assets/type/{ASSET_TYPES[i % len(ASSET_TYPES)]}"),
+        ("GET /assets/name/{name}", False, lambda i: f"/assets/name/{PREFIX} asset {i % 1000}"),
+        ("GET /indicators", True, lambda i: "/indicators"),
+        ("GET /indicators [page]", False, lambda i: f"/indicators?limit=100&after_id={pick(ind, i) - 1}"),
+        ("GET /indicators [stream]", True, lambda i: "/indicators?stream=true"),
+        ("GET /indicators [arrow]", True, lambda i: ("GET", "/indicators", ARROW)),
+        ("GET /indicators/new", False, lambda i: f"/indicators/new?name={INDICATOR_NAMES[i % 30]}&value={i % 100}&asset_id={pick(asset, i)}"),
+        ("POST /indicators/bulk", False, lambda i: ("POST", "/indicators/bulk", ndjson(
+            {"name": INDICATOR_NAMES[j % 30], "value": j % 100, "asset_id": pick(asset, i + j)} for j in range(100)))),
+        ("GET /indicators/search", False, lambda i: f"/indicators/search?q={INDICATOR_NAMES[i % 30]}"),
+        ("GET /indicators/typeahead", False, lambda i: f"/indicators/typeahead?q={PREFIX}_ind_{i % 3}"),
+        ("GET /indicators/value", False, lambda i: f"/indicators/value?name={INDICATOR_NAMES[i % 30]}&min_value=40&max_value=41"),
+        ("GET /indicators/distribution", False, lambda i: f"/indicators/distribution?name={INDICATOR_NAMES[i % 30]}&bins=20"),
+        ("GET /indicators/batch", False, lambda i: ("GET", "/indicators/batch", {"params": [("asset_ids", pick(asset, i + j)) for j in range(200)]})),
+        ("GET /indicators/{indicator_id}", False, lambda i: f"/indicators/{pick(ind, i)}"),
+        ("GET /indicators/{indicator_id}/history", False, lambda i: f"/indicators/{pick(series, i)}/history?points=500"),
+        ("GET /indicators/{indicator_id}/history [avg]", False, lambda i: f"/indicators/{pick(series, i)}/history?points=500&method=avg"),
+        ("GET /indicators/{indicator_id}/history [arrow]", False, lambda i: ("GET", f"/indicators/{pick(series, i)}/history?points=500", ARROW)),
+        ("POST /indicators/{indicator_id}/history", False, lambda i: ("POST", f"/indicators/{pick(series, i)}/history", {"json": history_body(i)})),
+        ("GET /indicators/{indicator_id}/update", False, lambda i: f"/indicators/{pick(ind, i)}/update?value={i % 100}"),
+        ("GET /indicators/{indicator_id}/delete", False, lambda i: f"/indicators/{ids['victim_indicators'].pop()}/delete"),
+        ("GET /indicators/asset/{asset_id}", False, lambda i: f"/indicators/asset/{pick(asset, i)}"),
+        ("GET /indicators/name/{name}", False, lambda i: f"/indicators/name/{INDICATOR_NAMES[i % 30]}"),
+        ("GET /categories", False, lambda i: "/categories"),
+        ("GET /categories [arrow]", False, lambda i: ("GET", "/categories", ARROW)),
+        ("GET /categories/new", False, lambda i: f"/categories/new?name={PREFIX}_new_{i}&description=benchmark"),
+        ("GET /categories/{category_id}", False, lambda i: f"/categories/{pick(cat, i)}"),
+        ("GET /categories/{category_id}/indicator-stats", False, lambda i: f"/categories/{pick(cat, i)}/indicator-stats"),
+        ("GET /categories/{category_id}/update", False, lambda i: f"/categories/{cat[i % len(cat)]}/update?name={PREFIX}_category_{i % len(cat)}"),
+        ("GET /categories/{category_id}/delete", False, lambda i: f"/categories/{ids['victim_categories'].pop()}/delete"),
+        ("GET /decision/view", False, lambda i: f"/decision/view?category_ids={pick(cat, i)}&indicator_names={INDICATOR_NAMES[0]}"),
+        ("GET /decision/view [arrow]", False, lambda i: ("GET", f"/decision/view?category_ids={pick(cat, i)}", ARROW)),
+        ("GET /decision/matrix", True, lambda i: f"/decision/matrix?category_ids={pick(cat, i)}"),
+        ("POST /decision/rank", True, lambda i: ("POST", "/decision/rank", {"json": rank_body})),
+        ("GET /decision/indicator-names", True, lambda i: "/decision/indicator-names"),
+        ("POST /batch", False, lambda i: ("POST", "/batch", {"json": batch_body(i, cat, ind)})),
+        ("GET /export", False, lambda i: f"/export?category_ids={pick(cat, i)}"),
+        ("GET /export [ndjson]", False, lambda i: f"/export?format=ndjson&category_ids={pick(cat, i)}"),
+        ("GET /export [parquet]", False, lambda i: f"/export?format=parquet&category_ids={pick(cat, i)}"),
+        ("GET /export [all]", True, lambda i: "/export"),
+        ("GET /cache/stats", False, lambda i: "/cache/stats"),
+        ("GET /metrics", False, lambda i: "/metrics"),
+    ]
+
+def repository_benchmarks(ids):
+    # (name, heavy, call). Names are "Class.method", plus an optional [variant].
+    assets, categories, indicators, decision = AssetRepository(), CategoryRepository(), IndicatorRepository(), DecisionRepository()
+    cat, asset, ind = ids["categories"], ids["assets"], ids["indicators"]
+    return [
+        ("AssetRepository.get_assets", True, lambda i: assets.get_assets()),
+        ("AssetRepository.insert_asset", False, lambda i: assets.insert_asset(f"{PREFIX} repo {i}", ASSET_TYPES[0], pick(cat, i))),
+        ("AssetRepository.delete_asset", False, lambda i: assets.delete_asset(ids["victim_assets"].pop())),
+        ("AssetRepository.update_asset", False, lambda i: assets.update_asset(pick(asset, i), type=ASSET_TYPES[i % len(ASSET_TYPES)])),
+        ("AssetRepository.get_asset_by_id", False, lambda i: assets.get_asset_by_id(pick(asset, i))),
+        ("AssetRepository.get_assets_by_ids", False, lambda i: assets.get_assets_by_ids([pick(asset, i + j) for j in range(200)])),
+        ("AssetRepository.get_assets_by_category", False, lambda i: assets.get_assets_by_category(pick(cat, i))),
+        ("AssetRepository.get_assets_by_type", False, lambda i: assets.get_assets_by_type(ASSET_TYPES[i % len(ASSET_TYPES)])),
+        ("AssetRepository.get_assets_by_name", False, lambda i: assets.get_assets_by_name(f"{PREFIX} asset {i % 1000}")),
+        ("AssetRepository.search_assets", False, lambda i: assets.search_assets(f"{PREFIX} asset {i % 1000}")),
+        ("AssetRepository.get_assets_page", False, lambda i: assets.get_assets_page(100, pick(asset, i) - 1)),
+        ("AssetRepository.iter_assets", True, lambda i: sum(1 for _ in assets.iter_assets())),
+        ("AssetRepository.get_existing_category_ids", False, lambda i: assets.get_existing_category_ids(cat[:10])),
+        ("AssetRepository.copy_assets", False, lambda i: assets.copy_assets([(f"{PREFIX} copy {i} {j}", ASSET_TYPES[1], pick(cat, j)) for j in range(100)])),
+        ("AssetRepository.get_assets_table", True, lambda i: assets.get_assets_table()),
+        ("CategoryRepository.get_categories", False, lambda i: categories.get_categories()),
+        ("CategoryRepository.insert_category", False, lambda i: categories.insert_category(f"{PREFIX}_repo_{i}", "benchmark")),
+        ("CategoryRepository.delete_category", False, lambda i: categories.delete_category(ids["victim_categories"].pop())),
+        ("CategoryRepository.update_category", False, lambda i: categories.update_category(cat[i % len(cat)], f"{PREFIX}_category_{i % len(cat)}")),
+        ("CategoryRepository.get_category_by_id", False, lambda i: categories.get_category_by_id(pick(cat, i))),
+        ("CategoryRepository.get_categories_by_name", False, lambda i: categories.get_categories_by_name(f"{PREFIX}_category_{i % len(cat)}")),
+        ("CategoryRepository.get_categories_table", False, lambda i: categories.get_categories_table()),
+        ("IndicatorRepository.get_indicators", True, lambda i: indicators.get_indicators()),
+        ("IndicatorRepository.insert_indicator", False, lambda i: indicators.insert_indicator(INDICATOR_NAMES[i % 30], i % 100, pick(asset, i))),
+        ("IndicatorRepository.delete_indicator", False, lambda i: indicators.delete_indicator(ids["victim_indicators"].pop())),
+        ("IndicatorRepository.update_indicator", False, lambda i: indicators.update_indicator(pick(ind, i), value=i % 100)),
+        ("IndicatorRepository.get_indicator_by_id", False, lambda i: indicators.get_indicator_by_id(pick(ind, i))),
+        ("IndicatorRepository.get_indicators_by_name", False, lambda i: indicators.get_indicators_by_name(INDICATOR_NAMES[i % 30])),
+        ("IndicatorRepository.search_indicators", False, lambda i: indicators.search_indicators(INDICATOR_NAMES[i % 30])),
+        ("IndicatorRepository.get_indicator_names_by_prefix", False, lambda i: indicators.get_indicator_names_by_prefix(f"{PREFIX}_ind_{i % 3}")),
+        ("IndicatorRepository.get_indicators_by_asset", False, lambda i: indicators.get_indicators_by_asset(pick(asset, i))),
+        ("IndicatorRepository.get_indicators_by_assets", False, lambda i: indicators.get_indicators_by_assets([pick(asset, i + j) for j in range(200)])),
+        ("IndicatorRepository.get_indicators_by_value", False, lambda i: indicators.get_indicators_by_value(INDICATOR_NAMES[i % 30], 40, 41)),
+        ("IndicatorRepository.get_value_distribution", False, lambda i: indicators.get_value_distribution(INDICATOR_NAMES[i % 30], 20, (0.25, 0.5, 0.75))),
+        ("IndicatorRepository.get_indicators_page", False, lambda i: indicators.get_indicators_page(100, pick(ind, i) - 1)),
+        ("IndicatorRepository.iter_indicators", True, lambda i: sum(1 for _ in indicators.iter_indicators())),
+        ("IndicatorRepository.get_existing_asset_ids", False, lambda i: indicators.get_existing_asset_ids(asset[:100])),
+        ("IndicatorRepository.copy_indicators", False, lambda i: indicators.copy_indicators([(INDICATOR_NAMES[j % 30], j % 100, pick(asset, i + j)) for j in range(1000)])),
+        ("IndicatorRepository.get_indicators_table", True, lambda i: indicators.get_indicators_table()),
+        ("DecisionRepository.get_decision_view", False, lambda i: decision.get_decision_view(category_ids=[pick(cat, i)], indicator_names=[INDICATOR_NAMES[0]])),
+        ("DecisionRepository.get_decision_view_table", False, lambda i: decision.get_decision_view_table(category_ids=[pick(cat, i)])),
+        ("DecisionRepository.get_indicator_names", True, lambda i: decision.get_indicator_names()),
+        ("DecisionRepository.get_matrix_columns", True, lambda i: decision.get_matrix_columns(category_ids=[pick(cat, i)])),
+    ]
+
+def unmeasured_routes(measured):
+    from app import app
+    declared = {f"{method} {route.path}" for route in app.routes for method in getattr(route, "methods", ()) if method != "HEAD"}
+    declared -= {"GET /openapi.json", "GET /docs", "GET /docs/oauth2-redirect", "GET /redoc"}
+    # /changes is a long-lived event stream with no per-request latency to measure.
+    declared -= {"GET /changes"}
+    return sorted(declared - {name.split(" [")[0] for name in measured})
+
+def unmeasured_methods(measured):
+    covered = {name.split(" [")[0] for name in measured}
+    missing = []
+    for repository in (AssetRepository, CategoryRepository, IndicatorRepository, DecisionRepository):
+        for method, _ in inspect.getmembers(repository, inspect.isfunction):
+            # build_* only assemble SQL strings and are exercised by the query methods.
+            if not method.startswith(("_", "build_")) and f"{repository.__name__}.{method}" not in covered:
+                missing.append(f"{repository.__name__}.{method}")
+    return missing
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP and repository benchmark suite")
+    parser.add_argument("--indicators", type=int, default=100000, help="seeded indicators, e.g. 1000, 100000 or 1000000")
+    parser.add_argument("--assets", type=int, default=None, help="seeded assets (default: indicators / 50)")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="requests or calls per benchmark")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--only", choices=("routes", "repositories"), default=None)
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this text")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", default=None, help="baseline result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    assets = args.assets or max(10, args.indicators // 50)
+    heavy_requests = max(3, int(args.requests * HEAVY_SHARE))
+    Migrations().migrate()
+    cleanup()
+    ids = seed(args.categories, assets, args.indicators, 2 * args.requests, random.Random(args.seed))
+
+    results = {}
+    try:
+        if args.only != "repositories":
+            routes = [benchmark for benchmark in route_benchmarks(ids) if not args.filter or args.filter in benchmark[0]]
+            with run_server("app:app", port=args.port, workers=args.workers) as base_url:
+                for name, heavy, build in routes:
+                    total = heavy_requests if heavy else args.requests
+                    requests = [build(i) for i in range(total)]
+                    results[name] = run_load(base_url, requests, total=total, concurrency=args.concurrency, timeout=300)
+                    print(f"{name}: {results[name]['rps']} req/s, p95 {results[name]['p95_ms']} ms", file=sys.stderr)
+        if args.only != "routes":
+            for name, heavy, call in repository_benchmarks(ids):
+                if args.filter and args.filter not in name:
+                    continue
+                total = heavy_requests if heavy else args.requests
+                results[name] = run_calls(call, total=total, concurrency=args.concurrency)
+                print(f"{name}: {results[name]['rps']} calls/s, p95 {results[name]['p95_ms']} ms", file=sys.stderr)
+    finally:
+        if not args.keep:
+            cleanup()
+        Connection.close_pool()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "indicators": args.indicators,
+            "assets": assets,
+            "categories": args.categories,
+            "requests": args.requests,
+            "heavy_requests": heavy_requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "seed": args.seed,
+            "unmeasured_routes": unmeasured_routes(results) if args.only != "repositories" and not args.filter else None,
+            "unmeasured_methods": unmeasured_methods(results) if args.only != "routes" and not args.filter else None,
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as file:
+            report["comparison"] = compare(json.load(file), report, args.threshold)
+        report["regressions"] = regressions(report["comparison"])
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(json.dumps({"output": args.output, "benchmarks": len(results), "regressions": report.get("regressions")}, indent=2))
+    if report.get("regressions"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
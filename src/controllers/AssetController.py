@@ -1,13 +1,23 @@
+import asyncio
+from collections.abc import Iterator, AsyncIterator, Iterable, AsyncIterable
+import pyarrow as pa
 from src.models.Asset import Asset
-from src.data_acess.AssetRepository import AssetRepository
+from src.data_acess.AssetRepository import AssetRepository, ASSET_SCHEMA
+from src.data_acess.AsyncAssetRepository import AsyncAssetRepository
+from src.infra.Cache import Cache
+from src.controllers.BulkIngestion import RecordParser, BulkReport, keep_known, iter_lines, iter_async_chunks, to_int
 
 import logging
 logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
 
+ASSET_FIELDS = ("name", "type", "category_id")
+
 class AssetController:
     def __init__(self):
         try:
             self.asset_repository = AssetRepository()
+            self.async_asset_repository = AsyncAssetRepository()
+            self.cache = Cache.shared()
         except Exception as e:
             logging.error("Error initializing AssetController: %s", e)
             raise
@@ -15,7 +25,7 @@ class AssetController:
     def get_assets(self) -> list[Asset]:
         try:
             assets = self.asset_repository.get_assets()
-            return [Asset(asset[0], asset[1], asset[2], asset[3]) for asset in assets]
+            return assets
         except Exception as e:
             logging.error("Error getting assets: %s", e)
             return []
@@ -40,19 +50,28 @@ class AssetController:
 
     def get_asset_by_id(self, asset_id: int) -> Asset | None:
         try:
-            asset = self.asset_repository.get_asset_by_id(asset_id)
+            asset = self.cache.get_or_load(("asset", asset_id), lambda: self.asset_repository.get_asset_by_id(asset_id))
             if asset:
-                return Asset(asset[0], asset[1], asset[2], asset[3])
+                return asset
             logging.warning("No asset found with ID: %s", asset_id)
             return None
         except Exception as e:
             logging.error("Error getting asset by ID (%s): %s", asset_id, e)
             return None
 
+    def get_assets_by_ids(self, asset_ids: list[int]) -> dict[int, Asset]:
+        try:
+            # Cached assets are served from memory; the rest are fetched together in one query.
+            assets = self.cache.get_many_or_load("asset", list(dict.fromkeys(asset_ids)), self.asset_repository.get_assets_by_ids)
+            return {asset_id: asset for asset_id, asset in assets.items() if asset}
+        except Exception as e:
+            logging.error("Error getting assets by IDs (%d IDs): %s", len(asset_ids), e)
+            return {}
+
     def get_assets_by_category(self, category_id: str) -> list[Asset]:
         try:
-            assets = self.asset_repository.get_assets_by_category(category_id)
-            return [Asset(asset[0], asset[1], asset[2], asset[3]) for asset in assets]
+            assets = self.cache.get_or_load(("assets_by_category", category_id), lambda: self.asset_repository.get_assets_by_category(category_id))
+            return assets
         except Exception as e:
             logging.error("Error getting assets by category (%s): %s", category_id, e)
             return []
@@ -60,15 +79,203 @@ class AssetController:
     def get_assets_by_type(self, type: str) -> list[Asset]:
         try:
             assets = self.asset_repository.get_assets_by_type(type)
-            return [Asset(asset[0], asset[1], asset[2], asset[3]) for asset in assets]
+            return assets
+        except Exception as e:
+            logging.error("Error getting assets by type (%s): %s", type, e)
+            return []
+
+    def get_assets_by_name(self, name: str, limit: int = 100) -> list[Asset]:
+        try:
+            return self.asset_repository.get_assets_by_name(name, limit)
+        except Exception as e:
+            logging.error("Error getting assets by name (%s): %s", name, e)
+            return []
+
+    def search_assets(self, text: str, limit: int = 20) -> list[Asset]:
+        try:
+            return self.asset_repository.search_assets(text, limit)
+        except Exception as e:
+            logging.error("Error searching assets (%s): %s", text, e)
+            return []
+
+    def typeahead_assets(self, text: str, limit: int = 10) -> list[Asset]:
+        try:
+            return self.asset_repository.search_assets(text, limit, typeahead=True)
+        except Exception as e:
+            logging.error("Error getting asset suggestions (%s): %s", text, e)
+            return []
+
+    def get_assets_page(self, limit: int, after_id: int = None) -> dict:
+        try:
+            assets = self.asset_repository.get_assets_page(limit, after_id)
+            next_after_id = assets[-1].id if len(assets) == limit else None
+            return {"items": assets, "next_after_id": next_after_id}
+        except Exception as e:
+            logging.error("Error getting assets page (after ID: %s): %s", after_id, e)
+            return {"items": [], "next_after_id": None}
+
+    def iter_assets(self, after_id: int = None, chunk_size: int = 1000) -> Iterator[Asset]:
+        yield from self.asset_repository.iter_assets(after_id, chunk_size)
+
+    def _validate_asset(self, record: dict) -> tuple:
+        name = str(record.get("name") or "").strip()
+        type = str(record.get("type") or "").strip()
+        if not name or len(name) > 100:
+            raise ValueError("name must have between 1 and 100 characters")
+        if not type or len(type) > 50:
+            raise ValueError("type must have between 1 and 50 characters")
+        category_id = record.get("category_id")
+        if category_id in (None, ""):
+            return (name, type, None)
+        try:
+            return (name, type, to_int(category_id))
+        except (TypeError, ValueError):
+            raise ValueError("category_id must be an integer")
+
+    def bulk_insert_assets(self, lines: Iterable[str], format: str = "ndjson", batch_size: int = 5000) -> dict:
+        report = BulkReport()
+        try:
+            parser = RecordParser(format, ASSET_FIELDS)
+            batch = []
+            for line_number, record, error in parser.iter_records(lines):
+                if error is None:
+                    try:
+                        row = self._validate_asset(record)
+                    except (TypeError, ValueError) as e:
+                        error = str(e)
+                if error is not None:
+                    report.reject(line_number, error)
+                    continue
+                batch.append((line_number, row))
+                if len(batch) >= batch_size:
+                    self._write_asset_batch(batch, report)
+                    batch = []
+            if batch:
+                self._write_asset_batch(batch, report)
+        except Exception as e:
+            logging.error("Error in bulk asset ingestion: %s", e)
+        return report.to_dict()
+
+    def _write_asset_batch(self, batch: list, report: BulkReport) -> None:
+        known = self.asset_repository.get_existing_category_ids({row[2] for _, row in batch if row[2] is not None})
+        valid = keep_known(batch, 2, known, report, "category_id")
+        if valid and self.asset_repository.copy_assets([row for _, row in valid]):
+            report.inserted += len(valid)
+        else:
+            for line_number, _ in valid:
+                report.reject(line_number, "Batch could not be written to the database")
+
+    def get_assets_table(self) -> pa.Table:
+        try:
+            return self.asset_repository.get_assets_table()
+        except Exception as e:
+            logging.error("Error getting assets table: %s", e)
+            return ASSET_SCHEMA.empty_table()
+
+    async def get_assets_async(self) -> list[Asset]:
+        try:
+            assets = await self.async_asset_repository.get_assets()
+            return assets
+        except Exception as e:
+            logging.error("Error getting assets: %s", e)
+            return []
+
+    async def insert_asset_async(self, name: str, type: str, category_id: str) -> None:
+        try:
+            await self.async_asset_repository.insert_asset(name, type, category_id)
+        except Exception as e:
+            logging.error("Error inserting asset (name: %s, type: %s, category: %s): %s", name, type, category_id, e)
+
+    async def delete_asset_async(self, asset_id: int) -> None:
+        try:
+            await self.async_asset_repository.delete_asset(asset_id)
+        except Exception as e:
+            logging.error("Error deleting asset (ID: %s): %s", asset_id, e)
+
+    async def update_asset_async(self, asset_id: int, name: str = None, type: str = None, category_id: str = None) -> None:
+        try:
+            await self.async_asset_repository.update_asset(asset_id, name, type, category_id)
+        except Exception as e:
+            logging.error("Error updating asset (ID: %s): %s", asset_id, e)
+
+    async def get_asset_by_id_async(self, asset_id: int) -> Asset | None:
+        try:
+            asset = await self.cache.get_or_load_async(("asset", asset_id), lambda: self.async_asset_repository.get_asset_by_id(asset_id))
+            if asset:
+                return asset
+            logging.warning("No asset found with ID: %s", asset_id)
+            return None
+        except Exception as e:
+            logging.error("Error getting asset by ID (%s): %s", asset_id, e)
+            return None
+
+    async def get_assets_by_ids_async(self, asset_ids: list[int]) -> dict[int, Asset]:
+        try:
+            assets = await self.cache.get_many_or_load_async("asset", list(dict.fromkeys(asset_ids)), self.async_asset_repository.get_assets_by_ids)
+            return {asset_id: asset for asset_id, asset in assets.items() if asset}
+        except Exception as e:
+            logging.error("Error getting assets by IDs (%d IDs): %s", len(asset_ids), e)
+            return {}
+
+    async def get_assets_by_category_async(self, category_id: str) -> list[Asset]:
+        try:
+            assets = await self.cache.get_or_load_async(("assets_by_category", category_id), lambda: self.async_asset_repository.get_assets_by_category(category_id))
+            return assets
+        except Exception as e:
+            logging.error("Error getting assets by category (%s): %s", category_id, e)
+            return []
+
+    async def get_assets_by_type_async(self, type: str) -> list[Asset]:
+        try:
+            assets = await self.async_asset_repository.get_assets_by_type(type)
+            return assets
         except Exception as e:
             logging.error("Error getting assets by type (%s): %s", type, e)
             return []
 
-    def get_assets_by_name(self, name: str) -> list[Asset]:
+    async def get_assets_by_name_async(self, name: str, limit: int = 100) -> list[Asset]:
         try:
-            assets = self.asset_repository.get_assets_by_name(name)
-            return [Asset(asset[0], asset[1], asset[2], asset[3]) for asset in assets]
+            return await self.async_asset_repository.get_assets_by_name(name, limit)
         except Exception as e:
             logging.error("Error getting assets by name (%s): %s", name, e)
             return []
+
+    async def search_assets_async(self, text: str, limit: int = 20) -> list[Asset]:
+        try:
+            return await self.async_asset_repository.search_assets(text, limit)
+        except Exception as e:
+            logging.error("Error searching assets (%s): %s", text, e)
+            return []
+
+    async def typeahead_assets_async(self, text: str, limit: int = 10) -> list[Asset]:
+        try:
+            return await self.async_asset_repository.search_assets(text, limit, typeahead=True)
+        except Exception as e:
+            logging.error("Error getting asset suggestions (%s): %s", text, e)
+            return []
+
+    async def get_assets_page_async(self, limit: int, after_id: int = None) -> dict:
+        try:
+            assets = await self.async_asset_repository.get_assets_page(limit, after_id)
+            next_after_id = assets[-1].id if len(assets) == limit else None
+            return {"items": assets, "next_after_id": next_after_id}
+        except Exception as e:
+            logging.error("Error getting assets page (after ID: %s): %s", after_id, e)
+            return {"items": [], "next_after_id": None}
+
+    async def iter_assets_async(self, after_id: int = None, chunk_size: int = 1000) -> AsyncIterator[Asset]:
+        async for asset in self.async_asset_repository.iter_assets(after_id, chunk_size):
+            yield asset
+
+    async def bulk_insert_assets_async(self, chunks: AsyncIterable[bytes], format: str = "ndjson", batch_size: int = 5000) -> dict:
+        # Parsing and validating every record is CPU-bound, so the whole ingestion runs in a worker
+        # thread; the body is still read on the event loop, one chunk at a time as the thread asks.
+        lines = iter_lines(iter_async_chunks(chunks, asyncio.get_running_loop()))
+        return await asyncio.to_thread(self.bulk_insert_assets, lines, format, batch_size)
+
+    async def get_assets_table_async(self) -> pa.Table:
+        try:
+            return await self.async_asset_repository.get_assets_table()
+        except Exception as e:
+            logging.error("Error getting assets table: %s", e)
+            return ASSET_SCHEMA.empty_table()
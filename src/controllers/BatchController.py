@@ -0,0 +1,51 @@
+from src.data_acess.UnitOfWork import UnitOfWork, Ref
+from src.data_acess.AsyncUnitOfWork import AsyncUnitOfWork
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def to_ref(value):
+    # {"ref": n} in a batch stands for the ID of operation n.
+    return Ref(value["ref"]) if isinstance(value, dict) and "ref" in value else value
+
+def queue_operations(unit, operations):
+    # Returns the report of the first invalid operation, or None when all of them were queued.
+    for index, operation in enumerate(operations):
+        try:
+            values = {field: to_ref(value) for field, value in (operation.get("values") or {}).items()}
+            unit.queue(operation["op"], operation["entity"], to_ref(operation.get("id")), values)
+        except ValueError as e:
+            return {"committed": False, "operation": index, "error": str(e)}
+    return None
+
+class BatchController:
+    def __init__(self):
+        try:
+            self.unit_of_work = UnitOfWork
+            self.async_unit_of_work = AsyncUnitOfWork
+        except Exception as e:
+            logging.error("Error initializing BatchController: %s", e)
+            raise
+
+    def apply_batch(self, operations: list[dict]) -> dict:
+        # Applies every operation in one transaction; on any failure none of them is.
+        try:
+            unit = self.unit_of_work()
+            invalid = queue_operations(unit, operations)
+            if invalid:
+                return invalid
+            return {"committed": True, "ids": unit.commit()}
+        except Exception as e:
+            logging.error("Error applying batch of %d operations: %s", len(operations), e)
+            return {"committed": False, "error": str(e)}
+
+    async def apply_batch_async(self, operations: list[dict]) -> dict:
+        try:
+            unit = self.async_unit_of_work()
+            invalid = queue_operations(unit, operations)
+            if invalid:
+                return invalid
+            return {"committed": True, "ids": await unit.commit()}
+        except Exception as e:
+            logging.error("Error applying batch of %d operations: %s", len(operations), e)
+            return {"committed": False, "error": str(e)}
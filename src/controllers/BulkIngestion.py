@@ -0,0 +1,125 @@
+from collections.abc import AsyncIterable, Iterable, Iterator
+import asyncio
+import codecs
+import csv
+import json
+
+MAX_REPORTED_REJECTIONS = 1000
+
+class RecordParser:
+    def __init__(self, format: str, fields: tuple[str, ...]):
+        if format not in ("ndjson", "csv"):
+            raise ValueError(f"Unsupported format: {format}")
+        self.format = format
+        self.fields = fields
+        self.header = None
+
+    def iter_records(self, lines: Iterable[str]) -> Iterator[tuple[int, dict | None, str | None]]:
+        # Yields (line_number, record, error) for every record of the stream, with exactly one of
+        # record and error set; the line number is the record's first line. Blank lines and the CSV
+        # header carry no record. Lines must keep their line endings: the whole stream goes through
+        # one csv.reader, so a quoted field may span lines.
+        if self.format == "ndjson":
+            for line_number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield line_number, None, str(e)
+                    continue
+                if isinstance(record, dict):
+                    yield line_number, record, None
+                else:
+                    yield line_number, None, "Expected a JSON object"
+            return
+        reader = csv.reader(lines, strict=True)
+        while True:
+            line_number = reader.line_num + 1
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield line_number, None, f"Malformed CSV: {e}"
+                continue
+            if not values:
+                continue
+            if self.header is None:
+                self.header = [value.strip() for value in values]
+                missing = [field for field in self.fields if field not in self.header]
+                if missing:
+                    yield line_number, None, f"CSV header is missing columns: {', '.join(missing)}"
+                continue
+            if len(values) != len(self.header):
+                yield line_number, None, f"Expected {len(self.header)} columns, got {len(values)}"
+                continue
+            yield line_number, dict(zip(self.header, values)), None
+
+def to_int(value) -> int:
+    # Whole numbers only, like FileImporter.convert: 3, "3" and 3.0 are accepted, while 3.7 is
+    # rejected instead of being truncated to 3.
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} is not an integer")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not an integer")
+    return int(number)
+
+class BulkReport:
+    def __init__(self):
+        self.inserted = 0
+        self.rejected_count = 0
+        self.rejected = []
+
+    def reject(self, line_number: int, error: str) -> None:
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTIONS:
+            self.rejected.append({"line": line_number, "error": error})
+
+    def to_dict(self) -> dict:
+        return {"inserted": self.inserted, "rejected_count": self.rejected_count, "rejected": self.rejected}
+
+def keep_known(batch, key_index, known_keys, report, label):
+    # Drops rows whose foreign key is unknown, so one bad row cannot fail the whole COPY.
+    valid = []
+    for line_number, row in batch:
+        if row[key_index] is None or row[key_index] in known_keys:
+            valid.append((line_number, row))
+        else:
+            report.reject(line_number, f"{label} {row[key_index]} does not exist")
+    return valid
+
+def iter_lines(chunks):
+    # Lines keep their endings, as csv.reader expects.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    for chunk in chunks:
+        buffer += decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+def iter_async_chunks(chunks: AsyncIterable, loop: asyncio.AbstractEventLoop) -> Iterator:
+    # Consumes an async stream (a request body) from a worker thread: each chunk is awaited on the
+    # event loop while the thread waits, so the body is still read as the thread needs it.
+    iterator = aiter(chunks)
+
+    async def next_chunk():
+        return await anext(iterator)
+
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(next_chunk(), loop).result()
+        except StopAsyncIteration:
+            return
@@ -1,5 +1,8 @@
+import pyarrow as pa
 from src.models.Category import Category
-from src.data_acess.CategoryRepository import CategoryRepository
+from src.data_acess.CategoryRepository import CategoryRepository, CATEGORY_SCHEMA
+from src.data_acess.AsyncCategoryRepository import AsyncCategoryRepository
+from src.infra.Cache import Cache
 
 import logging
 logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -8,14 +11,16 @@ class CategoryController:
     def __init__(self):
         try:
             self.category_repository = CategoryRepository()
+            self.async_category_repository = AsyncCategoryRepository()
+            self.cache = Cache.shared()
         except Exception as e:
             logging.error("Error initializing CategoryController: %s", e)
             raise
 
     def get_categories(self) -> list[Category]:
         try:
-            categories = self.category_repository.get_categories()
-            return [Category(cat[0], cat[1], cat[2]) for cat in categories]
+            categories = self.cache.get_or_load(("categories",), self.category_repository.get_categories)
+            return categories
         except Exception as e:
             logging.error("Error getting categories: %s", e)
             return []
@@ -40,11 +45,62 @@ class CategoryController:
 
     def get_category_by_id(self, category_id: int) -> Category | None:
         try:
-            category = self.category_repository.get_category_by_id(category_id)
+            category = self.cache.get_or_load(("category", category_id), lambda: self.category_repository.get_category_by_id(category_id))
             if category:
-                return Category(category[0], category[1])
+                return category
             logging.warning("No category found with ID: %s", category_id)
             return None
         except Exception as e:
             logging.error("Error getting category by ID (%s): %s", category_id, e)
-            return None
\ No newline at end of file
+            return None
+
+    def get_categories_table(self) -> pa.Table:
+        try:
+            return self.category_repository.get_categories_table()
+        except Exception as e:
+            logging.error("Error getting categories table: %s", e)
+            return CATEGORY_SCHEMA.empty_table()
+
+    async def get_categories_async(self) -> list[Category]:
+        try:
+            categories = await self.cache.get_or_load_async(("categories",), self.async_category_repository.get_categories)
+            return categories
+        except Exception as e:
+            logging.error("Error getting categories: %s", e)
+            return []
+
+    async def insert_category_async(self, name: str, description: str) -> None:
+        try:
+            await self.async_category_repository.insert_category(name, description)
+        except Exception as e:
+            logging.error("Error inserting category (name: %s): %s", name, e)
+
+    async def delete_category_async(self, category_id: int) -> None:
+        try:
+            await self.async_category_repository.delete_category(category_id)
+        except Exception as e:
+            logging.error("Error deleting category (ID: %s): %s", category_id, e)
+
+    async def update_category_async(self, category_id: int, name: str = None) -> None:
+        try:
+            await self.async_category_repository.update_category(category_id, name)
+        except Exception as e:
+            logging.error("Error updating category (ID: %s): %s", category_id, e)
+
+    async def get_category_by_id_async(self, category_id: int) -> Category | None:
+        try:
+            category = await self.cache.get_or_load_async(("category", category_id), lambda: self.async_category_repository.get_category_by_id(category_id))
+            if category:
+                return category
+            logging.warning("No category found with ID: %s", category_id)
+            return None
+        except Exception as e:
+            logging.error("Error getting category by ID (%s): %s", category_id, e)
+            return None
+
+    async def get_categories_table_async(self) -> pa.Table:
+        try:
+            return await self.async_category_repository.get_categories_table()
+        except Exception as e:
+            logging.error("Error getting categories table: %s", e)
+            return CATEGORY_SCHEMA.empty_table()
@@ -0,0 +1,52 @@
+from src.models.CategoryIndicatorStats import CategoryIndicatorStats
+from src.models.PeerComparison import PeerComparison
+from src.data_acess.CategoryStatsRepository import CategoryStatsRepository
+from src.data_acess.AsyncCategoryStatsRepository import AsyncCategoryStatsRepository
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def to_comparison(row) -> PeerComparison:
+    indicator_id, name, value, category_id, *stats = row
+    if category_id is None:
+        return PeerComparison(indicator_id, name, value, None, None)
+    peers = CategoryIndicatorStats(category_id, *stats)
+    z_score = (value - peers.mean) / peers.stddev if value is not None and peers.stddev else None
+    return PeerComparison(indicator_id, name, value, z_score, peers)
+
+class CategoryStatsController:
+    def __init__(self):
+        try:
+            self.stats_repository = CategoryStatsRepository()
+            self.async_stats_repository = AsyncCategoryStatsRepository()
+        except Exception as e:
+            logging.error("Error initializing CategoryStatsController: %s", e)
+            raise
+
+    def get_category_stats(self, category_id: int, names: list[str] = None) -> list[CategoryIndicatorStats]:
+        try:
+            return self.stats_repository.get_category_stats(category_id, names)
+        except Exception as e:
+            logging.error("Error getting indicator statistics of category (ID: %s): %s", category_id, e)
+            return []
+
+    async def get_category_stats_async(self, category_id: int, names: list[str] = None) -> list[CategoryIndicatorStats]:
+        try:
+            return await self.async_stats_repository.get_category_stats(category_id, names)
+        except Exception as e:
+            logging.error("Error getting indicator statistics of category (ID: %s): %s", category_id, e)
+            return []
+
+    def get_peer_comparison(self, asset_id: int) -> list[PeerComparison]:
+        try:
+            return [to_comparison(row) for row in self.stats_repository.get_peer_rows(asset_id)]
+        except Exception as e:
+            logging.error("Error comparing asset with its category (ID: %s): %s", asset_id, e)
+            return []
+
+    async def get_peer_comparison_async(self, asset_id: int) -> list[PeerComparison]:
+        try:
+            return [to_comparison(row) for row in await self.async_stats_repository.get_peer_rows(asset_id)]
+        except Exception as e:
+            logging.error("Error comparing asset with its category (ID: %s): %s", asset_id, e)
+            return []
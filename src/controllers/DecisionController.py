@@ -0,0 +1,146 @@
+import asyncio
+import numpy as np
+import pyarrow as pa
+from src.models.DecisionRow import DecisionRow
+from src.models.IndicatorMatrix import IndicatorMatrix
+from src.controllers import Ranking
+from src.data_acess.DecisionRepository import DecisionRepository, DECISION_VIEW_SCHEMA
+from src.data_acess.AsyncDecisionRepository import AsyncDecisionRepository
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class DecisionController:
+    def __init__(self):
+        try:
+            self.decision_repository = DecisionRepository()
+            self.async_decision_repository = AsyncDecisionRepository()
+        except Exception as e:
+            logging.error("Error initializing DecisionController: %s", e)
+            raise
+
+    def get_decision_view(self, asset_ids: list[int] = None, category_ids: list[int] = None, indicator_names: list[str] = None, limit: int = None) -> list[DecisionRow]:
+        try:
+            return self.decision_repository.get_decision_view(asset_ids, category_ids, indicator_names, limit)
+        except Exception as e:
+            logging.error("Error getting decision view: %s", e)
+            return []
+
+    def get_decision_view_table(self, asset_ids: list[int] = None, category_ids: list[int] = None, indicator_names: list[str] = None, limit: int = None) -> pa.Table:
+        try:
+            return self.decision_repository.get_decision_view_table(asset_ids, category_ids, indicator_names, limit)
+        except Exception as e:
+            logging.error("Error getting decision view table: %s", e)
+            return DECISION_VIEW_SCHEMA.empty_table()
+
+    def get_indicator_names(self) -> list[str]:
+        try:
+            return self.decision_repository.get_indicator_names()
+        except Exception as e:
+            logging.error("Error getting indicator names: %s", e)
+            return []
+
+    def build_matrix(self, columns, assets) -> IndicatorMatrix:
+        # Columns arrive sorted by indicator name, each with its asset IDs and values as packed
+        # arrays (see get_matrix_columns), so no Python object is created per cell. Assets arrive
+        # sorted by ID from the same snapshot, so every asset of a column is among them.
+        if not columns:
+            return IndicatorMatrix([], [], [], np.empty((0, 0)))
+        asset_ids = np.fromiter((asset_id for asset_id, _ in assets), dtype=np.int64, count=len(assets))
+        matrix = np.full((len(asset_ids), len(columns)), np.nan)
+        present = np.zeros(len(asset_ids), dtype=bool)
+        for index, (_, column_ids, values) in enumerate(columns):
+            rows = np.searchsorted(asset_ids, np.frombuffer(column_ids, dtype=">i8"))
+            matrix[rows, index] = np.frombuffer(values, dtype=">f8")
+            present[rows] = True
+        # Assets that passed the filters but have none of the indicators get no row.
+        rows = np.flatnonzero(present)
+        return IndicatorMatrix(asset_ids[rows].tolist(), [assets[row][1] for row in rows.tolist()], [name for name, _, _ in columns], matrix[rows])
+
+    def get_matrix(self, category_ids: list[int] = None, asset_types: list[str] = None, asset_ids: list[int] = None, indicator_names: list[str] = None) -> IndicatorMatrix:
+        try:
+            columns, assets = self.decision_repository.get_matrix_columns(asset_ids, category_ids, indicator_names, asset_types)
+            return self.build_matrix(columns, assets)
+        except Exception as e:
+            logging.error("Error building indicator matrix: %s", e)
+            return self.build_matrix([], [])
+
+    def score_matrix(self, matrix: IndicatorMatrix, criteria: list[dict], method: str = "topsis", k: int = 10) -> dict:
+        names = [criterion["indicator"] for criterion in criteria]
+        if not matrix.asset_ids:
+            return {"method": method, "evaluated": 0, "excluded": 0, "results": []}
+        # A criterion no matched asset has cannot be scored; reported (422) instead of ranking nothing.
+        unknown = sorted(set(names) - set(matrix.indicators))
+        if unknown:
+            return {"method": method, "error": f"Unknown indicators: {', '.join(unknown)}", "unknown_indicators": unknown}
+        columns = [matrix.indicators.index(name) for name in names]
+
+        values = matrix.values[:, columns]
+        # Assets missing any of the ranked indicators cannot be compared and are left out.
+        complete = ~np.isnan(values).any(axis=1)
+        values = values[complete]
+        rows = np.flatnonzero(complete)
+        if not len(rows):
+            return {"method": method, "evaluated": 0, "excluded": len(matrix.asset_ids), "results": []}
+
+        weights = [criterion["weight"] for criterion in criteria]
+        benefit = np.array([criterion["direction"] == "max" for criterion in criteria])
+        scores = Ranking.score(values, weights, benefit, method)
+
+        results = []
+        for position, best in enumerate(Ranking.top_k(scores, k), start=1):
+            row = rows[best]
+            results.append({
+                "rank": position,
+                "asset_id": matrix.asset_ids[row],
+                "asset_name": matrix.asset_names[row],
+                "score": float(scores[best]),
+                "values": dict(zip(names, values[best].tolist())),
+            })
+        return {"method": method, "evaluated": len(rows), "excluded": len(matrix.asset_ids) - len(rows), "results": results}
+
+    def rank_assets(self, criteria: list[dict], method: str = "topsis", k: int = 10, category_ids: list[int] = None, asset_types: list[str] = None) -> dict:
+        try:
+            matrix = self.get_matrix(category_ids, asset_types, None, [criterion["indicator"] for criterion in criteria])
+            return self.score_matrix(matrix, criteria, method, k)
+        except Exception as e:
+            logging.error("Error ranking assets (method: %s): %s", method, e)
+            return {"method": method, "evaluated": 0, "excluded": 0, "results": []}
+
+    async def get_decision_view_async(self, asset_ids: list[int] = None, category_ids: list[int] = None, indicator_names: list[str] = None, limit: int = None) -> list[DecisionRow]:
+        try:
+            return await self.async_decision_repository.get_decision_view(asset_ids, category_ids, indicator_names, limit)
+        except Exception as e:
+            logging.error("Error getting decision view: %s", e)
+            return []
+
+    async def get_decision_view_table_async(self, asset_ids: list[int] = None, category_ids: list[int] = None, indicator_names: list[str] = None, limit: int = None) -> pa.Table:
+        try:
+            return await self.async_decision_repository.get_decision_view_table(asset_ids, category_ids, indicator_names, limit)
+        except Exception as e:
+            logging.error("Error getting decision view table: %s", e)
+            return DECISION_VIEW_SCHEMA.empty_table()
+
+    async def get_indicator_names_async(self) -> list[str]:
+        try:
+            return await self.async_decision_repository.get_indicator_names()
+        except Exception as e:
+            logging.error("Error getting indicator names: %s", e)
+            return []
+
+    async def get_matrix_async(self, category_ids: list[int] = None, asset_types: list[str] = None, asset_ids: list[int] = None, indicator_names: list[str] = None) -> IndicatorMatrix:
+        try:
+            columns, assets = await self.async_decision_repository.get_matrix_columns(asset_ids, category_ids, indicator_names, asset_types)
+            # Building a large matrix takes a moment of CPU; it runs in a worker thread so the event loop keeps serving.
+            return await asyncio.to_thread(self.build_matrix, columns, assets)
+        except Exception as e:
+            logging.error("Error building indicator matrix: %s", e)
+            return self.build_matrix([], [])
+
+    async def rank_assets_async(self, criteria: list[dict], method: str = "topsis", k: int = 10, category_ids: list[int] = None, asset_types: list[str] = None) -> dict:
+        try:
+            matrix = await self.get_matrix_async(category_ids, asset_types, None, [criterion["indicator"] for criterion in criteria])
+            return await asyncio.to_thread(self.score_matrix, matrix, criteria, method, k)
+        except Exception as e:
+            logging.error("Error ranking assets (method: %s): %s", method, e)
+            return {"method": method, "evaluated": 0, "excluded": 0, "results": []}
@@ -0,0 +1,44 @@
+import numpy as np
+
+# Downsampling of time series for charts. x holds timestamps as int64 microseconds and y the
+# values; series_ids marks which series each row belongs to, with rows sorted by series then x.
+
+METHODS = ("lttb", "avg")
+
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last points and, from each bucket in
+    # between, the point forming the largest triangle with the previous pick and the next bucket's mean.
+    # Peaks and dips survive, unlike with bucket averages.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = (x - x[0]).astype(np.float64)
+    y = y.astype(np.float64)
+    every = (n - 2) / (threshold - 2)
+    # Bucket b spans starts[b]:starts[b + 1]; the last start is the final point on its own.
+    starts = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    starts[-1] = n - 1
+    counts = np.diff(np.append(starts, n))
+    # Only the pick depends on the previous one, so the bucket means are computed up front.
+    mean_x = np.add.reduceat(x, starts) / counts
+    mean_y = np.add.reduceat(y, starts) / counts
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = starts[bucket], starts[bucket + 1]
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - mean_x[bucket + 1]) * (y[start:end] - py) - (px - x[start:end]) * (mean_y[bucket + 1] - py))
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+def downsample_indices(series_ids, x, y, threshold):
+    # Row indices that keep at most threshold points of every series, in the original order.
+    if len(series_ids) == 0:
+        return np.empty(0, dtype=np.int64)
+    boundaries = np.flatnonzero(np.diff(series_ids)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(series_ids)]))
+    return np.concatenate([start + lttb_indices(x[start:end], y[start:end], threshold) for start, end in zip(starts, ends)])
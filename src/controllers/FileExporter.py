@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from src.data_acess.ExportRepository import ExportRepository, EXPORT_SCHEMA
+from src.infra.Columnar import PARQUET_MEDIA_TYPE, ParquetStream
+from src.infra.Connection import Connection
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson", "parquet": PARQUET_MEDIA_TYPE}
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+# CSV bytes behind each Parquet row group (about 200,000 rows): the most an export holds in memory.
+PARQUET_BLOCK_SIZE = 8 << 20
+
+class FileExporter:
+    # Streams the joined dataset (asset, category, indicator, value) as CSV, NDJSON or Parquet.
+    # CSV and NDJSON are produced by Postgres and passed through untouched; Parquet is encoded
+    # one row group at a time. Filters are the keyword arguments of build_export_query.
+    # There is no async variant: an async COPY awaits every row, which halves the export rate,
+    # so the API iterates these blocks in its thread pool instead.
+    def __init__(self):
+        try:
+            self.export_repository = ExportRepository()
+        except Exception as e:
+            logging.error("Error initializing FileExporter: %s", e)
+            raise
+
+    def iter_export(self, format: str, filters: dict = None):
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {format}")
+        filters = filters or {}
+        if format != "parquet":
+            yield from self.export_repository.iter_export(format, filters)
+            return
+        stream = ParquetStream(EXPORT_SCHEMA)
+        for block in self.export_repository.iter_export("rows", filters, PARQUET_BLOCK_SIZE):
+            yield stream.write_rows(block)
+        yield stream.finish()
+
+    def export(self, path: str, format: str = None, filters: dict = None) -> dict:
+        # Writes to path ("-" for stdout). A file is written under a temporary name and renamed once
+        # complete, so an interrupted export never leaves a truncated file behind.
+        format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise ValueError(f"Cannot tell the format of {path}; pass --format")
+        started = time.monotonic()
+        written = 0
+        if path == "-":
+            for block in self.iter_export(format, filters):
+                sys.stdout.buffer.write(block)
+                written += len(block)
+            sys.stdout.buffer.flush()
+        else:
+            partial = path + ".part"
+            try:
+                with open(partial, "wb") as file:
+                    for block in self.iter_export(format, filters):
+                        file.write(block)
+                        written += len(block)
+                os.replace(partial, path)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+        seconds = time.monotonic() - started
+        return {"path": path, "format": format, "bytes": written, "seconds": round(seconds, 3), "mb_per_s": round(written / seconds / 1e6, 1) if seconds else None}
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the joined asset, category and indicator dataset as CSV, NDJSON or Parquet")
+    parser.add_argument("path", help="Output file, or - for stdout")
+    parser.add_argument("--format", choices=tuple(EXPORT_FORMATS), default=None, help="Defaults to the file extension")
+    parser.add_argument("--asset-id", dest="asset_ids", type=int, action="append")
+    parser.add_argument("--category-id", dest="category_ids", type=int, action="append")
+    parser.add_argument("--asset-type", dest="asset_types", action="append")
+    parser.add_argument("--indicator", dest="indicator_names", action="append", help="Indicator name; repeat for several")
+    parser.add_argument("--min-value", type=float, default=None)
+    parser.add_argument("--max-value", type=float, default=None)
+    args = parser.parse_args()
+
+    filters = {name: getattr(args, name) for name in ("asset_ids", "category_ids", "asset_types", "indicator_names", "min_value", "max_value")}
+    try:
+        report = FileExporter().export(args.path, args.format or ("csv" if args.path == "-" else None), filters)
+        # With the data on stdout, the report goes to stderr.
+        print(json.dumps(report), file=sys.stderr if args.path == "-" else sys.stdout)
+    except Exception as e:
+        logging.error("Export failed: %s", e)
+        sys.exit(1)
+    finally:
+        Connection.close_pool()
+
+if __name__ == "__main__":
+    main()
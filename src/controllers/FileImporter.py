@@ -0,0 +1,317 @@
+import argparse
+import collections
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+import psycopg
+
+from src.controllers.BulkIngestion import BulkReport, MAX_REPORTED_REJECTIONS
+from src.data_acess.ImportRepository import ImportRepository
+from src.infra.Connection import Connection
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+NDJSON_BLOCK_SIZE = 4 << 20
+
+# Per entity: the columns written to the table, and the ID column that a file may give by name instead
+# (column, name column, table the name is looked up in).
+ENTITIES = {
+    "indicators": {"columns": ("name", "value", "asset_id"), "reference": ("asset_id", "asset", "assets")},
+    "assets": {"columns": ("name", "type", "category_id"), "reference": ("category_id", "category", "categories")},
+}
+INPUT_TYPES = {
+    "name": pa.string(),
+    "type": pa.string(),
+    "value": pa.float64(),
+    "asset_id": pa.int64(),
+    "asset": pa.string(),
+    "category_id": pa.int64(),
+    "category": pa.string(),
+}
+
+def input_columns(entity):
+    spec = ENTITIES[entity]
+    return (*spec["columns"], spec["reference"][1])
+
+def present_columns(path, columns, names):
+    present = [column for column in columns if column in names]
+    if not present:
+        raise ValueError(f"{path} has none of the columns {', '.join(columns)}")
+    return present
+
+def read_csv(path, columns, report):
+    # Columns are read as text, so a malformed value rejects its row instead of failing the block.
+    # A row with the wrong number of fields is rejected and skipped while parsing; it is reported
+    # with its row in the file (header excluded), as the bulk routes do.
+    with open(path, newline="", encoding="utf-8") as file:
+        header = [name.strip() for name in next(csv.reader(file), [])]
+    present = present_columns(path, columns, header)
+
+    def skip_row(row):
+        report.reject(row.number - 1 if row.number else None, f"Expected {row.expected_columns} columns, got {row.actual_columns}")
+        return "skip"
+
+    parse_options = pa_csv.ParseOptions(invalid_row_handler=skip_row)
+    options = pa_csv.ConvertOptions(column_types={column: pa.string() for column in present}, include_columns=present, strings_can_be_null=True)
+    with pa_csv.open_csv(path, parse_options=parse_options, convert_options=options) as reader:
+        for batch in reader:
+            yield batch
+
+def parse_ndjson_lines(block, schema):
+    # Slow path for a block the Arrow reader rejects: values that do not fit the schema become null.
+    rows = []
+    for line in block.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        record = record if isinstance(record, dict) else {}
+        rows.append({name: convert(record.get(name), schema.field(name).type) for name in schema.names})
+    return pa.Table.from_pylist(rows, schema=schema)
+
+def read_ndjson(path, columns, report):
+    # Blocks of whole lines, each parsed by Arrow's JSON reader; memory stays at one block.
+    schema = pa.schema([(column, INPUT_TYPES[column]) for column in columns])
+    options = pa_json.ParseOptions(explicit_schema=schema, unexpected_field_behavior="ignore")
+    with open(path, "rb") as file:
+        rest = b""
+        while True:
+            chunk = file.read(NDJSON_BLOCK_SIZE)
+            block = rest + chunk
+            if chunk:
+                cut = block.rfind(b"\n") + 1
+                block, rest = block[:cut], block[cut:]
+            if block.strip():
+                try:
+                    table = pa_json.read_json(io.BytesIO(block), parse_options=options).select(schema.names)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    table = parse_ndjson_lines(block, schema)
+                yield from table.to_batches()
+            if not chunk:
+                break
+
+def read_parquet(path, columns, report):
+    file = pq.ParquetFile(path)
+    present = present_columns(path, columns, file.schema_arrow.names)
+    yield from file.iter_batches(columns=present)
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson, "parquet": read_parquet}
+
+def rebatch(batches, size, start_row=0):
+    # Yields (first_row, table) with exactly `size` rows (the last one may be shorter), numbered from
+    # the start of the file, so a resumed import cuts the same batches as the interrupted one.
+    pending, count, row = [], 0, 0
+    for batch in batches:
+        if row + batch.num_rows <= start_row:
+            row += batch.num_rows
+            continue
+        if row < start_row:
+            batch = batch.slice(start_row - row)
+            row = start_row
+        pending.append(batch)
+        count += batch.num_rows
+        while count >= size:
+            table = pa.Table.from_batches(pending)
+            yield row, table.slice(0, size)
+            row += size
+            rest = table.slice(size)
+            pending, count = rest.to_batches(), rest.num_rows
+    if count:
+        yield row, pa.Table.from_batches(pending)
+
+def convert(value, type):
+    try:
+        if value is None:
+            return None
+        if pa.types.is_integer(type):
+            number = float(value)
+            return int(number) if number.is_integer() else None
+        if pa.types.is_floating(type):
+            return float(value)
+        return str(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def to_type(array, type):
+    # Vectorized cast; when some value does not convert, that batch falls back to converting each
+    # value, and the ones that fail become null (and are rejected by validation).
+    if pa.types.is_string(array.type):
+        array = pc.utf8_trim_whitespace(array)
+    if array.type == type:
+        return array
+    try:
+        return pc.cast(array, type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pa.array([convert(value, type) for value in array.to_pylist()], type)
+
+def has_length(array, low, high):
+    lengths = pc.utf8_length(array)
+    return pc.fill_null(pc.and_(pc.greater_equal(lengths, low), pc.less_equal(lengths, high)), False)
+
+def to_csv(table):
+    if not table.num_rows:
+        return b""
+    sink = io.BytesIO()
+    pa_csv.write_csv(table, sink, write_options=pa_csv.WriteOptions(include_header=False))
+    return sink.getvalue()
+
+class FileImporter:
+    def __init__(self, entity: str):
+        try:
+            if entity not in ENTITIES:
+                raise ValueError(f"Unsupported entity: {entity}")
+            self.entity = entity
+            self.spec = ENTITIES[entity]
+            self.import_repository = ImportRepository()
+        except Exception as e:
+            logging.error("Error initializing FileImporter: %s", e)
+            raise
+
+    def load_references(self):
+        # Name -> ID map of the referenced table and the set of its IDs, built once per import.
+        # Names shared by several rows are left out, so they are rejected rather than guessed.
+        rows = self.import_repository.get_keys(self.spec["reference"][2])
+        counts = collections.Counter(name for _, name in rows)
+        unique = [(id, name) for id, name in rows if counts[name] == 1]
+        self.reference_names = pa.array([name for _, name in unique], pa.string())
+        self.reference_name_ids = pa.array([id for id, _ in unique], pa.int64())
+        self.reference_ids = pa.array([id for id, _ in rows], pa.int64())
+
+    def prepare(self, raw: pa.Table, first_row: int, report: BulkReport) -> pa.Table:
+        # Converts and validates a batch with Arrow compute kernels; returns the rows to write.
+        count = raw.num_rows
+        columns = {name: to_type(raw[name].combine_chunks(), INPUT_TYPES[name]) for name in raw.column_names}
+        column = lambda name: columns.get(name, pa.nulls(count, INPUT_TYPES[name]))
+        id_column, name_column, _ = self.spec["reference"]
+        names = column(name_column)
+        ids = pc.coalesce(column(id_column), pc.take(self.reference_name_ids, pc.index_in(names, value_set=self.reference_names)))
+        reference_known = pc.fill_null(pc.is_in(ids, value_set=self.reference_ids), False)
+
+        if self.entity == "indicators":
+            value = column("value")
+            rules = [
+                (has_length(column("name"), 1, 100), "name must have between 1 and 100 characters"),
+                (pc.fill_null(pc.and_(pc.is_finite(value), pc.less(pc.abs(value), 1e8)), False), "value must be a finite number with absolute value below 100000000"),
+                (reference_known, "asset_id (or asset name) does not match an existing asset"),
+            ]
+            output = {"name": column("name"), "value": value, "asset_id": ids}
+        else:
+            # An asset may have no category, but a category that was given must exist.
+            no_category = pc.and_(pc.is_null(ids), pc.is_null(names))
+            rules = [
+                (has_length(column("name"), 1, 100), "name must have between 1 and 100 characters"),
+                (has_length(column("type"), 1, 50), "type must have between 1 and 50 characters"),
+                (pc.or_(no_category, reference_known), "category_id (or category name) does not match an existing category"),
+            ]
+            output = {"name": column("name"), "type": column("type"), "category_id": ids}
+
+        valid = pa.array(np.ones(count, dtype=bool))
+        rejected = []
+        for ok, message in rules:
+            failing = pc.and_(valid, pc.invert(ok))
+            rejected += [(index, message) for index in pc.indices_nonzero(failing).to_pylist()[:MAX_REPORTED_REJECTIONS]]
+            report.rejected_count += pc.sum(failing).as_py() or 0
+            valid = pc.and_(valid, ok)
+        # Rows are numbered from 1, like the lines reported by the bulk routes (not counting a CSV header).
+        for index, message in sorted(rejected)[:max(0, MAX_REPORTED_REJECTIONS - len(report.rejected))]:
+            report.rejected.append({"line": first_row + index + 1, "error": message})
+        return pa.table(output).filter(valid)
+
+    def run(self, path: str, format: str = None, job: str = None, batch_size: int = 50000, workers: int = 4, start_row: int = 0, progress=None) -> dict:
+        format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+        if format not in READERS:
+            raise ValueError(f"Unknown file format for {path}; pass --format ({', '.join(READERS)})")
+        job = job or f"{self.entity}:{os.path.abspath(path)}"
+        done = self.import_repository.get_imported_batches(job)
+        if any(first < start_row or (first - start_row) % batch_size for first in done):
+            raise ValueError(f"Job {job} was started with another --batch-size or --start-row; resume it with the same ones or use a new --job")
+        self.load_references()
+
+        report = BulkReport()
+        summary = {"job": job, "rows_read": 0, "skipped_rows": 0, "failed_batches": [], "committed_through": start_row}
+        started = last_progress = time.monotonic()
+        in_flight = collections.deque()
+
+        def finish():
+            first_row, row_count, written, future = in_flight.popleft()
+            if future.result():
+                report.inserted += written
+                if not summary["failed_batches"]:
+                    summary["committed_through"] = first_row + row_count
+            else:
+                summary["failed_batches"].append(first_row)
+
+        with ThreadPoolExecutor(workers) as executor:
+            for first_row, raw in rebatch(READERS[format](path, input_columns(self.entity), report), batch_size, start_row):
+                summary["rows_read"] += raw.num_rows
+                if first_row in done:
+                    summary["skipped_rows"] += raw.num_rows
+                    if not summary["failed_batches"] and not in_flight:
+                        summary["committed_through"] = first_row + raw.num_rows
+                    continue
+                table = self.prepare(raw, first_row, report)
+                # Batches stay in flight at most two per worker, which bounds memory whatever the file size.
+                in_flight.append((first_row, raw.num_rows, table.num_rows, executor.submit(
+                    self.import_repository.copy_batch, self.entity, self.spec["columns"], to_csv(table), job, first_row, raw.num_rows,
+                    self.entity == "indicators",
+                )))
+                while len(in_flight) >= 2 * workers:
+                    finish()
+                if progress and time.monotonic() - last_progress >= 2:
+                    last_progress = time.monotonic()
+                    progress(summary["rows_read"], report.inserted, report.rejected_count, last_progress - started, summary["committed_through"])
+            while in_flight:
+                finish()
+
+        if self.entity == "indicators":
+            # The batches deferred the per-category statistics; one refresh covers all of them.
+            self.import_repository.refresh_category_stats()
+        elapsed = time.monotonic() - started
+        if progress:
+            progress(summary["rows_read"], report.inserted, report.rejected_count, elapsed, summary["committed_through"])
+        return {**summary, **report.to_dict(), "seconds": round(elapsed, 1), "rows_per_s": round(report.inserted / elapsed) if elapsed else 0}
+
+def print_progress(rows_read, inserted, rejected, elapsed, committed_through):
+    # The rate counts rows written, not rows skipped as already imported or rejected.
+    rate = inserted / elapsed if elapsed else 0
+    print(f"{rows_read:,} rows read, {inserted:,} imported, {rejected:,} rejected, {rate:,.0f} rows/s, committed through row {committed_through:,}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import assets or indicators from a CSV, NDJSON or Parquet file")
+    parser.add_argument("entity", choices=tuple(ENTITIES))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=tuple(READERS), default=None, help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Rows per COPY transaction")
+    parser.add_argument("--workers", type=int, default=4, help="Batches written in parallel")
+    parser.add_argument("--start-row", type=int, default=0, help="Skip this many data rows at the start of the file")
+    parser.add_argument("--job", default=None, help="Name under which committed batches are journaled; defaults to the entity and file path. Rerunning a job skips the batches it already committed")
+    args = parser.parse_args()
+
+    try:
+        report = FileImporter(args.entity).run(args.path, args.format, args.job, args.batch_size, args.workers, args.start_row, print_progress)
+        print(json.dumps(report))
+        if report["failed_batches"]:
+            sys.exit(1)
+    except (OSError, ValueError, psycopg.Error) as e:
+        logging.error("Import failed: %s", e)
+        sys.exit(1)
+    finally:
+        Connection.close_pool()
+
+if __name__ == "__main__":
+    main()
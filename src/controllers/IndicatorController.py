@@ -1,13 +1,25 @@
+import asyncio
+from collections.abc import Iterator, AsyncIterator, Iterable, AsyncIterable
+import math
+import pyarrow as pa
 from src.models.Indicator import Indicator
-from src.data_acess.IndicatorRepository import IndicatorRepository
+from src.data_acess.IndicatorRepository import IndicatorRepository, INDICATOR_SCHEMA
+from src.data_acess.AsyncIndicatorRepository import AsyncIndicatorRepository
+from src.infra.Cache import Cache
+from src.controllers.BulkIngestion import RecordParser, BulkReport, keep_known, iter_lines, iter_async_chunks, to_int
 
 import logging
 logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
 
+QUANTILES = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95)
+INDICATOR_FIELDS = ("name", "value", "asset_id")
+
 class IndicatorController:
     def __init__(self):
         try:
             self.indicator_repository = IndicatorRepository()
+            self.async_indicator_repository = AsyncIndicatorRepository()
+            self.cache = Cache.shared()
         except Exception as e:
             logging.error("Error initializing IndicatorController: %s", e)
             raise
@@ -15,16 +27,16 @@ class IndicatorController:
     def get_indicators(self) -> list[Indicator]:
         try:
             indicators = self.indicator_repository.get_indicators()
-            return [Indicator(ind[0], ind[1], ind[2], ind[3]) for ind in indicators]
+            return indicators
         except Exception as e:
             logging.error("Error getting indicators: %s", e)
             return []
 
     def get_indicator_by_id(self, indicator_id: int) -> Indicator | None:
         try:
-            indicator = self.indicator_repository.get_indicator_by_id(indicator_id)
+            indicator = self.cache.get_or_load(("indicator", indicator_id), lambda: self.indicator_repository.get_indicator_by_id(indicator_id))
             if indicator:
-                return Indicator(indicator[0], indicator[1], indicator[2], indicator[3])
+                return indicator
             return None
         except Exception as e:
             logging.error("Error getting indicator by ID (%s): %s", indicator_id, e)
@@ -48,26 +60,255 @@ class IndicatorController:
         except Exception as e:
             logging.error("Error updating indicator (ID: %s): %s", indicator_id, e)
 
-    def get_indicators_by_name(self, name: str) -> list[Indicator]:
+    def get_indicators_by_name(self, name: str, limit: int = 100) -> list[Indicator]:
         try:
-            indicators = self.indicator_repository.get_indicators_by_name(name)
-            return [Indicator(ind[0], ind[1], ind[2], ind[3]) for ind in indicators]
+            return self.indicator_repository.get_indicators_by_name(name, limit)
         except Exception as e:
             logging.error("Error getting indicators by name (%s): %s", name, e)
             return []
 
-    def get_indicators_by_value(self, min_value: float, max_value: float) -> list[Indicator]:
+    def search_indicators(self, text: str, limit: int = 20) -> list[Indicator]:
+        try:
+            return self.indicator_repository.search_indicators(text, limit)
+        except Exception as e:
+            logging.error("Error searching indicators (%s): %s", text, e)
+            return []
+
+    def typeahead_indicator_names(self, text: str, limit: int = 10) -> list[str]:
+        try:
+            return self.indicator_repository.get_indicator_names_by_prefix(text, limit)
+        except Exception as e:
+            logging.error("Error getting indicator name suggestions (%s): %s", text, e)
+            return []
+
+    def get_indicators_by_value(self, name: str, min_value: float = None, max_value: float = None, limit: int = 1000) -> list[Indicator]:
         try:
-            indicators = self.indicator_repository.get_indicators_by_value(min_value, max_value)
-            return [Indicator(ind[0], ind[1], ind[2], ind[3]) for ind in indicators]
+            return self.indicator_repository.get_indicators_by_value(name, min_value, max_value, limit)
         except Exception as e:
-            logging.error("Error getting indicators by value range (%s - %s): %s", min_value, max_value, e)
+            logging.error("Error getting indicators by value range (%s: %s - %s): %s", name, min_value, max_value, e)
             return []
 
+    def _build_distribution(self, name: str, bins: int, stats: tuple | None, buckets: list) -> dict:
+        if not stats or not stats[0]:
+            return {"name": name, "count": 0, "min": None, "max": None, "mean": None, "quantiles": {}, "histogram": {"edges": [], "counts": []}}
+        count, low, high, mean, quantiles = stats
+        if high > low:
+            width = (high - low) / bins
+            edges = [round(low + width * i, 10) for i in range(bins)] + [high]
+            counts = [0] * bins
+            for bucket, bucket_count in buckets:
+                counts[bucket - 1] = bucket_count
+        else:
+            edges, counts = [low, high], [count]
+        return {
+            "name": name,
+            "count": count,
+            "min": low,
+            "max": high,
+            "mean": mean,
+            "quantiles": {f"p{round(q * 100)}": value for q, value in zip(QUANTILES, quantiles)},
+            "histogram": {"edges": edges, "counts": counts},
+        }
+
+    def get_value_distribution(self, name: str, bins: int = 20, min_value: float = None, max_value: float = None) -> dict:
+        try:
+            stats, buckets = self.indicator_repository.get_value_distribution(name, bins, QUANTILES, min_value, max_value)
+            return self._build_distribution(name, bins, stats, buckets)
+        except Exception as e:
+            logging.error("Error getting value distribution (%s): %s", name, e)
+            return self._build_distribution(name, bins, None, [])
+
     def get_indicators_by_asset(self, asset_id: int) -> list[Indicator]:
         try:
-            indicators = self.indicator_repository.get_indicators_by_asset(asset_id)
-            return [Indicator(ind[0], ind[1], ind[2], ind[3]) for ind in indicators]
+            indicators = self.cache.get_or_load(("indicators_by_asset", asset_id), lambda: self.indicator_repository.get_indicators_by_asset(asset_id))
+            return indicators
         except Exception as e:
             logging.error("Error getting indicators by asset (ID: %s): %s", asset_id, e)
             return []
+
+    def get_indicators_by_assets(self, asset_ids: list[int]) -> dict[int, list[Indicator]]:
+        try:
+            grouped = self.cache.get_many_or_load("indicators_by_asset", list(dict.fromkeys(asset_ids)), self.indicator_repository.get_indicators_by_assets)
+            return {asset_id: indicators or [] for asset_id, indicators in grouped.items()}
+        except Exception as e:
+            logging.error("Error getting indicators by assets (%d IDs): %s", len(asset_ids), e)
+            return {}
+
+    def get_indicators_page(self, limit: int, after_id: int = None) -> dict:
+        try:
+            indicators = self.indicator_repository.get_indicators_page(limit, after_id)
+            next_after_id = indicators[-1].id if len(indicators) == limit else None
+            return {"items": indicators, "next_after_id": next_after_id}
+        except Exception as e:
+            logging.error("Error getting indicators page (after ID: %s): %s", after_id, e)
+            return {"items": [], "next_after_id": None}
+
+    def iter_indicators(self, after_id: int = None, chunk_size: int = 1000) -> Iterator[Indicator]:
+        yield from self.indicator_repository.iter_indicators(after_id, chunk_size)
+
+    def _validate_indicator(self, record: dict) -> tuple:
+        try:
+            name = str(record.get("name") or "").strip()
+            value = float(record.get("value"))
+            asset_id = to_int(record.get("asset_id"))
+        except (TypeError, ValueError):
+            raise ValueError("Fields name, value and asset_id are required; value must be a number and asset_id an integer")
+        if not name or len(name) > 100:
+            raise ValueError("name must have between 1 and 100 characters")
+        if not math.isfinite(value) or abs(value) >= 1e8:
+            raise ValueError("value must be a finite number with absolute value below 100000000")
+        return (name, value, asset_id)
+
+    def bulk_insert_indicators(self, lines: Iterable[str], format: str = "ndjson", batch_size: int = 5000) -> dict:
+        report = BulkReport()
+        try:
+            parser = RecordParser(format, INDICATOR_FIELDS)
+            batch = []
+            for line_number, record, error in parser.iter_records(lines):
+                if error is None:
+                    try:
+                        row = self._validate_indicator(record)
+                    except (TypeError, ValueError) as e:
+                        error = str(e)
+                if error is not None:
+                    report.reject(line_number, error)
+                    continue
+                batch.append((line_number, row))
+                if len(batch) >= batch_size:
+                    self._write_indicator_batch(batch, report)
+                    batch = []
+            if batch:
+                self._write_indicator_batch(batch, report)
+        except Exception as e:
+            logging.error("Error in bulk indicator ingestion: %s", e)
+        return report.to_dict()
+
+    def _write_indicator_batch(self, batch: list, report: BulkReport) -> None:
+        known = self.indicator_repository.get_existing_asset_ids({row[2] for _, row in batch if row[2] is not None})
+        valid = keep_known(batch, 2, known, report, "asset_id")
+        if valid and self.indicator_repository.copy_indicators([row for _, row in valid]):
+            report.inserted += len(valid)
+        else:
+            for line_number, _ in valid:
+                report.reject(line_number, "Batch could not be written to the database")
+
+    def get_indicators_table(self) -> pa.Table:
+        try:
+            return self.indicator_repository.get_indicators_table()
+        except Exception as e:
+            logging.error("Error getting indicators table: %s", e)
+            return INDICATOR_SCHEMA.empty_table()
+
+    async def get_indicators_async(self) -> list[Indicator]:
+        try:
+            indicators = await self.async_indicator_repository.get_indicators()
+            return indicators
+        except Exception as e:
+            logging.error("Error getting indicators: %s", e)
+            return []
+
+    async def get_indicator_by_id_async(self, indicator_id: int) -> Indicator | None:
+        try:
+            indicator = await self.cache.get_or_load_async(("indicator", indicator_id), lambda: self.async_indicator_repository.get_indicator_by_id(indicator_id))
+            if indicator:
+                return indicator
+            return None
+        except Exception as e:
+            logging.error("Error getting indicator by ID (%s): %s", indicator_id, e)
+            return None
+
+    async def insert_indicator_async(self, name: str, value: float, asset_id: int) -> None:
+        try:
+            await self.async_indicator_repository.insert_indicator(name, value, asset_id)
+        except Exception as e:
+            logging.error("Error inserting indicator (name: %s): %s", name, e)
+
+    async def delete_indicator_async(self, indicator_id: int) -> None:
+        try:
+            await self.async_indicator_repository.delete_indicator(indicator_id)
+        except Exception as e:
+            logging.error("Error deleting indicator (ID: %s): %s", indicator_id, e)
+
+    async def update_indicator_async(self, indicator_id: int, name: str = None, value: float = None, asset_id: int = None) -> None:
+        try:
+            await self.async_indicator_repository.update_indicator(indicator_id, name, value, asset_id)
+        except Exception as e:
+            logging.error("Error updating indicator (ID: %s): %s", indicator_id, e)
+
+    async def get_indicators_by_name_async(self, name: str, limit: int = 100) -> list[Indicator]:
+        try:
+            return await self.async_indicator_repository.get_indicators_by_name(name, limit)
+        except Exception as e:
+            logging.error("Error getting indicators by name (%s): %s", name, e)
+            return []
+
+    async def search_indicators_async(self, text: str, limit: int = 20) -> list[Indicator]:
+        try:
+            return await self.async_indicator_repository.search_indicators(text, limit)
+        except Exception as e:
+            logging.error("Error searching indicators (%s): %s", text, e)
+            return []
+
+    async def typeahead_indicator_names_async(self, text: str, limit: int = 10) -> list[str]:
+        try:
+            return await self.async_indicator_repository.get_indicator_names_by_prefix(text, limit)
+        except Exception as e:
+            logging.error("Error getting indicator name suggestions (%s): %s", text, e)
+            return []
+
+    async def get_indicators_by_value_async(self, name: str, min_value: float = None, max_value: float = None, limit: int = 1000) -> list[Indicator]:
+        try:
+            return await self.async_indicator_repository.get_indicators_by_value(name, min_value, max_value, limit)
+        except Exception as e:
+            logging.error("Error getting indicators by value range (%s: %s - %s): %s", name, min_value, max_value, e)
+            return []
+
+    async def get_value_distribution_async(self, name: str, bins: int = 20, min_value: float = None, max_value: float = None) -> dict:
+        try:
+            stats, buckets = await self.async_indicator_repository.get_value_distribution(name, bins, QUANTILES, min_value, max_value)
+            return self._build_distribution(name, bins, stats, buckets)
+        except Exception as e:
+            logging.error("Error getting value distribution (%s): %s", name, e)
+            return self._build_distribution(name, bins, None, [])
+
+    async def get_indicators_by_asset_async(self, asset_id: int) -> list[Indicator]:
+        try:
+            indicators = await self.cache.get_or_load_async(("indicators_by_asset", asset_id), lambda: self.async_indicator_repository.get_indicators_by_asset(asset_id))
+            return indicators
+        except Exception as e:
+            logging.error("Error getting indicators by asset (ID: %s): %s", asset_id, e)
+            return []
+
+    async def get_indicators_by_assets_async(self, asset_ids: list[int]) -> dict[int, list[Indicator]]:
+        try:
+            grouped = await self.cache.get_many_or_load_async("indicators_by_asset", list(dict.fromkeys(asset_ids)), self.async_indicator_repository.get_indicators_by_assets)
+            return {asset_id: indicators or [] for asset_id, indicators in grouped.items()}
+        except Exception as e:
+            logging.error("Error getting indicators by assets (%d IDs): %s", len(asset_ids), e)
+            return {}
+
+    async def get_indicators_page_async(self, limit: int, after_id: int = None) -> dict:
+        try:
+            indicators = await self.async_indicator_repository.get_indicators_page(limit, after_id)
+            next_after_id = indicators[-1].id if len(indicators) == limit else None
+            return {"items": indicators, "next_after_id": next_after_id}
+        except Exception as e:
+            logging.error("Error getting indicators page (after ID: %s): %s", after_id, e)
+            return {"items": [], "next_after_id": None}
+
+    async def iter_indicators_async(self, after_id: int = None, chunk_size: int = 1000) -> AsyncIterator[Indicator]:
+        async for indicator in self.async_indicator_repository.iter_indicators(after_id, chunk_size):
+            yield indicator
+
+    async def bulk_insert_indicators_async(self, chunks: AsyncIterable[bytes], format: str = "ndjson", batch_size: int = 5000) -> dict:
+        # Parsing and validating every record is CPU-bound, so the whole ingestion runs in a worker
+        # thread; the body is still read on the event loop, one chunk at a time as the thread asks.
+        lines = iter_lines(iter_async_chunks(chunks, asyncio.get_running_loop()))
+        return await asyncio.to_thread(self.bulk_insert_indicators, lines, format, batch_size)
+
+    async def get_indicators_table_async(self) -> pa.Table:
+        try:
+            return await self.async_indicator_repository.get_indicators_table()
+        except Exception as e:
+            logging.error("Error getting indicators table: %s", e)
+            return INDICATOR_SCHEMA.empty_table()
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta, timezone
+import pyarrow as pa
+from src.models.HistoryPoint import HistoryPoint
+from src.models.Indicator import Indicator
+from src.models.IndicatorSeries import IndicatorSeries
+from src.controllers import Downsampling
+from src.data_acess.IndicatorHistoryRepository import IndicatorHistoryRepository, HISTORY_SCHEMA
+from src.data_acess.AsyncIndicatorHistoryRepository import AsyncIndicatorHistoryRepository
+from src.data_acess.IndicatorRepository import IndicatorRepository
+from src.data_acess.AsyncIndicatorRepository import AsyncIndicatorRepository
+from src.infra.Cache import Cache
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Fine buckets per requested point when a dense range is first reduced to bucket extremes, and
+# how many stored points per requested point make a range dense enough for that.
+EXTREME_BUCKETS_PER_POINT = 4
+DENSE_POINTS_PER_POINT = 8
+
+SERIES_SCHEMA = pa.schema([("indicator_id", pa.int64()), ("name", pa.string()), ("recorded_at", pa.timestamp("us", tz="UTC")), ("value", pa.float64())])
+
+def as_utc(moment):
+    # Times without an offset are taken as UTC, like the partition bounds.
+    if moment is not None and moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+def bucket_width(start, end, points):
+    # The range end is inclusive, so it spans one extra microsecond; rounding the width up to whole
+    # microseconds (timedelta division rounds to nearest) keeps a point at end inside the last bucket.
+    span = (end - start) // timedelta(microseconds=1) + 1
+    return timedelta(microseconds=max(-(-span // points), 1))
+
+def downsample(table, points):
+    x = table["recorded_at"].cast(pa.int64()).to_numpy()
+    y = table["value"].to_numpy(zero_copy_only=False)
+    return table.take(Downsampling.downsample_indices(table["indicator_id"].to_numpy(), x, y, points))
+
+def to_points(table) -> list[HistoryPoint]:
+    return [HistoryPoint(recorded_at, value) for recorded_at, value in zip(table["recorded_at"].to_pylist(), table["value"].to_pylist())]
+
+def with_names(table, indicators) -> pa.Table:
+    names = {indicator.id: indicator.name for indicator in indicators}
+    return pa.table({
+        "indicator_id": table["indicator_id"],
+        "name": pa.array([names[indicator_id] for indicator_id in table["indicator_id"].to_pylist()], pa.string()),
+        "recorded_at": table["recorded_at"],
+        "value": table["value"],
+    }, schema=SERIES_SCHEMA)
+
+def to_series(table, indicators) -> list[IndicatorSeries]:
+    points = {}
+    for indicator_id, recorded_at, value in zip(table["indicator_id"].to_pylist(), table["recorded_at"].to_pylist(), table["value"].to_pylist()):
+        points.setdefault(indicator_id, []).append(HistoryPoint(recorded_at, value))
+    return [IndicatorSeries(indicator.id, indicator.name, points.get(indicator.id, [])) for indicator in indicators]
+
+class IndicatorHistoryController:
+    def __init__(self):
+        try:
+            self.history_repository = IndicatorHistoryRepository()
+            self.async_history_repository = AsyncIndicatorHistoryRepository()
+            self.indicator_repository = IndicatorRepository()
+            self.async_indicator_repository = AsyncIndicatorRepository()
+            self.cache = Cache.shared()
+        except Exception as e:
+            logging.error("Error initializing IndicatorHistoryController: %s", e)
+            raise
+
+    def get_history_table(self, indicator_ids: list[int], start: datetime = None, end: datetime = None, points: int = 500, method: str = "lttb") -> pa.Table:
+        # Columns indicator_id, recorded_at and value, with at most `points` rows per indicator.
+        # "avg" averages fixed-width buckets in the database. "lttb" keeps the visually significant
+        # points; dense ranges are first reduced to bucket extremes in the database.
+        try:
+            first, last, count = self.history_repository.get_history_summary(indicator_ids, as_utc(start), as_utc(end))
+            if not count:
+                return HISTORY_SCHEMA.empty_table()
+            if method == "avg":
+                return self.history_repository.get_history_buckets_table(indicator_ids, first, last, bucket_width(first, last, points))
+            if count > DENSE_POINTS_PER_POINT * points * len(indicator_ids):
+                table = self.history_repository.get_history_extremes_table(indicator_ids, first, last, bucket_width(first, last, EXTREME_BUCKETS_PER_POINT * points))
+            else:
+                table = self.history_repository.get_history_table(indicator_ids, first, last)
+            return downsample(table, points)
+        except Exception as e:
+            logging.error("Error getting indicator history (IDs: %s): %s", indicator_ids, e)
+            return HISTORY_SCHEMA.empty_table()
+
+    async def get_history_table_async(self, indicator_ids: list[int], start: datetime = None, end: datetime = None, points: int = 500, method: str = "lttb") -> pa.Table:
+        try:
+            first, last, count = await self.async_history_repository.get_history_summary(indicator_ids, as_utc(start), as_utc(end))
+            if not count:
+                return HISTORY_SCHEMA.empty_table()
+            if method == "avg":
+                return await self.async_history_repository.get_history_buckets_table(indicator_ids, first, last, bucket_width(first, last, points))
+            if count > DENSE_POINTS_PER_POINT * points * len(indicator_ids):
+                table = await self.async_history_repository.get_history_extremes_table(indicator_ids, first, last, bucket_width(first, last, EXTREME_BUCKETS_PER_POINT * points))
+            else:
+                table = await self.async_history_repository.get_history_table(indicator_ids, first, last)
+            return downsample(table, points)
+        except Exception as e:
+            logging.error("Error getting indicator history (IDs: %s): %s", indicator_ids, e)
+            return HISTORY_SCHEMA.empty_table()
+
+    def get_indicator_history(self, indicator_id: int, start: datetime = None, end: datetime = None, points: int = 500, method: str = "lttb") -> list[HistoryPoint]:
+        return to_points(self.get_history_table([indicator_id], start, end, points, method))
+
+    async def get_indicator_history_async(self, indicator_id: int, start: datetime = None, end: datetime = None, points: int = 500, method: str = "lttb") -> list[HistoryPoint]:
+        return to_points(await self.get_history_table_async([indicator_id], start, end, points, method))
+
+    def get_asset_indicators(self, asset_id: int, names: list[str] = None) -> list[Indicator]:
+        try:
+            indicators = self.cache.get_or_load(("indicators_by_asset", asset_id), lambda: self.indicator_repository.get_indicators_by_asset(asset_id))
+            return [indicator for indicator in indicators or [] if not names or indicator.name in names]
+        except Exception as e:
+            logging.error("Error getting indicators of asset (ID: %s): %s", asset_id, e)
+            return []
+
+    async def get_asset_indicators_async(self, asset_id: int, names: list[str] = None) -> list[Indicator]:
+        try:
+            indicators = await self.cache.get_or_load_async(("indicators_by_asset", asset_id), lambda: self.async_indicator_repository.get_indicators_by_asset(asset_id))
+            return [indicator for indicator in indicators or [] if not names or indicator.name in names]
+        except Exception as e:
+            logging.error("Error getting indicators of asset (ID: %s): %s", asset_id, e)
+            return []
+
+    def get_asset_history_table(self, asset_id: int, names: list[str] = None, start: datetime = None, end: datetime = None, points: int = 500, method: str = "lttb") -> pa.Table:
+        indicators = self.get_asset_indicators(asset_id, names)
+        if not indicators:
+            return SERIES_SCHEMA.empty_table()
+        return with_names(self.get_history_table([indicator.id for indicator in indicators], start, end, points, method), indicators)
+
+    async def get_asset_history_table_async(self, asset_id: int, names: list[str] = None, start: datetime = None, end: datetime = None, points: int = 500, method: str = "lttb") -> pa.Table:
+        indicators = await self.get_asset_indicators_async(asset_id, names)
+        if not indicators:
+            return SERIES_SCHEMA.empty_table()
+        return with_names(await self.get_history_table_async([indicator.id for indicator in indicators], start, end, points, method), indicators)
+
+    def get_asset_history(self, asset_id: int, names: list[str] = None, start: datetime = None, end: datetime = None, points: int = 500, method: str = "lttb") -> list[IndicatorSeries]:
+        indicators = self.get_asset_indicators(asset_id, names)
+        if not indicators:
+            return []
+        return to_series(self.get_history_table([indicator.id for indicator in indicators], start, end, points, method), indicators)
+
+    async def get_asset_history_async(self, asset_id: int, names: list[str] = None, start: datetime = None, end: datetime = None, points: int = 500, method: str = "lttb") -> list[IndicatorSeries]:
+        indicators = await self.get_asset_indicators_async(asset_id, names)
+        if not indicators:
+            return []
+        return to_series(await self.get_history_table_async([indicator.id for indicator in indicators], start, end, points, method), indicators)
+
+    def append_history(self, indicator_id: int, points: list[tuple[datetime, float]]) -> int:
+        try:
+            return self.history_repository.append_history([(indicator_id, as_utc(recorded_at), value) for recorded_at, value in points])
+        except Exception as e:
+            logging.error("Error appending history (indicator ID: %s): %s", indicator_id, e)
+            return 0
+
+    async def append_history_async(self, indicator_id: int, points: list[tuple[datetime, float]]) -> int:
+        try:
+            return await self.async_history_repository.append_history([(indicator_id, as_utc(recorded_at), value) for recorded_at, value in points])
+        except Exception as e:
+            logging.error("Error appending history (indicator ID: %s): %s", indicator_id, e)
+            return 0
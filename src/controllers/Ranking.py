@@ -0,0 +1,50 @@
+import numpy as np
+
+# Multi-criteria scoring over an asset x indicator matrix.
+# Every function works on whole columns at once: values is (assets, criteria),
+# weights is (criteria,) and benefit is a boolean (criteria,) array that is True
+# where a higher value is better and False where a lower value is better.
+
+METHODS = ("weighted_sum", "topsis")
+
+def normalize_weights(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    total = weights.sum()
+    if total <= 0:
+        raise ValueError("At least one criterion must have a positive weight")
+    return weights / total
+
+def min_max_normalize(values, benefit):
+    low = values.min(axis=0)
+    high = values.max(axis=0)
+    spread = high - low
+    scaled = np.divide(values - low, spread, out=np.zeros_like(values), where=spread > 0)
+    return np.where(benefit, scaled, np.where(spread > 0, 1.0 - scaled, 0.0))
+
+def weighted_sum_scores(values, weights, benefit):
+    return min_max_normalize(values, benefit) @ normalize_weights(weights)
+
+def topsis_scores(values, weights, benefit):
+    norms = np.sqrt((values ** 2).sum(axis=0))
+    weighted = np.divide(values, norms, out=np.zeros_like(values), where=norms > 0) * normalize_weights(weights)
+    ideal = np.where(benefit, weighted.max(axis=0), weighted.min(axis=0))
+    anti_ideal = np.where(benefit, weighted.min(axis=0), weighted.max(axis=0))
+    to_ideal = np.sqrt(((weighted - ideal) ** 2).sum(axis=1))
+    to_anti_ideal = np.sqrt(((weighted - anti_ideal) ** 2).sum(axis=1))
+    total = to_ideal + to_anti_ideal
+    return np.divide(to_anti_ideal, total, out=np.zeros_like(total), where=total > 0)
+
+def score(values, weights, benefit, method="topsis"):
+    if method == "weighted_sum":
+        return weighted_sum_scores(values, weights, benefit)
+    if method == "topsis":
+        return topsis_scores(values, weights, benefit)
+    raise ValueError(f"Unknown ranking method: {method}")
+
+def top_k(scores, k):
+    # argpartition selects the k best in O(n); only those k are sorted.
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best], kind="stable")]
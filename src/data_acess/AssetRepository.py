@@ -1,20 +1,32 @@
 from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+from src.infra.Search import TRIGRAM_INDEX_QUERY, trigram_index_name, search_queries
+from src.infra.Columnar import read_table
+from src.models.Asset import Asset
+from psycopg.rows import args_row
+import pyarrow as pa
 
 import logging
 logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
 
+ASSET_COLUMNS = "id, name, type, category_id"
+ASSET_SCHEMA = pa.schema([("id", pa.int64()), ("name", pa.string()), ("type", pa.string()), ("category_id", pa.int64())])
+
 class AssetRepository:
     def __init__(self):
         try:
-            self.connection = Connection().get_connection()
+            self.pool = Connection().get_pool()
+            self.read_pool = Connection().get_read_pool()
+            self.cache = Cache.shared()
+            self.substring_search = None
         except Exception as e:
             logging.critical("Error initializing AssetRepository: %s", e)
             raise
 
     def get_assets(self):
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM assets")
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                cursor.execute(f"SELECT {ASSET_COLUMNS} FROM assets")
                 assets = cursor.fetchall()
                 logging.info("Fetched %d assets from database.", len(assets))
                 return assets
@@ -24,24 +36,27 @@ class AssetRepository:
 
     def insert_asset(self, name, type, category_id):
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
                 query = "INSERT INTO assets (name, type, category_id) VALUES (%s, %s, %s)"
                 cursor.execute(query, (name, type, category_id))
-                self.connection.commit()
+                conn.commit()
+                self.cache.invalidate_namespace("assets_by_category")
+                self.cache.invalidate_namespace("asset", negative_only=True)
                 logging.info("Asset inserted successfully: %s, %s, %s", name, type, category_id)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error inserting asset (name: %s, type: %s, category_id: %s): %s", name, type, category_id, e)
 
     def delete_asset(self, asset_id):
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
                 query = "DELETE FROM assets WHERE id = %s"
                 cursor.execute(query, (asset_id,))
-                self.connection.commit()
+                conn.commit()
+                self.cache.invalidate(("asset", asset_id), ("indicators_by_asset", asset_id))
+                self.cache.invalidate_namespace("assets_by_category")
+                self.cache.invalidate_namespace("indicator")
                 logging.info("Asset deleted successfully (ID: %s).", asset_id)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error deleting asset (ID: %s): %s", asset_id, e)
 
     def update_asset(self, asset_id, name=None, type=None, category_id=None):
@@ -56,26 +71,27 @@ class AssetRepository:
                 fields.append("type = %s")
                 values.append(type)
             if category_id:
-                fields.append("category = %s")
+                fields.append("category_id = %s")
                 values.append(category_id)
 
             if fields:
-                with self.connection.cursor() as cursor:
+                with self.pool.write_connection() as conn, conn.cursor() as cursor:
                     query = f"UPDATE assets SET {', '.join(fields)} WHERE id = %s"
                     values.append(asset_id)
                     cursor.execute(query, tuple(values))
-                    self.connection.commit()
+                    conn.commit()
+                    self.cache.invalidate(("asset", asset_id))
+                    self.cache.invalidate_namespace("assets_by_category")
                     logging.info("Asset updated successfully (ID: %s).", asset_id)
             else:
                 logging.warning("No fields provided for asset update (ID: %s).", asset_id)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error updating asset (ID: %s): %s", asset_id, e)
 
     def get_asset_by_id(self, asset_id):
         try:
-            with self.connection.cursor() as cursor:
-                query = "SELECT * FROM assets WHERE id = %s"
+            with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE id = %s"
                 cursor.execute(query, (asset_id,))
                 asset = cursor.fetchone()
                 if asset:
@@ -85,24 +101,37 @@ class AssetRepository:
                 return asset
         except Exception as e:
             logging.error("Error fetching asset by ID (%s): %s", asset_id, e)
-            return None
+            # Raised rather than returned empty: the cache would keep an empty result as a negative entry.
+            raise
+
+    def get_assets_by_ids(self, asset_ids):
+        try:
+            with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE id = ANY(%s)"
+                cursor.execute(query, (list(asset_ids),))
+                assets = {asset.id: asset for asset in cursor.fetchall()}
+                logging.info("Fetched %d of %d assets by ID.", len(assets), len(asset_ids))
+                return assets
+        except Exception as e:
+            logging.error("Error fetching assets by IDs (%d IDs): %s", len(asset_ids), e)
+            raise
 
     def get_assets_by_category(self, category_id):
         try:
-            with self.connection.cursor() as cursor:
-                query = "SELECT * FROM assets WHERE category = %s"
+            with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE category_id = %s"
                 cursor.execute(query, (category_id,))
                 assets = cursor.fetchall()
                 logging.info("Fetched %d assets by category: %s", len(assets), category_id)
                 return assets
         except Exception as e:
             logging.error("Error fetching assets by category (%s): %s", category_id, e)
-            return []
+            raise
 
     def get_assets_by_type(self, type):
         try:
-            with self.connection.cursor() as cursor:
-                query = "SELECT * FROM assets WHERE type = %s"
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE type = %s"
                 cursor.execute(query, (type,))
                 assets = cursor.fetchall()
                 logging.info("Fetched %d assets by type: %s", len(assets), type)
@@ -111,21 +140,79 @@ class AssetRepository:
             logging.error("Error fetching assets by type (%s): %s", type, e)
             return []
 
-    def get_assets_by_name(self, name):
+    def get_assets_by_name(self, name, limit=100):
+        return self.search_assets(name, limit)
+
+    def search_assets(self, text, limit=20, typeahead=False):
         try:
-            with self.connection.cursor() as cursor:
-                query = "SELECT * FROM assets WHERE name LIKE %s"
-                cursor.execute(query, (f"%{name}%",))
+            assets = []
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                if self.substring_search is None:
+                    self.substring_search = conn.execute(TRIGRAM_INDEX_QUERY, (trigram_index_name("assets"),)).fetchone()[0]
+                for query, params in search_queries("assets", ASSET_COLUMNS, text, typeahead, self.substring_search):
+                    # Unprepared, so each run is planned with the actual pattern and can use the prefix index.
+                    cursor.execute(query, (*params, [row.id for row in assets], limit - len(assets)), prepare=False)
+                    assets += cursor.fetchall()
+                    if len(assets) >= limit:
+                        break
+            logging.info("Found %d assets matching: %s", len(assets), text)
+            return assets
+        except Exception as e:
+            logging.error("Error searching assets (%s): %s", text, e)
+            return []
+
+    def get_assets_page(self, limit, after_id=None):
+        try:
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE id > %s ORDER BY id LIMIT %s"
+                cursor.execute(query, (after_id or 0, limit))
                 assets = cursor.fetchall()
-                logging.info("Fetched %d assets by name: %s", len(assets), name)
+                logging.info("Fetched %d assets after ID: %s", len(assets), after_id)
                 return assets
         except Exception as e:
-            logging.error("Error fetching assets by name (%s): %s", name, e)
+            logging.error("Error fetching assets page (after ID: %s): %s", after_id, e)
             return []
 
-    def __del__(self):
+    def iter_assets(self, after_id=None, chunk_size=1000):
+        try:
+            with self.read_pool.connection() as conn, conn.cursor(name="iter_assets", row_factory=args_row(Asset)) as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(f"SELECT {ASSET_COLUMNS} FROM assets WHERE id > %s ORDER BY id", (after_id or 0,))
+                for row in cursor:
+                    yield row
+        except Exception as e:
+            logging.error("Error streaming assets (after ID: %s): %s", after_id, e)
+
+    def get_existing_category_ids(self, category_ids):
+        try:
+            with self.pool.read_connection() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT id FROM categories WHERE id = ANY(%s)", (list(category_ids),))
+                return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            logging.error("Error checking category IDs: %s", e)
+            return set()
+
+    def copy_assets(self, rows):
+        try:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                with cursor.copy("COPY assets (name, type, category_id) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                conn.commit()
+                self.cache.invalidate_namespace("assets_by_category")
+                self.cache.invalidate_namespace("asset", negative_only=True)
+                logging.info("Copied %d assets into database.", len(rows))
+                return len(rows)
+        except Exception as e:
+            logging.error("Error copying %d assets: %s", len(rows), e)
+            return 0
+
+    def get_assets_table(self):
         try:
-            self.connection.close()
-            logging.info("Database connection closed in AssetRepository.")
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = read_table(cursor, f"SELECT {ASSET_COLUMNS} FROM assets ORDER BY id", None, ASSET_SCHEMA)
+                logging.info("Fetched %d assets as a columnar table.", table.num_rows)
+                return table
         except Exception as e:
-            logging.error("Error closing database connection in AssetRepository: %s", e)
+            logging.error("Error fetching assets table: %s", e)
+            return ASSET_SCHEMA.empty_table()
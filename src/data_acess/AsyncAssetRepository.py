@@ -0,0 +1,216 @@
+from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+from src.infra.Search import TRIGRAM_INDEX_QUERY, trigram_index_name, search_queries
+from src.infra.Columnar import read_table_async
+from src.data_acess.AssetRepository import ASSET_SCHEMA, ASSET_COLUMNS
+from src.models.Asset import Asset
+from psycopg.rows import args_row
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class AsyncAssetRepository:
+    def __init__(self):
+        try:
+            self.pool = Connection().get_async_pool()
+            self.read_pool = Connection().get_async_read_pool()
+            self.cache = Cache.shared()
+            self.substring_search = None
+        except Exception as e:
+            logging.critical("Error initializing AsyncAssetRepository: %s", e)
+            raise
+
+    async def get_assets(self):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                await cursor.execute(f"SELECT {ASSET_COLUMNS} FROM assets")
+                assets = await cursor.fetchall()
+                logging.info("Fetched %d assets from database.", len(assets))
+                return assets
+        except Exception as e:
+            logging.error("Error fetching assets: %s", e)
+            return []
+
+    async def insert_asset(self, name, type, category_id):
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                query = "INSERT INTO assets (name, type, category_id) VALUES (%s, %s, %s)"
+                await cursor.execute(query, (name, type, category_id))
+                await conn.commit()
+                self.cache.invalidate_namespace("assets_by_category")
+                self.cache.invalidate_namespace("asset", negative_only=True)
+                logging.info("Asset inserted successfully: %s, %s, %s", name, type, category_id)
+        except Exception as e:
+            logging.error("Error inserting asset (name: %s, type: %s, category_id: %s): %s", name, type, category_id, e)
+
+    async def delete_asset(self, asset_id):
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                query = "DELETE FROM assets WHERE id = %s"
+                await cursor.execute(query, (asset_id,))
+                await conn.commit()
+                self.cache.invalidate(("asset", asset_id), ("indicators_by_asset", asset_id))
+                self.cache.invalidate_namespace("assets_by_category")
+                self.cache.invalidate_namespace("indicator")
+                logging.info("Asset deleted successfully (ID: %s).", asset_id)
+        except Exception as e:
+            logging.error("Error deleting asset (ID: %s): %s", asset_id, e)
+
+    async def update_asset(self, asset_id, name=None, type=None, category_id=None):
+        try:
+            fields = []
+            values = []
+
+            if name:
+                fields.append("name = %s")
+                values.append(name)
+            if type:
+                fields.append("type = %s")
+                values.append(type)
+            if category_id:
+                fields.append("category_id = %s")
+                values.append(category_id)
+
+            if fields:
+                async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                    query = f"UPDATE assets SET {', '.join(fields)} WHERE id = %s"
+                    values.append(asset_id)
+                    await cursor.execute(query, tuple(values))
+                    await conn.commit()
+                    self.cache.invalidate(("asset", asset_id))
+                    self.cache.invalidate_namespace("assets_by_category")
+                    logging.info("Asset updated successfully (ID: %s).", asset_id)
+            else:
+                logging.warning("No fields provided for asset update (ID: %s).", asset_id)
+        except Exception as e:
+            logging.error("Error updating asset (ID: %s): %s", asset_id, e)
+
+    async def get_asset_by_id(self, asset_id):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE id = %s"
+                await cursor.execute(query, (asset_id,))
+                asset = await cursor.fetchone()
+                if asset:
+                    logging.info("Fetched asset by ID: %s", asset_id)
+                else:
+                    logging.warning("No asset found with ID: %s", asset_id)
+                return asset
+        except Exception as e:
+            logging.error("Error fetching asset by ID (%s): %s", asset_id, e)
+            # Raised rather than returned empty: the cache would keep an empty result as a negative entry.
+            raise
+
+    async def get_assets_by_ids(self, asset_ids):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE id = ANY(%s)"
+                await cursor.execute(query, (list(asset_ids),))
+                assets = {asset.id: asset for asset in await cursor.fetchall()}
+                logging.info("Fetched %d of %d assets by ID.", len(assets), len(asset_ids))
+                return assets
+        except Exception as e:
+            logging.error("Error fetching assets by IDs (%d IDs): %s", len(asset_ids), e)
+            raise
+
+    async def get_assets_by_category(self, category_id):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE category_id = %s"
+                await cursor.execute(query, (category_id,))
+                assets = await cursor.fetchall()
+                logging.info("Fetched %d assets by category: %s", len(assets), category_id)
+                return assets
+        except Exception as e:
+            logging.error("Error fetching assets by category (%s): %s", category_id, e)
+            raise
+
+    async def get_assets_by_type(self, type):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE type = %s"
+                await cursor.execute(query, (type,))
+                assets = await cursor.fetchall()
+                logging.info("Fetched %d assets by type: %s", len(assets), type)
+                return assets
+        except Exception as e:
+            logging.error("Error fetching assets by type (%s): %s", type, e)
+            return []
+
+    async def get_assets_by_name(self, name, limit=100):
+        return await self.search_assets(name, limit)
+
+    async def search_assets(self, text, limit=20, typeahead=False):
+        try:
+            assets = []
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                if self.substring_search is None:
+                    found = await conn.execute(TRIGRAM_INDEX_QUERY, (trigram_index_name("assets"),))
+                    self.substring_search = (await found.fetchone())[0]
+                for query, params in search_queries("assets", ASSET_COLUMNS, text, typeahead, self.substring_search):
+                    # Unprepared, so each run is planned with the actual pattern and can use the prefix index.
+                    await cursor.execute(query, (*params, [row.id for row in assets], limit - len(assets)), prepare=False)
+                    assets += await cursor.fetchall()
+                    if len(assets) >= limit:
+                        break
+            logging.info("Found %d assets matching: %s", len(assets), text)
+            return assets
+        except Exception as e:
+            logging.error("Error searching assets (%s): %s", text, e)
+            return []
+
+    async def get_assets_page(self, limit, after_id=None):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Asset)) as cursor:
+                query = f"SELECT {ASSET_COLUMNS} FROM assets WHERE id > %s ORDER BY id LIMIT %s"
+                await cursor.execute(query, (after_id or 0, limit))
+                assets = await cursor.fetchall()
+                logging.info("Fetched %d assets after ID: %s", len(assets), after_id)
+                return assets
+        except Exception as e:
+            logging.error("Error fetching assets page (after ID: %s): %s", after_id, e)
+            return []
+
+    async def iter_assets(self, after_id=None, chunk_size=1000):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor(name="iter_assets", row_factory=args_row(Asset)) as cursor:
+                cursor.itersize = chunk_size
+                await cursor.execute(f"SELECT {ASSET_COLUMNS} FROM assets WHERE id > %s ORDER BY id", (after_id or 0,))
+                async for row in cursor:
+                    yield row
+        except Exception as e:
+            logging.error("Error streaming assets (after ID: %s): %s", after_id, e)
+
+    async def get_existing_category_ids(self, category_ids):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor() as cursor:
+                await cursor.execute("SELECT id FROM categories WHERE id = ANY(%s)", (list(category_ids),))
+                return {row[0] for row in await cursor.fetchall()}
+        except Exception as e:
+            logging.error("Error checking category IDs: %s", e)
+            return set()
+
+    async def copy_assets(self, rows):
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                async with cursor.copy("COPY assets (name, type, category_id) FROM STDIN") as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+                await conn.commit()
+                self.cache.invalidate_namespace("assets_by_category")
+                self.cache.invalidate_namespace("asset", negative_only=True)
+                logging.info("Copied %d assets into database.", len(rows))
+                return len(rows)
+        except Exception as e:
+            logging.error("Error copying %d assets: %s", len(rows), e)
+            return 0
+
+    async def get_assets_table(self):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = await read_table_async(cursor, f"SELECT {ASSET_COLUMNS} FROM assets ORDER BY id", None, ASSET_SCHEMA)
+                logging.info("Fetched %d assets as a columnar table.", table.num_rows)
+                return table
+        except Exception as e:
+            logging.error("Error fetching assets table: %s", e)
+            return ASSET_SCHEMA.empty_table()
@@ -0,0 +1,108 @@
+from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+from src.infra.Columnar import read_table_async
+from src.data_acess.CategoryRepository import CATEGORY_SCHEMA, CATEGORY_COLUMNS
+from src.models.Category import Category
+from psycopg.rows import args_row
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class AsyncCategoryRepository:
+    def __init__(self):
+        try:
+            self.pool = Connection().get_async_pool()
+            self.read_pool = Connection().get_async_read_pool()
+            self.cache = Cache.shared()
+        except Exception as e:
+            logging.critical("Error initializing AsyncCategoryRepository: %s", e)
+            raise
+
+    async def get_categories(self):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Category)) as cursor:
+                await cursor.execute(f"SELECT {CATEGORY_COLUMNS} FROM categories")
+                categories = await cursor.fetchall()
+                logging.info("Fetched %d categories from database.", len(categories))
+                return categories
+        except Exception as e:
+            logging.error("Error fetching categories: %s", e)
+            # Raised rather than returned empty: the cache would keep an empty result as a negative entry.
+            raise
+
+    async def insert_category(self, name, description):
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                query = "INSERT INTO categories (name, description) VALUES (%s, %s)"
+                await cursor.execute(query, (name, description))
+                await conn.commit()
+                self.cache.invalidate(("categories",))
+                self.cache.invalidate_namespace("category", negative_only=True)
+                logging.info("Category inserted successfully: %s, %s", name, description)
+        except Exception as e:
+            logging.error("Error inserting category (name: %s): %s", name, e)
+
+    async def delete_category(self, category_id):
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                query = "DELETE FROM categories WHERE id = %s"
+                await cursor.execute(query, (category_id,))
+                await conn.commit()
+                self.cache.invalidate(("category", category_id), ("categories",))
+                self.cache.invalidate_namespace("asset")
+                self.cache.invalidate_namespace("assets_by_category")
+                logging.info("Category deleted successfully (ID: %s).", category_id)
+        except Exception as e:
+            logging.error("Error deleting category (ID: %s): %s", category_id, e)
+
+    async def update_category(self, category_id, name=None):
+        try:
+            fields = []
+            values = []
+
+            if name:
+                fields.append("name = %s")
+                values.append(name)
+
+            query = "UPDATE categories SET " + ", ".join(fields) + " WHERE id = %s"
+            values.append(category_id)
+
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                await cursor.execute(query, values)
+                await conn.commit()
+                self.cache.invalidate(("category", category_id), ("categories",))
+                logging.info("Category updated successfully (ID: %s).", category_id)
+        except Exception as e:
+            logging.error("Error updating category (ID: %s): %s", category_id, e)
+
+    async def get_category_by_id(self, category_id):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Category)) as cursor:
+                await cursor.execute(f"SELECT {CATEGORY_COLUMNS} FROM categories WHERE id = %s", (category_id,))
+                category = await cursor.fetchone()
+                logging.info("Fetched category from database (ID: %s).", category_id)
+                return category
+        except Exception as e:
+            logging.error("Error fetching category (ID: %s): %s", category_id, e)
+            raise
+
+    async def get_categories_by_name(self, name):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Category)) as cursor:
+                await cursor.execute(f"SELECT {CATEGORY_COLUMNS} FROM categories WHERE name = %s", (name,))
+                categories = await cursor.fetchall()
+                logging.info("Fetched %d categories from database.", len(categories))
+                return categories
+        except Exception as e:
+            logging.error("Error fetching categories by name (name: %s): %s", name, e)
+            return []
+
+    async def get_categories_table(self):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = await read_table_async(cursor, f"SELECT {CATEGORY_COLUMNS} FROM categories ORDER BY id", None, CATEGORY_SCHEMA)
+                logging.info("Fetched %d categories as a columnar table.", table.num_rows)
+                return table
+        except Exception as e:
+            logging.error("Error fetching categories table: %s", e)
+            return CATEGORY_SCHEMA.empty_table()
@@ -0,0 +1,38 @@
+from src.infra.Connection import Connection
+from src.data_acess.CategoryStatsRepository import STATS_COLUMNS, PEER_QUERY, build_stats_filters
+from src.models.CategoryIndicatorStats import CategoryIndicatorStats
+from psycopg.rows import args_row
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class AsyncCategoryStatsRepository:
+    def __init__(self):
+        try:
+            self.read_pool = Connection().get_async_read_pool()
+        except Exception as e:
+            logging.critical("Error initializing AsyncCategoryStatsRepository: %s", e)
+            raise
+
+    async def get_category_stats(self, category_id, names=None):
+        try:
+            where, values = build_stats_filters(category_id, names)
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(CategoryIndicatorStats)) as cursor:
+                await cursor.execute(f"SELECT {STATS_COLUMNS} FROM category_indicator_stats{where} ORDER BY name", values)
+                stats = await cursor.fetchall()
+                logging.info("Fetched %d indicator statistics of category ID: %s", len(stats), category_id)
+                return stats
+        except Exception as e:
+            logging.error("Error fetching indicator statistics of category ID (%s): %s", category_id, e)
+            return []
+
+    async def get_peer_rows(self, asset_id):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                await cursor.execute(PEER_QUERY, (asset_id,))
+                rows = await cursor.fetchall()
+                logging.info("Fetched %d peer comparison rows for asset ID: %s", len(rows), asset_id)
+                return rows
+        except Exception as e:
+            logging.error("Error fetching peer comparison rows for asset ID (%s): %s", asset_id, e)
+            return []
@@ -0,0 +1,78 @@
+from src.infra.Connection import Connection
+from src.infra.Columnar import read_aggregated_table_async
+from src.data_acess.IndicatorHistoryRepository import HISTORY_COLUMNS, HISTORY_SCHEMA, HISTORY_ORDER, SUMMARY_QUERY, STAGING_QUERY, MERGE_STAGING_QUERY, build_history_filters, build_bucket_query, build_extremes_query
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class AsyncIndicatorHistoryRepository:
+    def __init__(self):
+        try:
+            self.pool = Connection().get_async_pool()
+            self.read_pool = Connection().get_async_read_pool()
+        except Exception as e:
+            logging.critical("Error initializing AsyncIndicatorHistoryRepository: %s", e)
+            raise
+
+    async def get_history_table(self, indicator_ids, start=None, end=None):
+        try:
+            where, values = build_history_filters(indicator_ids, start, end)
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                query = f"SELECT {HISTORY_COLUMNS} FROM indicator_history{where} ORDER BY indicator_id, recorded_at"
+                table = await read_aggregated_table_async(cursor, query, values, HISTORY_SCHEMA, HISTORY_ORDER)
+                logging.info("Fetched %d history points for %d indicators.", table.num_rows, len(indicator_ids))
+                return table
+        except Exception as e:
+            logging.error("Error fetching indicator history (IDs: %s): %s", indicator_ids, e)
+            return HISTORY_SCHEMA.empty_table()
+
+    async def get_history_buckets_table(self, indicator_ids, start, end, width):
+        try:
+            where, values = build_history_filters(indicator_ids, start, end)
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = await read_aggregated_table_async(cursor, build_bucket_query(where), [width, start, *values], HISTORY_SCHEMA, HISTORY_ORDER)
+                logging.info("Fetched %d history buckets for %d indicators.", table.num_rows, len(indicator_ids))
+                return table
+        except Exception as e:
+            logging.error("Error fetching indicator history buckets (IDs: %s): %s", indicator_ids, e)
+            return HISTORY_SCHEMA.empty_table()
+
+    async def get_history_extremes_table(self, indicator_ids, start, end, width):
+        try:
+            where, values = build_history_filters(indicator_ids, start, end)
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = await read_aggregated_table_async(cursor, build_extremes_query(where), [*values, width, start], HISTORY_SCHEMA, HISTORY_ORDER)
+                logging.info("Fetched %d history extremes for %d indicators.", table.num_rows, len(indicator_ids))
+                return table
+        except Exception as e:
+            logging.error("Error fetching indicator history extremes (IDs: %s): %s", indicator_ids, e)
+            return HISTORY_SCHEMA.empty_table()
+
+    async def get_history_summary(self, indicator_ids, start=None, end=None):
+        try:
+            where, values = build_history_filters(indicator_ids, start, end)
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                await cursor.execute(SUMMARY_QUERY + where, values)
+                return await cursor.fetchone()
+        except Exception as e:
+            logging.error("Error fetching indicator history summary (IDs: %s): %s", indicator_ids, e)
+            return (None, None, 0)
+
+    async def append_history(self, rows):
+        if not rows:
+            return 0
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                await cursor.execute("SELECT ensure_indicator_history_partitions(%s, %s)", (min(row[1] for row in rows), max(row[1] for row in rows)))
+                await conn.commit()
+                await cursor.execute(STAGING_QUERY)
+                async with cursor.copy("COPY indicator_history_staging (indicator_id, recorded_at, value) FROM STDIN") as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+                await cursor.execute(MERGE_STAGING_QUERY)
+                await conn.commit()
+                logging.info("Appended %d history points.", len(rows))
+                return len(rows)
+        except Exception as e:
+            logging.error("Error appending %d history points: %s", len(rows), e)
+            return 0
@@ -0,0 +1,260 @@
+from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+from src.infra.Search import TRIGRAM_INDEX_QUERY, trigram_index_name, search_queries, escape_like, distinct_prefix_query
+from src.infra.Columnar import read_table_async
+from src.data_acess.IndicatorRepository import INDICATOR_SCHEMA, INDICATOR_COLUMNS, build_value_filters
+from src.models.Indicator import Indicator
+from psycopg.rows import args_row
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class AsyncIndicatorRepository:
+    def __init__(self):
+        try:
+            self.pool = Connection().get_async_pool()
+            self.read_pool = Connection().get_async_read_pool()
+            self.cache = Cache.shared()
+            self.substring_search = None
+        except Exception as e:
+            logging.critical("Error initializing AsyncIndicatorRepository: %s", e)
+            raise
+
+    async def get_indicators(self):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                await cursor.execute(f"SELECT {INDICATOR_COLUMNS} FROM indicators")
+                indicators = await cursor.fetchall()
+                logging.info("Fetched %d indicators from database.", len(indicators))
+                return indicators
+        except Exception as e:
+            logging.error("Error fetching indicators: %s", e)
+            return []
+
+    async def insert_indicator(self, name, value, asset_id):
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                query = "INSERT INTO indicators (name, value, asset_id) VALUES (%s, %s, %s)"
+                await cursor.execute(query, (name, value, asset_id))
+                await conn.commit()
+                self.cache.invalidate(("indicators_by_asset", asset_id))
+                self.cache.invalidate_namespace("indicator", negative_only=True)
+                logging.info("Indicator inserted successfully: %s, %s, %s", name, value, asset_id)
+        except Exception as e:
+            logging.error("Error inserting indicator (name: %s, value: %s, asset_id: %s): %s", name, value, asset_id, e)
+
+    async def delete_indicator(self, indicator_id):
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                query = "DELETE FROM indicators WHERE id = %s"
+                await cursor.execute(query, (indicator_id,))
+                await conn.commit()
+                self.cache.invalidate(("indicator", indicator_id))
+                self.cache.invalidate_namespace("indicators_by_asset")
+                logging.info("Indicator deleted successfully (ID: %s).", indicator_id)
+        except Exception as e:
+            logging.error("Error deleting indicator (ID: %s): %s", indicator_id, e)
+
+    async def update_indicator(self, indicator_id, name=None, value=None, asset_id=None):
+        try:
+            fields = []
+            values = []
+
+            if name:
+                fields.append("name = %s")
+                values.append(name)
+            if value is not None:
+                fields.append("value = %s")
+                values.append(value)
+            if asset_id:
+                fields.append("asset_id = %s")
+                values.append(asset_id)
+
+            if fields:
+                async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                    query = f"UPDATE indicators SET {', '.join(fields)} WHERE id = %s"
+                    values.append(indicator_id)
+                    await cursor.execute(query, tuple(values))
+                    await conn.commit()
+                    self.cache.invalidate(("indicator", indicator_id))
+                    self.cache.invalidate_namespace("indicators_by_asset")
+                    logging.info("Indicator updated successfully (ID: %s).", indicator_id)
+            else:
+                logging.warning("No fields provided for indicator update (ID: %s).", indicator_id)
+        except Exception as e:
+            logging.error("Error updating indicator (ID: %s): %s", indicator_id, e)
+
+    async def get_indicator_by_id(self, indicator_id):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE id = %s"
+                await cursor.execute(query, (indicator_id,))
+                indicator = await cursor.fetchone()
+                if indicator:
+                    logging.info("Fetched indicator by ID: %s", indicator_id)
+                else:
+                    logging.warning("No indicator found with ID: %s", indicator_id)
+                return indicator
+        except Exception as e:
+            logging.error("Error fetching indicator by ID (%s): %s", indicator_id, e)
+            # Raised rather than returned empty: the cache would keep an empty result as a negative entry.
+            raise
+
+    async def get_indicators_by_name(self, name, limit=100):
+        return await self.search_indicators(name, limit)
+
+    async def search_indicators(self, text, limit=20, typeahead=False):
+        try:
+            indicators = []
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                if self.substring_search is None:
+                    found = await conn.execute(TRIGRAM_INDEX_QUERY, (trigram_index_name("indicators"),))
+                    self.substring_search = (await found.fetchone())[0]
+                for query, params in search_queries("indicators", INDICATOR_COLUMNS, text, typeahead, self.substring_search):
+                    # Unprepared, so each run is planned with the actual pattern and can use the prefix index.
+                    await cursor.execute(query, (*params, [row.id for row in indicators], limit - len(indicators)), prepare=False)
+                    indicators += await cursor.fetchall()
+                    if len(indicators) >= limit:
+                        break
+            logging.info("Found %d indicators matching: %s", len(indicators), text)
+            return indicators
+        except Exception as e:
+            logging.error("Error searching indicators (%s): %s", text, e)
+            return []
+
+    async def get_indicator_names_by_prefix(self, text, limit=10):
+        try:
+            text = text.strip()
+            if not text:
+                return []
+            pattern = escape_like(text) + "%"
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                await cursor.execute(distinct_prefix_query("indicators"), (pattern, pattern, limit), prepare=False)
+                names = [row[0] for row in await cursor.fetchall()]
+                logging.info("Found %d indicator names starting with: %s", len(names), text)
+                return names
+        except Exception as e:
+            logging.error("Error fetching indicator names by prefix (%s): %s", text, e)
+            return []
+
+    async def get_indicators_by_asset(self, asset_id):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE asset_id = %s"
+                await cursor.execute(query, (asset_id,))
+                indicators = await cursor.fetchall()
+                logging.info("Fetched %d indicators by asset ID: %s", len(indicators), asset_id)
+                return indicators
+        except Exception as e:
+            logging.error("Error fetching indicators by asset ID (%s): %s", asset_id, e)
+            raise
+
+    async def get_indicators_by_assets(self, asset_ids):
+        try:
+            grouped = {asset_id: [] for asset_id in asset_ids}
+            async with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE asset_id = ANY(%s) ORDER BY asset_id, id"
+                await cursor.execute(query, (list(grouped),))
+                for indicator in await cursor.fetchall():
+                    grouped[indicator.asset_id].append(indicator)
+                logging.info("Fetched indicators for %d assets.", len(grouped))
+                return grouped
+        except Exception as e:
+            logging.error("Error fetching indicators by asset IDs (%d IDs): %s", len(asset_ids), e)
+            raise
+
+    async def get_indicators_by_value(self, name, min_value=None, max_value=None, limit=1000):
+        try:
+            where, values = build_value_filters(name, min_value, max_value)
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators{where} ORDER BY value, id LIMIT %s"
+                await cursor.execute(query, (*values, limit))
+                indicators = await cursor.fetchall()
+                logging.info("Fetched %d indicators by value (name: %s, range: %s - %s)", len(indicators), name, min_value, max_value)
+                return indicators
+        except Exception as e:
+            logging.error("Error fetching indicators by value (name: %s, range: %s - %s): %s", name, min_value, max_value, e)
+            return []
+
+    async def get_value_distribution(self, name, bins, quantiles, min_value=None, max_value=None):
+        try:
+            where, values = build_value_filters(name, min_value, max_value)
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                await cursor.execute(
+                    "SELECT count(*), min(value)::float8, max(value)::float8, avg(value)::float8,"
+                    " percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY value::float8)"
+                    f" FROM indicators{where}",
+                    (list(quantiles), *values),
+                )
+                stats = await cursor.fetchone()
+                buckets = []
+                count, low, high = stats[0], stats[1], stats[2]
+                if count and high > low:
+                    # width_bucket puts the maximum in bucket bins + 1, so it is folded into the last bucket.
+                    await cursor.execute(
+                        "SELECT least(width_bucket(value::float8, %s, %s, %s), %s) AS bucket, count(*)"
+                        f" FROM indicators{where} GROUP BY bucket ORDER BY bucket",
+                        (low, high, bins, bins, *values),
+                    )
+                    buckets = await cursor.fetchall()
+                logging.info("Computed value distribution for indicator %s over %d rows.", name, count)
+                return stats, buckets
+        except Exception as e:
+            logging.error("Error computing value distribution (name: %s): %s", name, e)
+            return None, []
+
+    async def get_indicators_page(self, limit, after_id=None):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE id > %s ORDER BY id LIMIT %s"
+                await cursor.execute(query, (after_id or 0, limit))
+                indicators = await cursor.fetchall()
+                logging.info("Fetched %d indicators after ID: %s", len(indicators), after_id)
+                return indicators
+        except Exception as e:
+            logging.error("Error fetching indicators page (after ID: %s): %s", after_id, e)
+            return []
+
+    async def iter_indicators(self, after_id=None, chunk_size=1000):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor(name="iter_indicators", row_factory=args_row(Indicator)) as cursor:
+                cursor.itersize = chunk_size
+                await cursor.execute(f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE id > %s ORDER BY id", (after_id or 0,))
+                async for row in cursor:
+                    yield row
+        except Exception as e:
+            logging.error("Error streaming indicators (after ID: %s): %s", after_id, e)
+
+    async def get_existing_asset_ids(self, asset_ids):
+        try:
+            async with self.pool.read_connection() as conn, conn.cursor() as cursor:
+                await cursor.execute("SELECT id FROM assets WHERE id = ANY(%s)", (list(asset_ids),))
+                return {row[0] for row in await cursor.fetchall()}
+        except Exception as e:
+            logging.error("Error checking asset IDs: %s", e)
+            return set()
+
+    async def copy_indicators(self, rows):
+        try:
+            async with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                async with cursor.copy("COPY indicators (name, value, asset_id) FROM STDIN") as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+                await conn.commit()
+                self.cache.invalidate(*{("indicators_by_asset", row[2]) for row in rows})
+                self.cache.invalidate_namespace("indicator", negative_only=True)
+                logging.info("Copied %d indicators into database.", len(rows))
+                return len(rows)
+        except Exception as e:
+            logging.error("Error copying %d indicators: %s", len(rows), e)
+            return 0
+
+    async def get_indicators_table(self):
+        try:
+            async with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = await read_table_async(cursor, f"SELECT {INDICATOR_COLUMNS} FROM indicators ORDER BY id", None, INDICATOR_SCHEMA)
+                logging.info("Fetched %d indicators as a columnar table.", table.num_rows)
+                return table
+        except Exception as e:
+            logging.error("Error fetching indicators table: %s", e)
+            return INDICATOR_SCHEMA.empty_table()
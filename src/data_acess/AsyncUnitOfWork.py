@@ -0,0 +1,94 @@
+import asyncio
+import random
+from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+from src.data_acess.UnitOfWork import Ref, INSERT_ROWS_PER_STATEMENT, LOCK_TABLE_VERSIONS, RETRIED_ERRORS, MAX_ATTEMPTS, RETRY_DELAY, build_operation, group_runs, changed_entities, locked_tables
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class AsyncUnitOfWork:
+    def __init__(self):
+        try:
+            self.pool = Connection().get_async_pool()
+            self.cache = Cache.shared()
+            self.operations = []
+        except Exception as e:
+            logging.critical("Error initializing AsyncUnitOfWork: %s", e)
+            raise
+
+    def queue(self, kind, entity, id=None, values=None):
+        self.operations.append(build_operation(kind, entity, id, values or {}, len(self.operations)))
+        return Ref(len(self.operations) - 1)
+
+    def insert(self, entity, values):
+        return self.queue("insert", entity, values=values)
+
+    def update(self, entity, id, values):
+        return self.queue("update", entity, id, values)
+
+    def delete(self, entity, id):
+        return self.queue("delete", entity, id)
+
+    async def commit(self):
+        operations, self.operations = self.operations, []
+        if not operations:
+            return []
+        tables = locked_tables(operations)
+
+        async def fetch(index):
+            cursor, indices = unfetched[index]
+            for run_index, id in zip(indices, sorted(row[0] for row in await cursor.fetchall())):
+                ids[run_index] = id
+                del unfetched[run_index]
+
+        async def resolve(value):
+            if isinstance(value, Ref):
+                if value.index in unfetched:
+                    await fetch(value.index)
+                return ids[value.index]
+            return value
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            ids, unfetched = [None] * len(operations), {}
+            try:
+                async with self.pool.write_connection() as conn:
+                    async with conn.pipeline():
+                        await conn.execute(LOCK_TABLE_VERSIONS, [tables])
+                        for (kind, entity, fields), indices in group_runs(operations):
+                            for index in indices:
+                                ids[index] = await resolve(operations[index][4])
+                            if kind == "insert":
+                                row = f"({', '.join(['%s'] * len(fields))})"
+                                for start in range(0, len(indices), INSERT_ROWS_PER_STATEMENT):
+                                    chunk = indices[start:start + INSERT_ROWS_PER_STATEMENT]
+                                    cursor = conn.cursor()
+                                    await cursor.execute(
+                                        f"INSERT INTO {entity} ({', '.join(fields)}) VALUES {', '.join([row] * len(chunk))} RETURNING id",
+                                        [await resolve(value) for index in chunk for value in operations[index][3]],
+                                    )
+                                    for index in chunk:
+                                        unfetched[index] = (cursor, chunk)
+                            elif kind == "update" and fields:
+                                await conn.cursor().executemany(
+                                    f"UPDATE {entity} SET {', '.join(f'{field} = %s' for field in fields)} WHERE id = %s",
+                                    [[await resolve(value) for value in operations[index][3]] for index in indices],
+                                )
+                            elif kind == "delete":
+                                await conn.cursor().execute(f"DELETE FROM {entity} WHERE id = ANY(%s)", [[ids[index] for index in indices]])
+                        while unfetched:
+                            await fetch(next(iter(unfetched)))
+                break
+            except RETRIED_ERRORS as e:
+                if attempt == MAX_ATTEMPTS:
+                    logging.error("Error committing %d operations, all rolled back after %d attempts: %s", len(operations), attempt, e)
+                    raise
+                logging.warning("Retrying %d operations after a rolled back attempt: %s", len(operations), e)
+                await asyncio.sleep(random.uniform(0, RETRY_DELAY * 2 ** attempt))
+            except Exception as e:
+                logging.error("Error committing %d operations, all rolled back: %s", len(operations), e)
+                raise
+        for entity, entity_ids in changed_entities(operations, ids).items():
+            self.cache.invalidate_entity(entity, entity_ids)
+        logging.info("Committed %d operations in one transaction.", len(operations))
+        return ids
@@ -1,88 +1,111 @@
 from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+from src.infra.Columnar import read_table
+from src.models.Category import Category
+from psycopg.rows import args_row
+import pyarrow as pa
 
 import logging
 logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
 
+CATEGORY_COLUMNS = "id, name, description"
+CATEGORY_SCHEMA = pa.schema([("id", pa.int64()), ("name", pa.string()), ("description", pa.string())])
+
 class CategoryRepository:
     def __init__(self):
         try:
-            self.connection = Connection().get_connection()
+            self.pool = Connection().get_pool()
+            self.read_pool = Connection().get_read_pool()
+            self.cache = Cache.shared()
         except Exception as e:
             logging.critical("Error initializing CategoryRepository: %s", e)
             raise
-    
+
     def get_categories(self):
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM categories")
+            with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Category)) as cursor:
+                cursor.execute(f"SELECT {CATEGORY_COLUMNS} FROM categories")
                 categories = cursor.fetchall()
                 logging.info("Fetched %d categories from database.", len(categories))
                 return categories
         except Exception as e:
             logging.error("Error fetching categories: %s", e)
-            return []
-        
+            # Raised rather than returned empty: the cache would keep an empty result as a negative entry.
+            raise
+
     def insert_category(self, name, description):
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
                 query = "INSERT INTO categories (name, description) VALUES (%s, %s)"
                 cursor.execute(query, (name, description))
-                self.connection.commit()
+                conn.commit()
+                self.cache.invalidate(("categories",))
+                self.cache.invalidate_namespace("category", negative_only=True)
                 logging.info("Category inserted successfully: %s, %s", name, description)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error inserting category (name: %s): %s", name, e)
-            
+
     def delete_category(self, category_id):
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
                 query = "DELETE FROM categories WHERE id = %s"
                 cursor.execute(query, (category_id,))
-                self.connection.commit()
+                conn.commit()
+                self.cache.invalidate(("category", category_id), ("categories",))
+                self.cache.invalidate_namespace("asset")
+                self.cache.invalidate_namespace("assets_by_category")
                 logging.info("Category deleted successfully (ID: %s).", category_id)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error deleting category (ID: %s): %s", category_id, e)
-            
+
     def update_category(self, category_id, name=None):
         try:
             fields = []
             values = []
-            
+
             if name:
                 fields.append("name = %s")
                 values.append(name)
-            
+
             query = "UPDATE categories SET " + ", ".join(fields) + " WHERE id = %s"
             values.append(category_id)
-            
-            with self.connection.cursor() as cursor:
+
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
                 cursor.execute(query, values)
-                self.connection.commit()
+                conn.commit()
+                self.cache.invalidate(("category", category_id), ("categories",))
                 logging.info("Category updated successfully (ID: %s).", category_id)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error updating category (ID: %s): %s", category_id, e)
-            
+
     def get_category_by_id(self, category_id):
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM categories WHERE id = %s", (category_id,))
+            with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Category)) as cursor:
+                cursor.execute(f"SELECT {CATEGORY_COLUMNS} FROM categories WHERE id = %s", (category_id,))
                 category = cursor.fetchone()
                 logging.info("Fetched category from database (ID: %s).", category_id)
                 return category
         except Exception as e:
             logging.error("Error fetching category (ID: %s): %s", category_id, e)
-            return None
-        
+            raise
+
     def get_categories_by_name(self, name):
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM categories WHERE name = %s", (name,))
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Category)) as cursor:
+                cursor.execute(f"SELECT {CATEGORY_COLUMNS} FROM categories WHERE name = %s", (name,))
                 categories = cursor.fetchall()
                 logging.info("Fetched %d categories from database.", len(categories))
                 return categories
         except Exception as e:
             logging.error("Error fetching categories by name (name: %s): %s", name, e)
             return []
-        
+
+    def get_categories_table(self):
+        try:
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = read_table(cursor, f"SELECT {CATEGORY_COLUMNS} FROM categories ORDER BY id", None, CATEGORY_SCHEMA)
+                logging.info("Fetched %d categories as a columnar table.", table.num_rows)
+                return table
+        except Exception as e:
+            logging.error("Error fetching categories table: %s", e)
+            return CATEGORY_SCHEMA.empty_table()
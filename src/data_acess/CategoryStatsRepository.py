@@ -0,0 +1,60 @@
+from src.infra.Connection import Connection
+from src.models.CategoryIndicatorStats import CategoryIndicatorStats
+from psycopg.rows import args_row
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# category_indicator_stats is kept current by the triggers of migration 10, so reads are primary key lookups.
+STATS_COLUMNS = "category_id, name, count, mean, stddev, min, p10, p25, median, p75, p90, max"
+
+def build_stats_filters(category_id, names=None):
+    filters = ["category_id = %s"]
+    values = [category_id]
+
+    if names:
+        filters.append("name = ANY(%s)")
+        values.append(list(names))
+
+    return " WHERE " + " AND ".join(filters), values
+
+# The asset's indicators with the statistics of their category group, or nulls when the asset has no category.
+PEER_QUERY = (
+    "SELECT i.id, i.name, i.value::float8 AS value, "
+    + ", ".join(f"s.{column}" for column in STATS_COLUMNS.split(", "))
+    + " FROM indicators i"
+    " JOIN assets a ON a.id = i.asset_id"
+    " LEFT JOIN category_indicator_stats s ON s.category_id = a.category_id AND s.name = i.name"
+    " WHERE i.asset_id = %s ORDER BY i.name, i.id"
+)
+
+class CategoryStatsRepository:
+    def __init__(self):
+        try:
+            self.read_pool = Connection().get_read_pool()
+        except Exception as e:
+            logging.critical("Error initializing CategoryStatsRepository: %s", e)
+            raise
+
+    def get_category_stats(self, category_id, names=None):
+        try:
+            where, values = build_stats_filters(category_id, names)
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(CategoryIndicatorStats)) as cursor:
+                cursor.execute(f"SELECT {STATS_COLUMNS} FROM category_indicator_stats{where} ORDER BY name", values)
+                stats = cursor.fetchall()
+                logging.info("Fetched %d indicator statistics of category ID: %s", len(stats), category_id)
+                return stats
+        except Exception as e:
+            logging.error("Error fetching indicator statistics of category ID (%s): %s", category_id, e)
+            return []
+
+    def get_peer_rows(self, asset_id):
+        try:
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(PEER_QUERY, (asset_id,))
+                rows = cursor.fetchall()
+                logging.info("Fetched %d peer comparison rows for asset ID: %s", len(rows), asset_id)
+                return rows
+        except Exception as e:
+            logging.error("Error fetching peer comparison rows for asset ID (%s): %s", asset_id, e)
+            return []
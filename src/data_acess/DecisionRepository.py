@@ -0,0 +1,140 @@
+from src.infra.Connection import Connection
+from src.infra.Columnar import read_table
+from src.models.DecisionRow import DecisionRow
+from psycopg.rows import args_row
+import pyarrow as pa
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+DECISION_VIEW_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("name", pa.string()),
+    ("value", pa.float64()),
+    ("asset_id", pa.int64()),
+    ("asset_name", pa.string()),
+    ("category_id", pa.int64()),
+    ("category_name", pa.string()),
+])
+
+class DecisionRepository:
+    def __init__(self):
+        try:
+            self.read_pool = Connection().get_read_pool()
+        except Exception as e:
+            logging.critical("Error initializing DecisionRepository: %s", e)
+            raise
+
+    def build_filters(self, asset_ids=None, category_ids=None, indicator_names=None, asset_types=None):
+        filters = []
+        values = []
+
+        if asset_ids:
+            filters.append("i.asset_id = ANY(%s)")
+            values.append(list(asset_ids))
+        if category_ids:
+            filters.append("a.category_id = ANY(%s)")
+            values.append(list(category_ids))
+        if indicator_names:
+            filters.append("i.name = ANY(%s)")
+            values.append(list(indicator_names))
+        if asset_types:
+            filters.append("a.type = ANY(%s)")
+            values.append(list(asset_types))
+
+        where = f" WHERE {' AND '.join(filters)}" if filters else ""
+        return where, values
+
+    def build_view_query(self, asset_ids=None, category_ids=None, indicator_names=None, limit=None):
+        where, values = self.build_filters(asset_ids, category_ids, indicator_names)
+        query = (
+            "SELECT i.id, i.name, i.value::float8 AS value, a.id AS asset_id, a.name AS asset_name,"
+            " c.id AS category_id, c.name AS category_name"
+            " FROM indicators i"
+            " JOIN assets a ON a.id = i.asset_id"
+            " LEFT JOIN categories c ON c.id = a.category_id"
+            f"{where} ORDER BY a.name, i.name, i.id"
+        )
+        if limit:
+            query += " LIMIT %s"
+            values.append(limit)
+        return query, values
+
+    def get_decision_view(self, asset_ids=None, category_ids=None, indicator_names=None, limit=None):
+        try:
+            query, values = self.build_view_query(asset_ids, category_ids, indicator_names, limit)
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(DecisionRow)) as cursor:
+                cursor.execute(query, values)
+                rows = cursor.fetchall()
+                logging.info("Fetched %d decision rows.", len(rows))
+                return rows
+        except Exception as e:
+            logging.error("Error fetching decision view (assets: %s, categories: %s, indicators: %s): %s", asset_ids, category_ids, indicator_names, e)
+            return []
+
+    def get_decision_view_table(self, asset_ids=None, category_ids=None, indicator_names=None, limit=None):
+        try:
+            query, values = self.build_view_query(asset_ids, category_ids, indicator_names, limit)
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = read_table(cursor, query, values, DECISION_VIEW_SCHEMA)
+                logging.info("Fetched %d decision rows as a columnar table.", table.num_rows)
+                return table
+        except Exception as e:
+            logging.error("Error fetching decision view table (assets: %s, categories: %s, indicators: %s): %s", asset_ids, category_ids, indicator_names, e)
+            return DECISION_VIEW_SCHEMA.empty_table()
+
+    def get_indicator_names(self):
+        try:
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT DISTINCT name FROM indicators ORDER BY name")
+                names = [row[0] for row in cursor.fetchall()]
+                logging.info("Fetched %d indicator names.", len(names))
+                return names
+        except Exception as e:
+            logging.error("Error fetching indicator names: %s", e)
+            return []
+
+    def build_asset_filters(self, asset_ids=None, category_ids=None, asset_types=None):
+        filters = []
+        values = []
+
+        if asset_ids:
+            filters.append("a.id = ANY(%s)")
+            values.append(list(asset_ids))
+        if category_ids:
+            filters.append("a.category_id = ANY(%s)")
+            values.append(list(category_ids))
+        if asset_types:
+            filters.append("a.type = ANY(%s)")
+            values.append(list(asset_types))
+
+        where = f" WHERE {' AND '.join(filters)}" if filters else ""
+        return where, values
+
+    def get_matrix_columns(self, asset_ids=None, category_ids=None, indicator_names=None, asset_types=None):
+        # One row per indicator name with the asset IDs and values packed as big-endian int8/float8
+        # bytes, so a matrix of millions of cells arrives in a few rows instead of one per cell.
+        # The names of the assets that pass the filters come from a second query in the same snapshot.
+        try:
+            where, values = self.build_filters(asset_ids, category_ids, indicator_names, asset_types)
+            # One value per (asset, indicator name): the most recently inserted row wins.
+            query = (
+                "SELECT m.name, string_agg(int8send(m.asset_id), ''), string_agg(float8send(coalesce(m.value, 'NaN')), '')"
+                " FROM (SELECT DISTINCT ON (i.asset_id, i.name) i.asset_id, i.name, i.value::float8 AS value"
+                " FROM indicators i"
+                " JOIN assets a ON a.id = i.asset_id"
+                f"{where} ORDER BY i.asset_id, i.name, i.id DESC) AS m"
+                ' GROUP BY m.name ORDER BY m.name COLLATE "C"'
+            )
+            asset_where, asset_values = self.build_asset_filters(asset_ids, category_ids, asset_types)
+            with self.read_pool.connection() as conn, conn.cursor(binary=True) as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                cursor.execute(query, values)
+                columns = cursor.fetchall()
+                cursor.execute(f"SELECT a.id, a.name FROM assets a{asset_where} ORDER BY a.id", asset_values)
+                assets = cursor.fetchall()
+                logging.info("Fetched %d matrix columns.", len(columns))
+                return columns, assets
+        except Exception as e:
+            logging.error("Error fetching indicator matrix (categories: %s, types: %s): %s", category_ids, asset_types, e)
+            return [], []
@@ -0,0 +1,92 @@
+from src.infra.Connection import Connection
+import pyarrow as pa
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+EXPORT_SCHEMA = pa.schema([
+    ("asset_id", pa.int64()),
+    ("asset_name", pa.string()),
+    ("asset_type", pa.string()),
+    ("category_id", pa.int64()),
+    ("category_name", pa.string()),
+    ("indicator_id", pa.int64()),
+    ("indicator_name", pa.string()),
+    ("value", pa.float64()),
+])
+# COPY sends one message per row; they are joined into blocks of about this size before being handed on.
+EXPORT_BLOCK_SIZE = 1 << 20
+
+def build_export_query(asset_ids=None, category_ids=None, asset_types=None, indicator_names=None, min_value=None, max_value=None):
+    filters = []
+    values = []
+
+    if asset_ids:
+        filters.append("i.asset_id = ANY(%s)")
+        values.append(list(asset_ids))
+    if category_ids:
+        filters.append("a.category_id = ANY(%s)")
+        values.append(list(category_ids))
+    if asset_types:
+        filters.append("a.type = ANY(%s)")
+        values.append(list(asset_types))
+    if indicator_names:
+        filters.append("i.name = ANY(%s)")
+        values.append(list(indicator_names))
+    if min_value is not None:
+        filters.append("i.value >= %s")
+        values.append(min_value)
+    if max_value is not None:
+        filters.append("i.value <= %s")
+        values.append(max_value)
+
+    where = f" WHERE {' AND '.join(filters)}" if filters else ""
+    # No ORDER BY: sorting a full export would spill to disk, while the unordered join is one pass.
+    query = (
+        "SELECT a.id AS asset_id, a.name AS asset_name, a.type AS asset_type, c.id AS category_id, c.name AS category_name,"
+        " i.id AS indicator_id, i.name AS indicator_name, i.value::float8 AS value"
+        " FROM indicators i"
+        " JOIN assets a ON a.id = i.asset_id"
+        f" LEFT JOIN categories c ON c.id = a.category_id{where}"
+    )
+    return query, values
+
+def build_copy_statement(query, format):
+    if format == "csv":
+        return f"COPY ({query}) TO STDOUT (FORMAT csv, HEADER)"
+    if format == "ndjson":
+        # One JSON object per line, built by Postgres. JSON escapes every control character, so with
+        # control characters as CSV quote and delimiter each line goes out verbatim.
+        return f"COPY (SELECT row_to_json(export) FROM ({query}) AS export) TO STDOUT (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+    if format == "rows":
+        # Headerless CSV, parsed by the caller (Parquet exports).
+        return f"COPY ({query}) TO STDOUT (FORMAT csv)"
+    raise ValueError(f"Unknown export format: {format}")
+
+class ExportRepository:
+    def __init__(self):
+        try:
+            self.read_pool = Connection().get_read_pool()
+        except Exception as e:
+            logging.critical("Error initializing ExportRepository: %s", e)
+            raise
+
+    def iter_export(self, format, filters, block_size=EXPORT_BLOCK_SIZE):
+        # Yields the joined dataset as blocks of COPY output. Errors are raised rather than ending
+        # the stream, so a failed export cannot pass for a complete, shorter one.
+        query, values = build_export_query(**filters)
+        try:
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                with cursor.copy(build_copy_statement(query, format), values) as copy:
+                    block = bytearray()
+                    for row in copy:
+                        block += row
+                        if len(block) >= block_size:
+                            yield bytes(block)
+                            block.clear()
+                    if block:
+                        yield bytes(block)
+                logging.info("Exported the %s dataset (filters: %s).", format, filters)
+        except Exception as e:
+            logging.error("Error exporting the %s dataset (filters: %s): %s", format, filters, e)
+            raise
@@ -0,0 +1,63 @@
+from src.infra.Connection import Connection
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class ImportRepository:
+    def __init__(self):
+        try:
+            self.pool = Connection().get_pool()
+        except Exception as e:
+            logging.critical("Error initializing ImportRepository: %s", e)
+            raise
+
+    def get_keys(self, table):
+        # (id, name) of every row of assets or categories, to resolve names once per import.
+        try:
+            with self.pool.read_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(f"SELECT id, name FROM {table}")
+                rows = cursor.fetchall()
+                logging.info("Fetched %d %s keys.", len(rows), table)
+                return rows
+        except Exception as e:
+            # An empty map would reject every row of the import and still journal its batches as done.
+            logging.error("Error fetching %s keys: %s", table, e)
+            raise
+
+    def get_imported_batches(self, job):
+        try:
+            # The journal decides what a resumed import skips, so it is read from the primary.
+            with self.pool.read_connection() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT first_row, row_count FROM import_batches WHERE job = %s", (job,))
+                return dict(cursor.fetchall())
+        except Exception as e:
+            # Without the journal a resumed import would write its committed batches again.
+            logging.error("Error fetching imported batches (job: %s): %s", job, e)
+            raise
+
+    def copy_batch(self, table, columns, data, job, first_row, row_count, defer_stats=False):
+        # Writes one batch of CSV rows and its journal entry in one transaction. Returns False when
+        # the batch was rolled back, so it is neither counted nor skipped by a resumed import.
+        try:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                if defer_stats:
+                    cursor.execute("SET LOCAL app.defer_category_stats = 'on'")
+                if data:
+                    with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN (FORMAT csv)") as copy:
+                        copy.write(data)
+                cursor.execute("INSERT INTO import_batches (job, first_row, row_count) VALUES (%s, %s, %s)", (job, first_row, row_count))
+                logging.info("Imported batch at row %d of job %s.", first_row, job)
+                return True
+        except Exception as e:
+            logging.error("Error importing batch at row %d of job %s: %s", first_row, job, e)
+            return False
+
+    def refresh_category_stats(self):
+        try:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT refresh_category_indicator_stats(array_agg(id)) FROM categories")
+                logging.info("Refreshed category indicator statistics.")
+                return True
+        except Exception as e:
+            logging.error("Error refreshing category indicator statistics: %s", e)
+            return False
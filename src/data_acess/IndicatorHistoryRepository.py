@@ -0,0 +1,133 @@
+from src.infra.Connection import Connection
+from src.infra.Columnar import read_aggregated_table
+import pyarrow as pa
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+HISTORY_COLUMNS = "indicator_id, recorded_at, value::float8 AS value"
+HISTORY_SCHEMA = pa.schema([("indicator_id", pa.int64()), ("recorded_at", pa.timestamp("us", tz="UTC")), ("value", pa.float64())])
+# History reads are bounded by the requested points, so they come back as one aggregated value.
+HISTORY_ORDER = "indicator_id, recorded_at"
+
+def build_history_filters(indicator_ids, start=None, end=None):
+    # indicator_id then a range on recorded_at, so each partition is read through its primary key
+    # and partitions outside [start, end] are pruned.
+    filters = ["indicator_id = ANY(%s)"]
+    values = [list(indicator_ids)]
+
+    if start is not None:
+        filters.append("recorded_at >= %s")
+        values.append(start)
+    if end is not None:
+        filters.append("recorded_at <= %s")
+        values.append(end)
+
+    return " WHERE " + " AND ".join(filters), values
+
+def build_bucket_query(where):
+    # One averaged point per bucket of the given width, aligned on the range start.
+    return (
+        "SELECT indicator_id, date_bin(%s, recorded_at, %s) AS recorded_at, avg(value)::float8 AS value"
+        f" FROM indicator_history{where} GROUP BY 1, 2 ORDER BY 1, 2"
+    )
+
+def build_extremes_query(where):
+    # The lowest and highest value of each bucket, placed at the bucket's first and last timestamps.
+    # One hash aggregation over the range instead of shipping every row; with several buckets per
+    # chart pixel the placement inside a bucket is not visible.
+    return (
+        "SELECT indicator_id, point.recorded_at, point.value FROM ("
+        " SELECT indicator_id, min(recorded_at) AS first_at, max(recorded_at) AS last_at, min(value)::float8 AS low, max(value)::float8 AS high"
+        f" FROM indicator_history{where} GROUP BY indicator_id, date_bin(%s, recorded_at, %s)"
+        ") AS buckets CROSS JOIN LATERAL ("
+        " SELECT first_at, low UNION ALL SELECT last_at, high WHERE last_at > first_at"
+        ") AS point (recorded_at, value) ORDER BY indicator_id, point.recorded_at"
+    )
+
+SUMMARY_QUERY = "SELECT min(recorded_at), max(recorded_at), count(*) FROM indicator_history"
+
+STAGING_QUERY = "CREATE TEMP TABLE indicator_history_staging (LIKE indicator_history) ON COMMIT DROP"
+# A batch may repeat a point; only one of them can go through ON CONFLICT in the same statement.
+MERGE_STAGING_QUERY = (
+    "INSERT INTO indicator_history (indicator_id, recorded_at, value)"
+    " SELECT DISTINCT ON (indicator_id, recorded_at) indicator_id, recorded_at, value FROM indicator_history_staging"
+    " ORDER BY indicator_id, recorded_at"
+    " ON CONFLICT (indicator_id, recorded_at) DO UPDATE SET value = EXCLUDED.value"
+)
+
+class IndicatorHistoryRepository:
+    def __init__(self):
+        try:
+            self.pool = Connection().get_pool()
+            self.read_pool = Connection().get_read_pool()
+        except Exception as e:
+            logging.critical("Error initializing IndicatorHistoryRepository: %s", e)
+            raise
+
+    def get_history_table(self, indicator_ids, start=None, end=None):
+        try:
+            where, values = build_history_filters(indicator_ids, start, end)
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                query = f"SELECT {HISTORY_COLUMNS} FROM indicator_history{where} ORDER BY indicator_id, recorded_at"
+                table = read_aggregated_table(cursor, query, values, HISTORY_SCHEMA, HISTORY_ORDER)
+                logging.info("Fetched %d history points for %d indicators.", table.num_rows, len(indicator_ids))
+                return table
+        except Exception as e:
+            logging.error("Error fetching indicator history (IDs: %s): %s", indicator_ids, e)
+            return HISTORY_SCHEMA.empty_table()
+
+    def get_history_buckets_table(self, indicator_ids, start, end, width):
+        try:
+            where, values = build_history_filters(indicator_ids, start, end)
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = read_aggregated_table(cursor, build_bucket_query(where), [width, start, *values], HISTORY_SCHEMA, HISTORY_ORDER)
+                logging.info("Fetched %d history buckets for %d indicators.", table.num_rows, len(indicator_ids))
+                return table
+        except Exception as e:
+            logging.error("Error fetching indicator history buckets (IDs: %s): %s", indicator_ids, e)
+            return HISTORY_SCHEMA.empty_table()
+
+    def get_history_extremes_table(self, indicator_ids, start, end, width):
+        try:
+            where, values = build_history_filters(indicator_ids, start, end)
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = read_aggregated_table(cursor, build_extremes_query(where), [*values, width, start], HISTORY_SCHEMA, HISTORY_ORDER)
+                logging.info("Fetched %d history extremes for %d indicators.", table.num_rows, len(indicator_ids))
+                return table
+        except Exception as e:
+            logging.error("Error fetching indicator history extremes (IDs: %s): %s", indicator_ids, e)
+            return HISTORY_SCHEMA.empty_table()
+
+    def get_history_summary(self, indicator_ids, start=None, end=None):
+        # First and last timestamps and the number of points in the range.
+        try:
+            where, values = build_history_filters(indicator_ids, start, end)
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(SUMMARY_QUERY + where, values)
+                return cursor.fetchone()
+        except Exception as e:
+            logging.error("Error fetching indicator history summary (IDs: %s): %s", indicator_ids, e)
+            return (None, None, 0)
+
+    def append_history(self, rows):
+        # rows are (indicator_id, recorded_at, value); a point that already exists takes the new value.
+        if not rows:
+            return 0
+        try:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                # Missing months are created and committed first, so their brief lock on the
+                # partitioned table is not held while the points are written.
+                cursor.execute("SELECT ensure_indicator_history_partitions(%s, %s)", (min(row[1] for row in rows), max(row[1] for row in rows)))
+                conn.commit()
+                cursor.execute(STAGING_QUERY)
+                with cursor.copy("COPY indicator_history_staging (indicator_id, recorded_at, value) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                cursor.execute(MERGE_STAGING_QUERY)
+                conn.commit()
+                logging.info("Appended %d history points.", len(rows))
+                return len(rows)
+        except Exception as e:
+            logging.error("Error appending %d history points: %s", len(rows), e)
+            return 0
@@ -1,20 +1,46 @@
 from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+from src.infra.Search import TRIGRAM_INDEX_QUERY, trigram_index_name, search_queries, escape_like, distinct_prefix_query
+from src.infra.Columnar import read_table
+from src.models.Indicator import Indicator
+from psycopg.rows import args_row
+import pyarrow as pa
 
 import logging
 logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
 
+INDICATOR_COLUMNS = "id, name, value::float8 AS value, asset_id"
+INDICATOR_SCHEMA = pa.schema([("id", pa.int64()), ("name", pa.string()), ("value", pa.float64()), ("asset_id", pa.int64())])
+
+def build_value_filters(name, min_value=None, max_value=None):
+    # Equality on name followed by a range on value, so the (name, value) index serves every combination.
+    filters = ["name = %s"]
+    values = [name]
+
+    if min_value is not None:
+        filters.append("value >= %s")
+        values.append(min_value)
+    if max_value is not None:
+        filters.append("value <= %s")
+        values.append(max_value)
+
+    return " WHERE " + " AND ".join(filters), values
+
 class IndicatorRepository:
     def __init__(self):
         try:
-            self.connection = Connection().get_connection()
+            self.pool = Connection().get_pool()
+            self.read_pool = Connection().get_read_pool()
+            self.cache = Cache.shared()
+            self.substring_search = None
         except Exception as e:
             logging.critical("Error initializing IndicatorRepository: %s", e)
             raise
 
     def get_indicators(self):
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM indicators")
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                cursor.execute(f"SELECT {INDICATOR_COLUMNS} FROM indicators")
                 indicators = cursor.fetchall()
                 logging.info("Fetched %d indicators from database.", len(indicators))
                 return indicators
@@ -24,24 +50,26 @@ class IndicatorRepository:
 
     def insert_indicator(self, name, value, asset_id):
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
                 query = "INSERT INTO indicators (name, value, asset_id) VALUES (%s, %s, %s)"
                 cursor.execute(query, (name, value, asset_id))
-                self.connection.commit()
+                conn.commit()
+                self.cache.invalidate(("indicators_by_asset", asset_id))
+                self.cache.invalidate_namespace("indicator", negative_only=True)
                 logging.info("Indicator inserted successfully: %s, %s, %s", name, value, asset_id)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error inserting indicator (name: %s, value: %s, asset_id: %s): %s", name, value, asset_id, e)
 
     def delete_indicator(self, indicator_id):
         try:
-            with self.connection.cursor() as cursor:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
                 query = "DELETE FROM indicators WHERE id = %s"
                 cursor.execute(query, (indicator_id,))
-                self.connection.commit()
+                conn.commit()
+                self.cache.invalidate(("indicator", indicator_id))
+                self.cache.invalidate_namespace("indicators_by_asset")
                 logging.info("Indicator deleted successfully (ID: %s).", indicator_id)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error deleting indicator (ID: %s): %s", indicator_id, e)
 
     def update_indicator(self, indicator_id, name=None, value=None, asset_id=None):
@@ -60,22 +88,23 @@ class IndicatorRepository:
                 values.append(asset_id)
 
             if fields:
-                with self.connection.cursor() as cursor:
+                with self.pool.write_connection() as conn, conn.cursor() as cursor:
                     query = f"UPDATE indicators SET {', '.join(fields)} WHERE id = %s"
                     values.append(indicator_id)
                     cursor.execute(query, tuple(values))
-                    self.connection.commit()
+                    conn.commit()
+                    self.cache.invalidate(("indicator", indicator_id))
+                    self.cache.invalidate_namespace("indicators_by_asset")
                     logging.info("Indicator updated successfully (ID: %s).", indicator_id)
             else:
                 logging.warning("No fields provided for indicator update (ID: %s).", indicator_id)
         except Exception as e:
-            self.connection.rollback()
             logging.error("Error updating indicator (ID: %s): %s", indicator_id, e)
 
     def get_indicator_by_id(self, indicator_id):
         try:
-            with self.connection.cursor() as cursor:
-                query = "SELECT * FROM indicators WHERE id = %s"
+            with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE id = %s"
                 cursor.execute(query, (indicator_id,))
                 indicator = cursor.fetchone()
                 if indicator:
@@ -85,35 +114,164 @@ class IndicatorRepository:
                 return indicator
         except Exception as e:
             logging.error("Error fetching indicator by ID (%s): %s", indicator_id, e)
-            return None
+            # Raised rather than returned empty: the cache would keep an empty result as a negative entry.
+            raise
 
-    def get_indicators_by_name(self, name):
+    def get_indicators_by_name(self, name, limit=100):
+        return self.search_indicators(name, limit)
+
+    def search_indicators(self, text, limit=20, typeahead=False):
         try:
-            with self.connection.cursor() as cursor:
-                query = "SELECT * FROM indicators WHERE name LIKE %s"
-                cursor.execute(query, (f"%{name}%",))
-                indicators = cursor.fetchall()
-                logging.info("Fetched %d indicators by name: %s", len(indicators), name)
-                return indicators
+            indicators = []
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                if self.substring_search is None:
+                    self.substring_search = conn.execute(TRIGRAM_INDEX_QUERY, (trigram_index_name("indicators"),)).fetchone()[0]
+                for query, params in search_queries("indicators", INDICATOR_COLUMNS, text, typeahead, self.substring_search):
+                    # Unprepared, so each run is planned with the actual pattern and can use the prefix index.
+                    cursor.execute(query, (*params, [row.id for row in indicators], limit - len(indicators)), prepare=False)
+                    indicators += cursor.fetchall()
+                    if len(indicators) >= limit:
+                        break
+            logging.info("Found %d indicators matching: %s", len(indicators), text)
+            return indicators
+        except Exception as e:
+            logging.error("Error searching indicators (%s): %s", text, e)
+            return []
+
+    def get_indicator_names_by_prefix(self, text, limit=10):
+        try:
+            text = text.strip()
+            if not text:
+                return []
+            pattern = escape_like(text) + "%"
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(distinct_prefix_query("indicators"), (pattern, pattern, limit), prepare=False)
+                names = [row[0] for row in cursor.fetchall()]
+                logging.info("Found %d indicator names starting with: %s", len(names), text)
+                return names
         except Exception as e:
-            logging.error("Error fetching indicators by name (%s): %s", name, e)
+            logging.error("Error fetching indicator names by prefix (%s): %s", text, e)
             return []
 
     def get_indicators_by_asset(self, asset_id):
         try:
-            with self.connection.cursor() as cursor:
-                query = "SELECT * FROM indicators WHERE asset_id = %s"
+            with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE asset_id = %s"
                 cursor.execute(query, (asset_id,))
                 indicators = cursor.fetchall()
                 logging.info("Fetched %d indicators by asset ID: %s", len(indicators), asset_id)
                 return indicators
         except Exception as e:
             logging.error("Error fetching indicators by asset ID (%s): %s", asset_id, e)
+            raise
+
+    def get_indicators_by_assets(self, asset_ids):
+        try:
+            # Every requested asset gets a list, so assets without indicators come back empty rather than missing.
+            grouped = {asset_id: [] for asset_id in asset_ids}
+            with self.pool.read_connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE asset_id = ANY(%s) ORDER BY asset_id, id"
+                cursor.execute(query, (list(grouped),))
+                for indicator in cursor.fetchall():
+                    grouped[indicator.asset_id].append(indicator)
+                logging.info("Fetched indicators for %d assets.", len(grouped))
+                return grouped
+        except Exception as e:
+            logging.error("Error fetching indicators by asset IDs (%d IDs): %s", len(asset_ids), e)
+            raise
+
+    def get_indicators_by_value(self, name, min_value=None, max_value=None, limit=1000):
+        try:
+            where, values = build_value_filters(name, min_value, max_value)
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators{where} ORDER BY value, id LIMIT %s"
+                cursor.execute(query, (*values, limit))
+                indicators = cursor.fetchall()
+                logging.info("Fetched %d indicators by value (name: %s, range: %s - %s)", len(indicators), name, min_value, max_value)
+                return indicators
+        except Exception as e:
+            logging.error("Error fetching indicators by value (name: %s, range: %s - %s): %s", name, min_value, max_value, e)
+            return []
+
+    def get_value_distribution(self, name, bins, quantiles, min_value=None, max_value=None):
+        try:
+            where, values = build_value_filters(name, min_value, max_value)
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT count(*), min(value)::float8, max(value)::float8, avg(value)::float8,"
+                    " percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY value::float8)"
+                    f" FROM indicators{where}",
+                    (list(quantiles), *values),
+                )
+                stats = cursor.fetchone()
+                buckets = []
+                count, low, high = stats[0], stats[1], stats[2]
+                if count and high > low:
+                    # width_bucket puts the maximum in bucket bins + 1, so it is folded into the last bucket.
+                    cursor.execute(
+                        "SELECT least(width_bucket(value::float8, %s, %s, %s), %s) AS bucket, count(*)"
+                        f" FROM indicators{where} GROUP BY bucket ORDER BY bucket",
+                        (low, high, bins, bins, *values),
+                    )
+                    buckets = cursor.fetchall()
+                logging.info("Computed value distribution for indicator %s over %d rows.", name, count)
+                return stats, buckets
+        except Exception as e:
+            logging.error("Error computing value distribution (name: %s): %s", name, e)
+            return None, []
+
+    def get_indicators_page(self, limit, after_id=None):
+        try:
+            with self.read_pool.connection() as conn, conn.cursor(row_factory=args_row(Indicator)) as cursor:
+                query = f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE id > %s ORDER BY id LIMIT %s"
+                cursor.execute(query, (after_id or 0, limit))
+                indicators = cursor.fetchall()
+                logging.info("Fetched %d indicators after ID: %s", len(indicators), after_id)
+                return indicators
+        except Exception as e:
+            logging.error("Error fetching indicators page (after ID: %s): %s", after_id, e)
             return []
 
-    def __del__(self):
+    def iter_indicators(self, after_id=None, chunk_size=1000):
+        try:
+            with self.read_pool.connection() as conn, conn.cursor(name="iter_indicators", row_factory=args_row(Indicator)) as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(f"SELECT {INDICATOR_COLUMNS} FROM indicators WHERE id > %s ORDER BY id", (after_id or 0,))
+                for row in cursor:
+                    yield row
+        except Exception as e:
+            logging.error("Error streaming indicators (after ID: %s): %s", after_id, e)
+
+    def get_existing_asset_ids(self, asset_ids):
+        try:
+            with self.pool.read_connection() as conn, conn.cursor() as cursor:
+                cursor.execute("SELECT id FROM assets WHERE id = ANY(%s)", (list(asset_ids),))
+                return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            logging.error("Error checking asset IDs: %s", e)
+            return set()
+
+    def copy_indicators(self, rows):
+        try:
+            with self.pool.write_connection() as conn, conn.cursor() as cursor:
+                with cursor.copy("COPY indicators (name, value, asset_id) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                conn.commit()
+                self.cache.invalidate(*{("indicators_by_asset", row[2]) for row in rows})
+                self.cache.invalidate_namespace("indicator", negative_only=True)
+                logging.info("Copied %d indicators into database.", len(rows))
+                return len(rows)
+        except Exception as e:
+            logging.error("Error copying %d indicators: %s", len(rows), e)
+            return 0
+
+    def get_indicators_table(self):
         try:
-            self.connection.close()
-            logging.info("Database connection closed in IndicatorRepository.")
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                table = read_table(cursor, f"SELECT {INDICATOR_COLUMNS} FROM indicators ORDER BY id", None, INDICATOR_SCHEMA)
+                logging.info("Fetched %d indicators as a columnar table.", table.num_rows)
+                return table
         except Exception as e:
-            logging.error("Error closing database connection in IndicatorRepository: %s", e)
+            logging.error("Error fetching indicators table: %s", e)
+            return INDICATOR_SCHEMA.empty_table()
@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+import random
+import time
+import psycopg
+from src.infra.Connection import Connection
+from src.infra.Cache import Cache
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Writable columns of each entity; IDs are always generated by the database.
+ENTITY_COLUMNS = {
+    "assets": ("name", "type", "category_id"),
+    "categories": ("name", "description"),
+    "indicators": ("name", "value", "asset_id"),
+}
+# Deleting rows of an entity also deletes (or unlinks) rows of another one.
+CASCADES = {"assets": "indicators", "categories": "assets"}
+
+@dataclass(frozen=True, slots=True)
+class Ref:
+    # The ID produced (insert) or targeted (update, delete) by an earlier operation of the same unit of work.
+    index: int
+
+# Inserted rows per statement, well below the protocol's 65535 parameters.
+INSERT_ROWS_PER_STATEMENT = 1000
+
+# Each write's triggers lock the table's table_versions row, and writes to assets and indicators also
+# take the per-category statistics locks, all until commit. A unit of work takes the table_versions rows
+# it will need up front, in name order, so two units of work writing the same tables in a different
+# order queue instead of deadlocking. Writes to either statistics table lock both rows, since they
+# share the category locks.
+LOCK_TABLE_VERSIONS = "SELECT name FROM table_versions WHERE name = ANY(%s) ORDER BY name FOR UPDATE"
+STATS_TABLES = {"assets", "indicators"}
+# A deadlock with another writer (a single-row write or an import) can still roll the transaction
+# back; it is applied again from the start a few times before the error is raised.
+RETRIED_ERRORS = (psycopg.errors.DeadlockDetected, psycopg.errors.SerializationFailure)
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 0.05
+
+def build_operation(kind, entity, id, values, position):
+    # Returns (kind, entity, fields, params, id).
+    if entity not in ENTITY_COLUMNS:
+        raise ValueError(f"Unknown entity: {entity}")
+    unknown = set(values) - set(ENTITY_COLUMNS[entity])
+    if unknown:
+        raise ValueError(f"Unknown columns for {entity}: {', '.join(sorted(unknown))}")
+    for value in (id, *values.values()):
+        if isinstance(value, Ref) and not 0 <= value.index < position:
+            raise ValueError(f"Operation {position} refers to operation {value.index}, which does not come before it")
+
+    if kind == "insert":
+        if not values:
+            raise ValueError(f"No fields provided for {entity} insert")
+        return (kind, entity, tuple(values), list(values.values()), None)
+    if id is None:
+        raise ValueError(f"No ID provided for {entity} {kind}")
+    if kind == "update":
+        # Like the repositories' update methods, fields left as None keep their value.
+        fields = tuple(field for field, value in values.items() if value is not None)
+        return (kind, entity, fields, [values[field] for field in fields] + [id], id)
+    if kind == "delete":
+        return (kind, entity, (), [id], id)
+    raise ValueError(f"Unknown operation: {kind}")
+
+def group_runs(operations):
+    # Consecutive operations of the same kind, entity and fields run as one statement (inserts, deletes)
+    # or one executemany (updates), unless one of them refers to an operation of the same run, whose
+    # ID is not known until the run is executed. The triggers on the entity tables are statement-level,
+    # so a run of N rows fires them once instead of N times.
+    runs = []
+    for index, (kind, entity, fields, params, id) in enumerate(operations):
+        key = (kind, entity, fields)
+        run = runs[-1] if runs else None
+        if run and run[0] == key and not any(isinstance(value, Ref) and value.index >= run[1][0] for value in (*params, id)):
+            run[1].append(index)
+        else:
+            runs.append((key, [index]))
+    return runs
+
+def locked_tables(operations):
+    # Tables written by the operations, including the ones their deletes cascade to.
+    tables = set()
+    for kind, entity, _, _, _ in operations:
+        tables.add(entity)
+        while kind == "delete" and entity in CASCADES:
+            entity = CASCADES[entity]
+            tables.add(entity)
+    if tables & STATS_TABLES:
+        tables |= STATS_TABLES
+    return sorted(tables)
+
+def changed_entities(operations, ids):
+    # {entity: IDs or None} to invalidate once the unit of work is committed.
+    changed = {}
+    cascaded = set()
+    for (kind, entity, fields, _, _), id in zip(operations, ids):
+        if kind == "update" and not fields:
+            continue
+        changed.setdefault(entity, set()).add(id)
+        if kind == "delete" and entity in CASCADES:
+            cascaded.add(CASCADES[entity])
+    # Rows reached by a cascade are not known, so their whole entity is invalidated.
+    changed.update(dict.fromkeys(cascaded))
+    return changed
+
+class UnitOfWork:
+    # Queues inserts, updates and deletes, then applies them in a single transaction: all of them or none.
+    #
+    #     unit = UnitOfWork()
+    #     asset = unit.insert("assets", {"name": "PETR4", "type": "Ação", "category_id": 1})
+    #     for name, value in indicators:
+    #         unit.insert("indicators", {"name": name, "value": value, "asset_id": asset})
+    #     ids = unit.commit()
+    def __init__(self):
+        try:
+            self.pool = Connection().get_pool()
+            self.cache = Cache.shared()
+            self.operations = []
+        except Exception as e:
+            logging.critical("Error initializing UnitOfWork: %s", e)
+            raise
+
+    def queue(self, kind, entity, id=None, values=None):
+        self.operations.append(build_operation(kind, entity, id, values or {}, len(self.operations)))
+        return Ref(len(self.operations) - 1)
+
+    def insert(self, entity, values):
+        return self.queue("insert", entity, values=values)
+
+    def update(self, entity, id, values):
+        return self.queue("update", entity, id, values)
+
+    def delete(self, entity, id):
+        return self.queue("delete", entity, id)
+
+    def commit(self):
+        # Returns the ID of every operation, in order. Runs go out through one pipeline, so the only
+        # waits are for inserted IDs a later operation refers to, and for the commit itself.
+        # Raises, after rolling back everything, if any operation fails.
+        operations, self.operations = self.operations, []
+        if not operations:
+            return []
+        tables = locked_tables(operations)
+
+        def fetch(index):
+            # IDs come from the table's sequence in the order of the VALUES list, so sorting the
+            # returned IDs lines them up with the operations.
+            cursor, indices = unfetched[index]
+            for run_index, id in zip(indices, sorted(row[0] for row in cursor.fetchall())):
+                ids[run_index] = id
+                del unfetched[run_index]
+
+        def resolve(value):
+            if isinstance(value, Ref):
+                if value.index in unfetched:
+                    fetch(value.index)
+                return ids[value.index]
+            return value
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            ids, unfetched = [None] * len(operations), {}
+            try:
+                with self.pool.write_connection() as conn:
+                    with conn.pipeline():
+                        conn.execute(LOCK_TABLE_VERSIONS, [tables])
+                        for (kind, entity, fields), indices in group_runs(operations):
+                            for index in indices:
+                                ids[index] = resolve(operations[index][4])
+                            if kind == "insert":
+                                row = f"({', '.join(['%s'] * len(fields))})"
+                                for start in range(0, len(indices), INSERT_ROWS_PER_STATEMENT):
+                                    chunk = indices[start:start + INSERT_ROWS_PER_STATEMENT]
+                                    cursor = conn.cursor()
+                                    cursor.execute(
+                                        f"INSERT INTO {entity} ({', '.join(fields)}) VALUES {', '.join([row] * len(chunk))} RETURNING id",
+                                        [resolve(value) for index in chunk for value in operations[index][3]],
+                                    )
+                                    for index in chunk:
+                                        unfetched[index] = (cursor, chunk)
+                            elif kind == "update" and fields:
+                                conn.cursor().executemany(
+                                    f"UPDATE {entity} SET {', '.join(f'{field} = %s' for field in fields)} WHERE id = %s",
+                                    [[resolve(value) for value in operations[index][3]] for index in indices],
+                                )
+                            elif kind == "delete":
+                                conn.cursor().execute(f"DELETE FROM {entity} WHERE id = ANY(%s)", [[ids[index] for index in indices]])
+                        while unfetched:
+                            fetch(next(iter(unfetched)))
+                break
+            except RETRIED_ERRORS as e:
+                if attempt == MAX_ATTEMPTS:
+                    logging.error("Error committing %d operations, all rolled back after %d attempts: %s", len(operations), attempt, e)
+                    raise
+                logging.warning("Retrying %d operations after a rolled back attempt: %s", len(operations), e)
+                time.sleep(random.uniform(0, RETRY_DELAY * 2 ** attempt))
+            except Exception as e:
+                logging.error("Error committing %d operations, all rolled back: %s", len(operations), e)
+                raise
+        for entity, entity_ids in changed_entities(operations, ids).items():
+            self.cache.invalidate_entity(entity, entity_ids)
+        logging.info("Committed %d operations in one transaction.", len(operations))
+        return ids
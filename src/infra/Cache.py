@@ -0,0 +1,226 @@
+from collections import OrderedDict
+from dotenv import load_dotenv
+import threading
+import time
+import os
+
+_MISSING = object()
+
+class Cache:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    # Namespaces of cached lookups and the entity whose TTL they follow.
+    NAMESPACES = {
+        "asset": "asset",
+        "assets_by_category": "asset",
+        "category": "category",
+        "categories": "category",
+        "indicator": "indicator",
+        "indicators_by_asset": "indicator",
+    }
+
+    def __init__(self, max_entries=10000, ttls=None, negative_ttl=5.0):
+        self.max_entries = max_entries
+        self.ttls = ttls or {"asset": 60.0, "category": 600.0, "indicator": 30.0}
+        self.negative_ttl = negative_ttl
+        self.entries = OrderedDict()
+        self.keys_by_namespace = {}
+        self.generations = {}
+        self.table_versions = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    load_dotenv()
+                    cls._shared = cls(
+                        max_entries=int(os.getenv("CACHE_MAX_ENTRIES", 10000)),
+                        ttls={
+                            "asset": float(os.getenv("CACHE_TTL_ASSET", 60)),
+                            "category": float(os.getenv("CACHE_TTL_CATEGORY", 600)),
+                            "indicator": float(os.getenv("CACHE_TTL_INDICATOR", 30)),
+                        },
+                        negative_ttl=float(os.getenv("CACHE_NEGATIVE_TTL", 5)),
+                    )
+        return cls._shared
+
+    def _is_negative(self, value):
+        return value is None or value == []
+
+    def _ttl_for(self, key, value):
+        if self._is_negative(value):
+            return self.negative_ttl
+        return self.ttls[self.NAMESPACES[key[0]]]
+
+    def _remove(self, key):
+        self.entries.pop(key, None)
+        keys = self.keys_by_namespace.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self.entries.move_to_end(key)
+            self.hits += 1
+            if self._is_negative(value):
+                self.negative_hits += 1
+            return value
+
+    def set(self, key, value, generation=None):
+        ttl = self._ttl_for(key, value)
+        if ttl <= 0:
+            return
+        with self.lock:
+            # A write that invalidated the namespace while the value was loading makes it stale.
+            if generation is not None and generation != self.generations.get(key[0], 0):
+                return
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            self.keys_by_namespace.setdefault(key[0], set()).add(key)
+            while len(self.entries) > self.max_entries:
+                oldest, _ = self.entries.popitem(last=False)
+                self.keys_by_namespace[oldest[0]].discard(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        # Loaders raise on errors instead of returning None/[]/{}, so a failed load leaves nothing
+        # cached and the next lookup retries; only real "not found" results become negative entries.
+        value = self.get(key)
+        if value is _MISSING:
+            generation = self.generations.get(key[0], 0)
+            value = loader()
+            self.set(key, value, generation)
+        return value
+
+    async def get_or_load_async(self, key, loader):
+        value = self.get(key)
+        if value is _MISSING:
+            generation = self.generations.get(key[0], 0)
+            value = await loader()
+            self.set(key, value, generation)
+        return value
+
+    def _split_cached(self, namespace, ids):
+        found = {}
+        missing = []
+        for id in ids:
+            value = self.get((namespace, id))
+            if value is _MISSING:
+                missing.append(id)
+            else:
+                found[id] = value
+        return found, missing
+
+    def _store_loaded(self, namespace, found, missing, loaded, generation):
+        # IDs the loader left out are cached as negative entries, like a single lookup returning None.
+        for id in missing:
+            value = loaded.get(id)
+            self.set((namespace, id), value, generation)
+            found[id] = value
+
+    def get_many_or_load(self, namespace, ids, loader):
+        # Batch counterpart of get_or_load: loader(missing_ids) returns {id: value} in one query.
+        found, missing = self._split_cached(namespace, ids)
+        if missing:
+            generation = self.generations.get(namespace, 0)
+            self._store_loaded(namespace, found, missing, loader(missing), generation)
+        return {id: found[id] for id in ids}
+
+    async def get_many_or_load_async(self, namespace, ids, loader):
+        found, missing = self._split_cached(namespace, ids)
+        if missing:
+            generation = self.generations.get(namespace, 0)
+            self._store_loaded(namespace, found, missing, await loader(missing), generation)
+        return {id: found[id] for id in ids}
+
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.generations[key[0]] = self.generations.get(key[0], 0) + 1
+                if key in self.entries:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def invalidate_namespace(self, namespace, negative_only=False):
+        with self.lock:
+            self.generations[namespace] = self.generations.get(namespace, 0) + 1
+            for key in list(self.keys_by_namespace.get(namespace, ())):
+                if negative_only and not self._is_negative(self.entries[key][0]):
+                    continue
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_entity(self, entity, ids=None):
+        # Everything cached from rows of an entity table; ids=None when the changed rows are unknown.
+        if entity == "assets":
+            if ids is None:
+                self.invalidate_namespace("asset")
+                self.invalidate_namespace("indicators_by_asset")
+            else:
+                self.invalidate(*(("asset", id) for id in ids), *(("indicators_by_asset", id) for id in ids))
+            self.invalidate_namespace("assets_by_category")
+        elif entity == "categories":
+            if ids is None:
+                self.invalidate_namespace("category")
+            else:
+                self.invalidate(*(("category", id) for id in ids))
+            self.invalidate(("categories",))
+        elif entity == "indicators":
+            if ids is None:
+                self.invalidate_namespace("indicator")
+            else:
+                self.invalidate(*(("indicator", id) for id in ids))
+            self.invalidate_namespace("indicators_by_asset")
+
+    def observe_versions(self, versions):
+        # (table, version, modified_at) rows read for HTTP validators. A version newer than the last one
+        # seen means some process wrote the table, so its entries are dropped before the route reads them;
+        # a cached body is then never older than the ETag sent with it.
+        for name, version, _ in versions:
+            if name not in ("assets", "categories", "indicators"):
+                continue
+            with self.lock:
+                if version <= self.table_versions.get(name, -1):
+                    continue
+                self.table_versions[name] = version
+            self.invalidate_entity(name)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_namespace.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,146 @@
+from collections import deque
+from dotenv import load_dotenv
+from src.infra.Cache import Cache
+from src.infra.Connection import Connection
+import threading
+import asyncio
+import uuid
+import psycopg
+import json
+import os
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Channel the triggers of migration 8 notify on, with {"entity", "op", "ids", "count"} payloads.
+CHANGES_CHANNEL = "entity_changes"
+ENTITIES = ("assets", "categories", "indicators")
+# Sent instead of changes when some may have been missed (listener reconnected, slow subscriber,
+# Last-Event-ID too old); the subscriber should reload everything it holds.
+RESYNC = {"entity": None, "op": "resync", "ids": None, "count": None}
+
+class ChangeFeed:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, enabled=True, queue_size=1000, history_size=1000, reconnect_delay=1.0, keepalive=15.0):
+        self.enabled = enabled
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.keepalive = keepalive
+        # Recent events as (event_id, change), replayed to clients reconnecting with Last-Event-ID.
+        self.history = deque(maxlen=history_size)
+        self.last_id = 0
+        # Event IDs are "<stream>-<n>"; the stream part changes on every start and differs between
+        # workers, so a Last-Event-ID from another process is recognized and answered with a resync.
+        self.stream_id = uuid.uuid4().hex[:12]
+        self.subscribers = set()
+        self.task = None
+        self.cache = Cache.shared()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    load_dotenv()
+                    cls._shared = cls(
+                        enabled=os.getenv("CHANGE_FEED_ENABLED", "true").lower() in ("1", "true", "yes"),
+                        queue_size=int(os.getenv("CHANGE_FEED_QUEUE_SIZE", 1000)),
+                    )
+        return cls._shared
+
+    async def start(self):
+        if self.enabled and self.task is None:
+            self.task = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def listen(self):
+        # LISTEN needs a connection of its own for as long as the app runs, so it is not taken from the pool.
+        connected_before = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(Connection().get_conninfo(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANGES_CHANNEL}")
+                    if connected_before:
+                        # Anything committed while the listener was down was not delivered.
+                        self.publish(RESYNC)
+                    connected_before = True
+                    async for notify in conn.notifies():
+                        try:
+                            self.publish(json.loads(notify.payload))
+                        except ValueError as e:
+                            logging.error("Error decoding change notification %r: %s", notify.payload, e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error("Error listening for changes: %s", e)
+            await asyncio.sleep(self.reconnect_delay)
+
+    def invalidate_cache(self, change):
+        # Writes through this process already invalidated the cache; this covers other workers and scripts.
+        if change["op"] == "resync":
+            for namespace in Cache.NAMESPACES:
+                self.cache.invalidate_namespace(namespace)
+        else:
+            self.cache.invalidate_entity(change["entity"], change["ids"])
+
+    def publish(self, change):
+        self.invalidate_cache(change)
+        self.last_id += 1
+        event = (self.last_id, change)
+        self.history.append(event)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A subscriber that fell behind gets a resync instead of an unbounded backlog.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait((self.last_id, RESYNC))
+
+    def format_event_id(self, number):
+        return f"{self.stream_id}-{number}"
+
+    def subscribe(self, last_event_id=None):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if last_event_id is not None:
+            stream_id, _, number = last_event_id.partition("-")
+            number = int(number) if number.isdigit() else -1
+            oldest = self.history[0][0] if self.history else self.last_id + 1
+            missed = [event for event in self.history if event[0] > number]
+            if stream_id != self.stream_id or not oldest - 1 <= number <= self.last_id or len(missed) > self.queue_size:
+                # Unknown ID (other worker, restarted server) or more missed events than history or the queue hold.
+                queue.put_nowait((self.last_id, RESYNC))
+            else:
+                for event in missed:
+                    queue.put_nowait(event)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def events(self, entities=None, last_event_id=None):
+        # Yields (event_id, change) for the requested entities, or None every keepalive seconds without events.
+        queue = self.subscribe(last_event_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                entity = event[1]["entity"]
+                if entity is None or not entities or entity in entities:
+                    yield event
+        finally:
+            self.unsubscribe(queue)
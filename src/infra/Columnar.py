@@ -0,0 +1,107 @@
+import asyncio
+import io
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Result sets are pulled with COPY ... TO STDOUT as CSV and parsed by Arrow's C++ reader,
+# so building a table never creates a Python object per row.
+
+def copy_statement(query):
+    return f"COPY ({query}) TO STDOUT (FORMAT csv, HEADER)"
+
+def parse_csv(data, schema):
+    if not data:
+        return schema.empty_table()
+    options = pa_csv.ConvertOptions(column_types=schema, strings_can_be_null=True, quoted_strings_can_be_null=False)
+    return pa_csv.read_csv(io.BytesIO(data), convert_options=options).select(schema.names)
+
+def read_table(cursor, query, params, schema):
+    buffer = bytearray()
+    with cursor.copy(copy_statement(query), params) as copy:
+        for block in copy:
+            buffer += block
+    return parse_csv(bytes(buffer), schema)
+
+async def read_table_async(cursor, query, params, schema):
+    buffer = bytearray()
+    async with cursor.copy(copy_statement(query), params) as copy:
+        async for block in copy:
+            buffer += block
+    return await asyncio.to_thread(parse_csv, bytes(buffer), schema)
+
+def aggregate_statement(query, columns, order):
+    # The whole result as one CSV text value: a single protocol message instead of one per row,
+    # which COPY pays for on every row (and awaits on every row when async). Only for results that
+    # are bounded in size and whose columns never need CSV quoting (numbers, timestamps).
+    fields = ", ".join(f"coalesce(({column})::text, '')" for column in columns)
+    return f"SELECT string_agg(concat_ws(',', {fields}), E'\\n' ORDER BY {order}) FROM ({query}) AS result"
+
+def parse_aggregate(text, schema):
+    if text is None:
+        return schema.empty_table()
+    return parse_csv((",".join(schema.names) + "\n" + text).encode(), schema)
+
+def read_aggregated_table(cursor, query, params, schema, order):
+    cursor.execute(aggregate_statement(query, schema.names, order), params)
+    return parse_aggregate(cursor.fetchone()[0], schema)
+
+async def read_aggregated_table_async(cursor, query, params, schema, order):
+    await cursor.execute(aggregate_statement(query, schema.names, order), params)
+    return await asyncio.to_thread(parse_aggregate, (await cursor.fetchone())[0], schema)
+
+def to_arrow_ipc(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def to_parquet(table):
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
+
+class ParquetStream:
+    # Encodes headerless CSV blocks as the row groups of one Parquet file and hands back the bytes
+    # written so far after each block, so only the current row group is ever held in memory.
+    def __init__(self, schema):
+        self.schema = schema
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+        self.writer = pq.ParquetWriter(self, schema)
+
+    # File interface used by the Parquet writer.
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+    def write_rows(self, data):
+        read_options = pa_csv.ReadOptions(column_names=self.schema.names)
+        convert_options = pa_csv.ConvertOptions(column_types=self.schema, strings_can_be_null=True, quoted_strings_can_be_null=False)
+        self.writer.write_table(pa_csv.read_csv(io.BytesIO(data), read_options=read_options, convert_options=convert_options))
+        return self.take()
+
+    def finish(self):
+        # Writes the footer; returns the last bytes of the file.
+        self.writer.close()
+        return self.take()
@@ -1,21 +1,181 @@
 import psycopg
+from psycopg.conninfo import make_conninfo, conninfo_to_dict
+from psycopg_pool import ConnectionPool, AsyncConnectionPool
 from dotenv import load_dotenv
+from src.infra.Metrics import Metrics
+from src.infra.TimedCursor import TimedCursor, AsyncTimedCursor
+from src.infra.ReplicaRouter import WritePool, AsyncWritePool, ReplicaRouter, AsyncReplicaRouter
+import threading
 import os
 
 class Connection:
+    _pool = None
+    _async_pool = None
+    _replica_pools = None
+    _async_replica_pools = None
+    _read_pool = None
+    _async_read_pool = None
+    _lock = threading.Lock()
+
     def __init__(self):
         load_dotenv()
         self.conn = None
 
+    def get_conninfo(self):
+        # The primary: DB_PRIMARY_DSN if set, otherwise the DB_* settings.
+        if os.getenv("DB_PRIMARY_DSN"):
+            return make_conninfo(os.getenv("DB_PRIMARY_DSN"))
+        return make_conninfo(
+            dbname=os.getenv("DB_NAME"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            host=os.getenv("DB_HOST"),
+            port=os.getenv("DB_PORT")
+        )
+
+    def get_replica_conninfos(self):
+        # DB_REPLICA_DSNS is a comma-separated list; parameters a replica leaves out (database, user,
+        # password) are taken from the primary.
+        primary = self.get_conninfo()
+        dsns = [dsn.strip() for dsn in os.getenv("DB_REPLICA_DSNS", "").split(",") if dsn.strip()]
+        return [make_conninfo(primary, **conninfo_to_dict(dsn)) for dsn in dsns]
+
+    def get_routing_settings(self):
+        return {
+            "policy": os.getenv("DB_REPLICA_POLICY", "round_robin"),
+            "sticky_seconds": float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 5)),
+            "timeout": float(os.getenv("DB_REPLICA_TIMEOUT", 1)),
+            "retry_seconds": float(os.getenv("DB_REPLICA_RETRY_SECONDS", 10)),
+        }
+
+    def get_pool_settings(self):
+        return {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 600)),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", 3600)),
+        }
+
+    def get_connection_kwargs(self, cursor_factory):
+        # Pooled connections hand out timed cursors unless METRICS_ENABLED is off.
+        return {"cursor_factory": cursor_factory} if Metrics.shared().enabled else {}
+
+    def get_pool(self):
+        if Connection._pool is None:
+            with Connection._lock:
+                if Connection._pool is None:
+                    Connection._pool = WritePool(
+                        self.get_conninfo(),
+                        check=ConnectionPool.check_connection,
+                        name="decision_system",
+                        open=True,
+                        kwargs=self.get_connection_kwargs(TimedCursor),
+                        **self.get_pool_settings()
+                    )
+        return Connection._pool
+
+    def get_async_pool(self):
+        # The async pool is opened by the event loop that uses it (see open_async_pool).
+        if Connection._async_pool is None:
+            with Connection._lock:
+                if Connection._async_pool is None:
+                    Connection._async_pool = AsyncWritePool(
+                        self.get_conninfo(),
+                        check=AsyncConnectionPool.check_connection,
+                        name="decision_system_async",
+                        open=False,
+                        kwargs=self.get_connection_kwargs(AsyncTimedCursor),
+                        **self.get_pool_settings()
+                    )
+        return Connection._async_pool
+
+    def get_read_pool(self):
+        # Connections for reads that may be served by a replica (see ReplicaRouter). Writes, and reads
+        # that must see the latest data, keep using get_pool().
+        if Connection._read_pool is None:
+            primary = self.get_pool()
+            with Connection._lock:
+                if Connection._read_pool is None:
+                    Connection._replica_pools = [
+                        ConnectionPool(
+                            conninfo,
+                            check=ConnectionPool.check_connection,
+                            name=f"decision_system_replica_{number}",
+                            open=True,
+                            kwargs=self.get_connection_kwargs(TimedCursor),
+                            **self.get_pool_settings()
+                        )
+                        for number, conninfo in enumerate(self.get_replica_conninfos(), 1)
+                    ]
+                    Connection._read_pool = ReplicaRouter(primary, Connection._replica_pools, **self.get_routing_settings())
+        return Connection._read_pool
+
+    def get_async_read_pool(self):
+        if Connection._async_read_pool is None:
+            primary = self.get_async_pool()
+            with Connection._lock:
+                if Connection._async_read_pool is None:
+                    Connection._async_replica_pools = [
+                        AsyncConnectionPool(
+                            conninfo,
+                            check=AsyncConnectionPool.check_connection,
+                            name=f"decision_system_async_replica_{number}",
+                            open=False,
+                            kwargs=self.get_connection_kwargs(AsyncTimedCursor),
+                            **self.get_pool_settings()
+                        )
+                        for number, conninfo in enumerate(self.get_replica_conninfos(), 1)
+                    ]
+                    Connection._async_read_pool = AsyncReplicaRouter(primary, Connection._async_replica_pools, **self.get_routing_settings())
+        return Connection._async_read_pool
+
+    @classmethod
+    async def open_async_pool(cls):
+        await cls().get_async_pool().open()
+        for pool in cls().get_async_read_pool().replicas:
+            await pool.open()
+
+    @classmethod
+    async def close_async_pool(cls):
+        pool = cls._async_pool
+        replicas = cls._async_replica_pools or []
+        cls._async_pool = None
+        cls._async_replica_pools = None
+        cls._async_read_pool = None
+        for replica in replicas:
+            await replica.close()
+        if pool is not None:
+            await pool.close()
+            return True
+        return False
+
+    @classmethod
+    def get_pool_stats(cls):
+        # Counters since the pool opened (wait time, requests, errors) and its current size.
+        pools = {"sync": cls._pool, "async": cls._async_pool}
+        for number, pool in enumerate(cls._replica_pools or [], 1):
+            pools[f"sync_replica_{number}"] = pool
+        for number, pool in enumerate(cls._async_replica_pools or [], 1):
+            pools[f"async_replica_{number}"] = pool
+        return {name: pool.get_stats() for name, pool in pools.items() if pool is not None}
+
+    @classmethod
+    def close_pool(cls):
+        with cls._lock:
+            for replica in cls._replica_pools or []:
+                replica.close()
+            cls._replica_pools = None
+            cls._read_pool = None
+            if cls._pool is not None:
+                cls._pool.close()
+                cls._pool = None
+                return True
+        return False
+
     def get_connection(self):
         try:
-            self.conn = psycopg.connect(
-                dbname=os.getenv("DB_NAME"),
-                user=os.getenv("DB_USER"),
-                password=os.getenv("DB_PASSWORD"),
-                host=os.getenv("DB_HOST"),
-                port=os.getenv("DB_PORT")
-            )
+            self.conn = psycopg.connect(self.get_conninfo())
             return self.conn
         except Exception as e:
             print("Postgres Database Connection Error: ", e)
@@ -0,0 +1,130 @@
+from bisect import bisect_left
+from dotenv import load_dotenv
+import threading
+import os
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Upper bounds in seconds; one more bucket (+Inf) catches everything slower.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Repository modules set the root logger to ERROR, so the slow query log has its own level.
+slow_query_log = logging.getLogger("decision_system.slow_query")
+slow_query_log.setLevel(logging.WARNING)
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def format_labels(names, values, extra=""):
+    labels = ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+    if extra:
+        labels = f"{labels},{extra}" if labels else extra
+    return "{" + labels + "}" if labels else ""
+
+class Metrics:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, enabled=True, slow_query_ms=500.0, buckets=LATENCY_BUCKETS):
+        self.enabled = enabled
+        # A threshold of 0 or less turns the slow query log off.
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+        self.buckets = buckets
+        # Series keyed by label values: [bucket counts (last one is +Inf), sum of seconds, rows, errors, slow].
+        self.requests = {}
+        self.queries = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    load_dotenv()
+                    cls._shared = cls(
+                        enabled=os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes"),
+                        slow_query_ms=float(os.getenv("SLOW_QUERY_MS", 500)),
+                    )
+        return cls._shared
+
+    def _observe(self, series, key, seconds, rows=0, error=False, slow=False):
+        index = bisect_left(self.buckets, seconds)
+        with self.lock:
+            entry = series.get(key)
+            if entry is None:
+                entry = series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, 0, 0]
+            entry[0][index] += 1
+            entry[1] += seconds
+            entry[2] += rows
+            entry[3] += error
+            entry[4] += slow
+
+    def observe_request(self, method, route, status, seconds):
+        self._observe(self.requests, (method, route, status), seconds)
+
+    def observe_query(self, label, seconds, rows, error, query, params):
+        slow = self.slow_query_seconds is not None and seconds >= self.slow_query_seconds
+        self._observe(self.queries, (label,), seconds, max(rows, 0), error, slow)
+        if slow:
+            # Parameters can be long ID lists, so only the start of them is logged.
+            slow_query_log.warning("Slow query (%.1f ms, %s): %s params=%.1000r", seconds * 1000, label, " ".join(str(query).split()), params)
+
+    def _histogram(self, lines, name, help, label_names, series):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, (counts, total, *_) in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{format_labels(label_names, key, le)} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(label_names, key)} {total}")
+            lines.append(f"{name}_count{format_labels(label_names, key)} {cumulative}")
+
+    def _samples(self, lines, name, type, help, samples):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {type}")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {value}")
+
+    def render(self, pool_stats=None, cache_stats=None):
+        # Copies are taken under the lock; formatting happens outside it so requests are not held up.
+        with self.lock:
+            requests = [(key, [list(entry[0]), *entry[1:]]) for key, entry in sorted(self.requests.items())]
+            queries = [(key, [list(entry[0]), *entry[1:]]) for key, entry in sorted(self.queries.items())]
+        lines = []
+        self._histogram(lines, "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"), requests)
+        self._histogram(lines, "db_query_duration_seconds", "Query latency by repository method.", ("query",), queries)
+        for name, index, help in (
+            ("db_query_rows_total", 2, "Rows returned or affected by repository method."),
+            ("db_query_errors_total", 3, "Failed queries by repository method."),
+            ("db_slow_queries_total", 4, "Queries slower than SLOW_QUERY_MS by repository method."),
+        ):
+            self._samples(lines, name, "counter", help, [(format_labels(("query",), key), entry[index]) for key, entry in queries])
+
+        # psycopg_pool omits counters that are still zero and reports wait time in milliseconds.
+        pools = [(pool, {**stats, "requests_wait_s": stats.get("requests_wait_ms", 0) / 1000}) for pool, stats in sorted((pool_stats or {}).items())]
+        for name, stat, type, help in (
+            ("db_pool_requests_total", "requests_num", "counter", "Connections requested from the pool."),
+            ("db_pool_wait_seconds_total", "requests_wait_s", "counter", "Time spent waiting for a pool connection."),
+            ("db_pool_requests_errors_total", "requests_errors", "counter", "Pool requests that timed out or failed."),
+            ("db_pool_requests_waiting", "requests_waiting", "gauge", "Requests waiting for a connection right now."),
+            ("db_pool_size", "pool_size", "gauge", "Open connections, in use or idle."),
+            ("db_pool_available", "pool_available", "gauge", "Idle connections ready to be used."),
+        ):
+            self._samples(lines, name, type, help, [(format_labels(("pool",), (pool,)), stats.get(stat, 0)) for pool, stats in pools])
+
+        if cache_stats:
+            for name, stat, type, help in (
+                ("cache_hits_total", "hits", "counter", "Cache lookups answered from memory."),
+                ("cache_misses_total", "misses", "counter", "Cache lookups that went to the database."),
+                ("cache_negative_hits_total", "negative_hits", "counter", "Hits on cached empty results."),
+                ("cache_evictions_total", "evictions", "counter", "Entries dropped by the LRU limit."),
+                ("cache_expirations_total", "expirations", "counter", "Entries dropped by their TTL."),
+                ("cache_invalidations_total", "invalidations", "counter", "Entries dropped by writes."),
+                ("cache_entries", "entries", "gauge", "Entries currently cached."),
+                ("cache_hit_ratio", "hit_rate", "gauge", "Hits over lookups since start."),
+            ):
+                self._samples(lines, name, type, help, [("", cache_stats[stat])])
+        return "\n".join(lines) + "\n"
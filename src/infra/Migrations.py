@@ -0,0 +1,523 @@
+from src.infra.Connection import Connection
+from dotenv import load_dotenv
+import argparse
+import json
+import sys
+import os
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Arbitrary key for pg_advisory_xact_lock, so two processes starting together do not migrate twice.
+MIGRATION_LOCK_KEY = 4815162342
+
+# Each migration runs in its own transaction and is recorded in schema_migrations.
+# A migration whose required extensions are not installable is skipped, not recorded,
+# and applied by a later run once the extension becomes available.
+MIGRATIONS = [
+    {
+        "version": 1,
+        "description": "Create categories, assets and indicators",
+        "requires": (),
+        "statements": [
+            """CREATE TABLE IF NOT EXISTS categories (
+                id SERIAL,
+                name VARCHAR(255) NOT NULL,
+                description TEXT,
+                CONSTRAINT categories_pkey PRIMARY KEY (id)
+            )""",
+            """CREATE TABLE IF NOT EXISTS assets (
+                id SERIAL,
+                name VARCHAR(100) NOT NULL,
+                type VARCHAR(50) NOT NULL,
+                category_id INTEGER,
+                CONSTRAINT assets_pkey PRIMARY KEY (id),
+                CONSTRAINT assets_category_fkey FOREIGN KEY (category_id)
+                    REFERENCES categories (id) ON DELETE SET NULL
+            )""",
+            """CREATE TABLE IF NOT EXISTS indicators (
+                id SERIAL,
+                name VARCHAR(100) NOT NULL,
+                value NUMERIC(10, 2) NOT NULL,
+                asset_id INTEGER NOT NULL,
+                CONSTRAINT indicators_pkey PRIMARY KEY (id),
+                CONSTRAINT indicators_asset_id_fkey FOREIGN KEY (asset_id)
+                    REFERENCES assets (id) ON DELETE CASCADE
+            )""",
+        ],
+    },
+    {
+        "version": 2,
+        "description": "Index foreign keys and filtered columns",
+        "requires": (),
+        "statements": [
+            "CREATE INDEX IF NOT EXISTS assets_category_id_idx ON assets (category_id)",
+            "CREATE INDEX IF NOT EXISTS assets_type_idx ON assets (type)",
+            "CREATE INDEX IF NOT EXISTS categories_name_idx ON categories (name)",
+            # Leading asset_id also serves the foreign key and the per-asset lookups on its own.
+            "CREATE INDEX IF NOT EXISTS indicators_asset_id_name_idx ON indicators (asset_id, name)",
+        ],
+    },
+    {
+        "version": 3,
+        "description": "Trigram indexes for substring search on names",
+        "requires": ("pg_trgm",),
+        "statements": [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            "CREATE INDEX IF NOT EXISTS assets_name_trgm_idx ON assets USING gin (name gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS indicators_name_trgm_idx ON indicators USING gin (name gin_trgm_ops)",
+        ],
+    },
+    {
+        "version": 4,
+        "description": "Accent and case-insensitive name search keys",
+        "requires": (),
+        "statements": [
+            """CREATE OR REPLACE FUNCTION search_key(value TEXT) RETURNS TEXT
+                LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+                AS $$ SELECT lower(translate($1,
+                    'ÁÀÂÃÄÅÇÉÈÊËÍÌÎÏÑÓÒÔÕÖÚÙÛÜÝŸáàâãäåçéèêëíìîïñóòôõöúùûüýÿ',
+                    'AAAAAACEEEEIIIINOOOOOUUUUYYaaaaaaceeeeiiiinooooouuuuyy')) $$""",
+            # "C" collation lets the btree serve both LIKE 'prefix%' and ORDER BY on the key.
+            'CREATE INDEX IF NOT EXISTS assets_name_search_idx ON assets ((search_key(name) COLLATE "C"), id)',
+            'CREATE INDEX IF NOT EXISTS indicators_name_search_idx ON indicators ((search_key(name) COLLATE "C"), id)',
+            "CREATE INDEX IF NOT EXISTS assets_name_fts_idx ON assets USING gin (to_tsvector('simple', search_key(name)))",
+            "CREATE INDEX IF NOT EXISTS indicators_name_fts_idx ON indicators USING gin (to_tsvector('simple', search_key(name)))",
+        ],
+    },
+    {
+        "version": 5,
+        "description": "Trigram indexes on name search keys",
+        "requires": ("pg_trgm",),
+        "statements": [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            # Substring search now matches on search_key(name), so the raw-name trigram indexes are unused.
+            "DROP INDEX IF EXISTS assets_name_trgm_idx",
+            "DROP INDEX IF EXISTS indicators_name_trgm_idx",
+            "CREATE INDEX IF NOT EXISTS assets_name_search_trgm_idx ON assets USING gin (search_key(name) gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS indicators_name_search_trgm_idx ON indicators USING gin (search_key(name) gin_trgm_ops)",
+        ],
+    },
+    {
+        "version": 6,
+        "description": "Index indicator values by name for range screening",
+        "requires": (),
+        "statements": [
+            "CREATE INDEX IF NOT EXISTS indicators_name_value_idx ON indicators (name, value)",
+        ],
+    },
+    {
+        "version": 7,
+        "description": "Per-table write counters for HTTP validators",
+        "requires": (),
+        "statements": [
+            """CREATE TABLE IF NOT EXISTS table_versions (
+                name TEXT PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                modified_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )""",
+            "INSERT INTO table_versions (name) VALUES ('assets'), ('categories'), ('indicators') ON CONFLICT DO NOTHING",
+            # The counter is bumped inside the writing transaction, so a new version is never visible before its rows.
+            """CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger
+                LANGUAGE plpgsql
+                AS $$ BEGIN
+                    UPDATE table_versions SET version = version + 1, modified_at = now() WHERE name = TG_TABLE_NAME;
+                    RETURN NULL;
+                END $$""",
+            # Statement-level, so COPY and bulk writes bump once, and cascaded deletes bump the child table too.
+            *(
+                statement
+                for table in ("assets", "categories", "indicators")
+                for statement in (
+                    f"DROP TRIGGER IF EXISTS {table}_bump_version ON {table}",
+                    f"CREATE TRIGGER {table}_bump_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}"
+                    " FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+                )
+            ),
+        ],
+    },
+    {
+        "version": 8,
+        "description": "Change notifications on the entity_changes channel",
+        "requires": (),
+        "statements": [
+            # One notification per statement with the changed IDs, sent by Postgres on commit only.
+            # Large statements send ids as null (count only), which listeners treat as "reload the table".
+            """CREATE OR REPLACE FUNCTION notify_entity_changes() RETURNS trigger
+                LANGUAGE plpgsql
+                AS $$ DECLARE
+                    changed_ids INTEGER[];
+                    changed_count BIGINT;
+                BEGIN
+                    IF TG_OP = 'DELETE' THEN
+                        SELECT count(*) INTO changed_count FROM old_rows;
+                        SELECT array_agg(id) INTO changed_ids FROM (SELECT id FROM old_rows LIMIT 501) AS ids;
+                    ELSIF TG_OP <> 'TRUNCATE' THEN
+                        SELECT count(*) INTO changed_count FROM new_rows;
+                        SELECT array_agg(id) INTO changed_ids FROM (SELECT id FROM new_rows LIMIT 501) AS ids;
+                    END IF;
+                    IF changed_count = 0 THEN
+                        RETURN NULL;
+                    END IF;
+                    IF changed_count > 500 THEN
+                        changed_ids := NULL;
+                    END IF;
+                    PERFORM pg_notify('entity_changes', json_build_object(
+                        'entity', TG_TABLE_NAME, 'op', lower(TG_OP), 'ids', changed_ids, 'count', changed_count)::text);
+                    RETURN NULL;
+                END $$""",
+            # Transition tables allow a single event per trigger, hence one trigger per operation.
+            *(
+                statement
+                for table in ("assets", "categories", "indicators")
+                for operation, referencing in (("insert", "NEW TABLE AS new_rows"), ("update", "NEW TABLE AS new_rows"), ("delete", "OLD TABLE AS old_rows"), ("truncate", None))
+                for statement in (
+                    f"DROP TRIGGER IF EXISTS {table}_notify_{operation} ON {table}",
+                    f"CREATE TRIGGER {table}_notify_{operation} AFTER {operation.upper()} ON {table}"
+                    + (f" REFERENCING {referencing}" if referencing else "")
+                    + " FOR EACH STATEMENT EXECUTE FUNCTION notify_entity_changes()",
+                )
+            ),
+        ],
+    },
+    {
+        "version": 9,
+        "description": "Indicator value history partitioned by month",
+        "requires": (),
+        "statements": [
+            # The primary key leads with indicator_id, so a range read for one series is an index range
+            # scan in each month it spans, and months outside the range are pruned at planning time.
+            """CREATE TABLE IF NOT EXISTS indicator_history (
+                indicator_id INTEGER NOT NULL,
+                recorded_at TIMESTAMPTZ NOT NULL,
+                value NUMERIC(10, 2) NOT NULL,
+                CONSTRAINT indicator_history_pkey PRIMARY KEY (indicator_id, recorded_at),
+                CONSTRAINT indicator_history_indicator_id_fkey FOREIGN KEY (indicator_id)
+                    REFERENCES indicators (id) ON DELETE CASCADE
+            ) PARTITION BY RANGE (recorded_at)""",
+            # Monthly partitions (UTC) are created on demand; the advisory lock keeps concurrent writers
+            # from racing on the same month.
+            """CREATE OR REPLACE FUNCTION ensure_indicator_history_partitions(first_at TIMESTAMPTZ, last_at TIMESTAMPTZ) RETURNS void
+                LANGUAGE plpgsql
+                AS $$ DECLARE
+                    partition_month DATE := date_trunc('month', first_at AT TIME ZONE 'UTC');
+                    partition_name TEXT;
+                BEGIN
+                    WHILE partition_month <= last_at AT TIME ZONE 'UTC' LOOP
+                        partition_name := format('indicator_history_%s', to_char(partition_month, 'YYYY_MM'));
+                        IF to_regclass(partition_name) IS NULL THEN
+                            PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+                            EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF indicator_history FOR VALUES FROM (%L) TO (%L)',
+                                partition_name,
+                                partition_month::timestamp AT TIME ZONE 'UTC',
+                                (partition_month + interval '1 month')::timestamp AT TIME ZONE 'UTC');
+                        END IF;
+                        partition_month := partition_month + interval '1 month';
+                    END LOOP;
+                END $$""",
+            # Every insert and every value change of an indicator is recorded at the transaction time.
+            """CREATE OR REPLACE FUNCTION record_indicator_history() RETURNS trigger
+                LANGUAGE plpgsql
+                AS $$ BEGIN
+                    PERFORM ensure_indicator_history_partitions(now(), now());
+                    IF TG_OP = 'INSERT' THEN
+                        INSERT INTO indicator_history (indicator_id, recorded_at, value)
+                        SELECT id, now(), value FROM new_rows
+                        ON CONFLICT (indicator_id, recorded_at) DO UPDATE SET value = EXCLUDED.value;
+                    ELSE
+                        INSERT INTO indicator_history (indicator_id, recorded_at, value)
+                        SELECT new_rows.id, now(), new_rows.value FROM new_rows
+                        JOIN old_rows ON old_rows.id = new_rows.id
+                        WHERE new_rows.value IS DISTINCT FROM old_rows.value
+                        ON CONFLICT (indicator_id, recorded_at) DO UPDATE SET value = EXCLUDED.value;
+                    END IF;
+                    RETURN NULL;
+                END $$""",
+            "DROP TRIGGER IF EXISTS indicators_record_history_insert ON indicators",
+            "CREATE TRIGGER indicators_record_history_insert AFTER INSERT ON indicators"
+            " REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION record_indicator_history()",
+            "DROP TRIGGER IF EXISTS indicators_record_history_update ON indicators",
+            "CREATE TRIGGER indicators_record_history_update AFTER UPDATE ON indicators"
+            " REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION record_indicator_history()",
+            # Appends that bypass indicators still change the validators of the history routes.
+            "INSERT INTO table_versions (name) VALUES ('indicator_history') ON CONFLICT DO NOTHING",
+            "DROP TRIGGER IF EXISTS indicator_history_bump_version ON indicator_history",
+            "CREATE TRIGGER indicator_history_bump_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON indicator_history"
+            " FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+            # Current values become the first point of each series.
+            "SELECT ensure_indicator_history_partitions(now(), now())",
+            "INSERT INTO indicator_history (indicator_id, recorded_at, value) SELECT id, now(), value FROM indicators ON CONFLICT DO NOTHING",
+        ],
+    },
+    {
+        "version": 10,
+        "description": "Per-category indicator statistics kept current by triggers",
+        "requires": (),
+        "statements": [
+            """CREATE TABLE IF NOT EXISTS category_indicator_stats (
+                category_id INTEGER NOT NULL,
+                name VARCHAR(100) NOT NULL,
+                count BIGINT NOT NULL,
+                mean DOUBLE PRECISION,
+                stddev DOUBLE PRECISION,
+                min DOUBLE PRECISION,
+                p10 DOUBLE PRECISION,
+                p25 DOUBLE PRECISION,
+                median DOUBLE PRECISION,
+                p75 DOUBLE PRECISION,
+                p90 DOUBLE PRECISION,
+                max DOUBLE PRECISION,
+                refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                CONSTRAINT category_indicator_stats_pkey PRIMARY KEY (category_id, name),
+                CONSTRAINT category_indicator_stats_category_id_fkey FOREIGN KEY (category_id)
+                    REFERENCES categories (id) ON DELETE CASCADE
+            )""",
+            # Recomputes the (category, name) groups given as pairs of the two arrays; a null name stands
+            # for every indicator of the category. Percentiles cannot be maintained from deltas, so the
+            # affected groups are aggregated again, each through assets_category_id_idx.
+            # Writers of the same category take turns on an advisory lock held until commit, and each
+            # statement below takes a fresh snapshot, so a recompute always sees what the previous one committed.
+            """CREATE OR REPLACE FUNCTION refresh_category_indicator_stats(category_ids INTEGER[], names TEXT[] DEFAULT NULL) RETURNS void
+                LANGUAGE plpgsql
+                AS $$ BEGIN
+                    PERFORM pg_advisory_xact_lock(hashtext('category_indicator_stats'), locked.category_id)
+                    FROM (SELECT DISTINCT unnest(category_ids) AS category_id ORDER BY 1) AS locked;
+                    DELETE FROM category_indicator_stats AS stats
+                    USING unnest(category_ids, names) AS changed (category_id, name)
+                    WHERE stats.category_id = changed.category_id AND (changed.name IS NULL OR stats.name = changed.name);
+                    INSERT INTO category_indicator_stats (category_id, name, count, mean, stddev, min, p10, p25, median, p75, p90, max)
+                    SELECT category_id, name, count, mean, stddev, min, percentiles[1], percentiles[2], percentiles[3], percentiles[4], percentiles[5], max
+                    FROM (
+                        SELECT a.category_id, i.name, count(*) AS count, avg(i.value)::float8 AS mean, stddev_samp(i.value)::float8 AS stddev,
+                            min(i.value)::float8 AS min, max(i.value)::float8 AS max,
+                            percentile_cont(ARRAY[0.1, 0.25, 0.5, 0.75, 0.9]) WITHIN GROUP (ORDER BY i.value::float8) AS percentiles
+                        FROM assets a
+                        JOIN indicators i ON i.asset_id = a.id
+                        JOIN unnest(category_ids, names) AS changed (category_id, name)
+                            ON a.category_id = changed.category_id AND (changed.name IS NULL OR i.name = changed.name)
+                        GROUP BY a.category_id, i.name
+                    ) AS groups;
+                END $$""",
+            # Indicator writes refresh the groups of the rows they touched, before and after the change.
+            """CREATE OR REPLACE FUNCTION refresh_indicator_category_stats() RETURNS trigger
+                LANGUAGE plpgsql
+                AS $$ DECLARE
+                    changed_categories INTEGER[];
+                    changed_names TEXT[];
+                BEGIN
+                    IF TG_OP = 'TRUNCATE' THEN
+                        DELETE FROM category_indicator_stats;
+                        RETURN NULL;
+                    ELSIF TG_OP = 'INSERT' THEN
+                        SELECT array_agg(category_id), array_agg(name) INTO changed_categories, changed_names
+                        FROM (SELECT DISTINCT a.category_id, n.name FROM new_rows n JOIN assets a ON a.id = n.asset_id WHERE a.category_id IS NOT NULL) AS changed;
+                    ELSIF TG_OP = 'DELETE' THEN
+                        -- Rows deleted along with their asset are covered by the assets trigger.
+                        SELECT array_agg(category_id), array_agg(name) INTO changed_categories, changed_names
+                        FROM (SELECT DISTINCT a.category_id, o.name FROM old_rows o JOIN assets a ON a.id = o.asset_id WHERE a.category_id IS NOT NULL) AS changed;
+                    ELSE
+                        SELECT array_agg(category_id), array_agg(name) INTO changed_categories, changed_names
+                        FROM (
+                            SELECT a.category_id, o.name FROM old_rows o
+                            JOIN new_rows n ON n.id = o.id
+                            JOIN assets a ON a.id = o.asset_id
+                            WHERE (n.name, n.value, n.asset_id) IS DISTINCT FROM (o.name, o.value, o.asset_id) AND a.category_id IS NOT NULL
+                            UNION
+                            SELECT a.category_id, n.name FROM old_rows o
+                            JOIN new_rows n ON n.id = o.id
+                            JOIN assets a ON a.id = n.asset_id
+                            WHERE (n.name, n.value, n.asset_id) IS DISTINCT FROM (o.name, o.value, o.asset_id) AND a.category_id IS NOT NULL
+                        ) AS changed;
+                    END IF;
+                    IF changed_categories IS NOT NULL THEN
+                        PERFORM refresh_category_indicator_stats(changed_categories, changed_names);
+                    END IF;
+                    RETURN NULL;
+                END $$""",
+            # Moving or deleting an asset changes every group of its old and new category.
+            """CREATE OR REPLACE FUNCTION refresh_asset_category_stats() RETURNS trigger
+                LANGUAGE plpgsql
+                AS $$ DECLARE
+                    changed_categories INTEGER[];
+                BEGIN
+                    IF TG_OP = 'DELETE' THEN
+                        SELECT array_agg(DISTINCT category_id) INTO changed_categories FROM old_rows WHERE category_id IS NOT NULL;
+                    ELSE
+                        SELECT array_agg(DISTINCT moved.category_id) INTO changed_categories
+                        FROM old_rows o
+                        JOIN new_rows n ON n.id = o.id
+                        CROSS JOIN LATERAL (VALUES (o.category_id), (n.category_id)) AS moved (category_id)
+                        WHERE n.category_id IS DISTINCT FROM o.category_id AND moved.category_id IS NOT NULL;
+                    END IF;
+                    IF changed_categories IS NOT NULL THEN
+                        PERFORM refresh_category_indicator_stats(changed_categories);
+                    END IF;
+                    RETURN NULL;
+                END $$""",
+            *(
+                statement
+                for table, function, operations in (
+                    ("indicators", "refresh_indicator_category_stats", ("insert", "update", "delete", "truncate")),
+                    ("assets", "refresh_asset_category_stats", ("update", "delete")),
+                )
+                for operation in operations
+                for statement in (
+                    f"DROP TRIGGER IF EXISTS {table}_category_stats_{operation} ON {table}",
+                    f"CREATE TRIGGER {table}_category_stats_{operation} AFTER {operation.upper()} ON {table}"
+                    + {
+                        "insert": " REFERENCING NEW TABLE AS new_rows",
+                        "update": " REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+                        "delete": " REFERENCING OLD TABLE AS old_rows",
+                        "truncate": "",
+                    }[operation]
+                    + f" FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+                )
+            ),
+            "INSERT INTO table_versions (name) VALUES ('category_indicator_stats') ON CONFLICT DO NOTHING",
+            "DROP TRIGGER IF EXISTS category_indicator_stats_bump_version ON category_indicator_stats",
+            "CREATE TRIGGER category_indicator_stats_bump_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON category_indicator_stats"
+            " FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+            "SELECT refresh_category_indicator_stats(array_agg(id)) FROM categories",
+        ],
+    },
+    {
+        "version": 11,
+        "description": "Import journal and deferrable category statistics",
+        "requires": (),
+        "statements": [
+            # One row per committed import batch, written in the batch's transaction, so an interrupted
+            # import resumes by skipping exactly the batches that made it in.
+            """CREATE TABLE IF NOT EXISTS import_batches (
+                job TEXT NOT NULL,
+                first_row BIGINT NOT NULL,
+                row_count INTEGER NOT NULL,
+                imported_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                CONSTRAINT import_batches_pkey PRIMARY KEY (job, first_row)
+            )""",
+            # A bulk load sets app.defer_category_stats in its transactions and refreshes every category
+            # once at the end, instead of re-aggregating the touched groups after each batch.
+            *(
+                statement
+                for table, function, operations in (
+                    ("indicators", "refresh_indicator_category_stats", ("insert", "update", "delete", "truncate")),
+                    ("assets", "refresh_asset_category_stats", ("update", "delete")),
+                )
+                for operation in operations
+                for statement in (
+                    f"DROP TRIGGER IF EXISTS {table}_category_stats_{operation} ON {table}",
+                    f"CREATE TRIGGER {table}_category_stats_{operation} AFTER {operation.upper()} ON {table}"
+                    + {
+                        "insert": " REFERENCING NEW TABLE AS new_rows",
+                        "update": " REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+                        "delete": " REFERENCING OLD TABLE AS old_rows",
+                        "truncate": "",
+                    }[operation]
+                    + " FOR EACH STATEMENT WHEN (current_setting('app.defer_category_stats', true) IS DISTINCT FROM 'on')"
+                    + f" EXECUTE FUNCTION {function}()",
+                )
+            ),
+        ],
+    },
+]
+
+class Migrations:
+    def __init__(self):
+        try:
+            self.pool = Connection().get_pool()
+        except Exception as e:
+            logging.critical("Error initializing Migrations: %s", e)
+            raise
+
+    def ensure_table(self, cursor):
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version INTEGER PRIMARY KEY,"
+            " description TEXT NOT NULL,"
+            " applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+
+    def get_applied(self, cursor):
+        cursor.execute("SELECT version, applied_at FROM schema_migrations")
+        return dict(cursor.fetchall())
+
+    def get_available_extensions(self, cursor):
+        cursor.execute("SELECT name FROM pg_available_extensions")
+        return {row[0] for row in cursor.fetchall()}
+
+    def migrate(self, target=None):
+        applied_now = []
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            with conn.transaction():
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+                self.ensure_table(cursor)
+                available = self.get_available_extensions(cursor)
+            for migration in MIGRATIONS:
+                version = migration["version"]
+                if target is not None and version > target:
+                    break
+                missing = [name for name in migration["requires"] if name not in available]
+                if missing:
+                    logging.warning("Skipping migration %s (%s): extension not available: %s", version, migration["description"], ", ".join(missing))
+                    continue
+                with conn.transaction():
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+                    if version in self.get_applied(cursor):
+                        continue
+                    for statement in migration["statements"]:
+                        cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                        (version, migration["description"]),
+                    )
+                applied_now.append(version)
+                logging.info("Applied migration %s: %s", version, migration["description"])
+        return applied_now
+
+    def migrate_on_startup(self):
+        load_dotenv()
+        if os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() not in ("1", "true", "yes"):
+            return []
+        try:
+            return self.migrate()
+        except Exception as e:
+            logging.error("Error applying migrations on startup: %s", e)
+            return []
+
+    def status(self):
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            with conn.transaction():
+                self.ensure_table(cursor)
+                applied = self.get_applied(cursor)
+                available = self.get_available_extensions(cursor)
+        return [
+            {
+                "version": migration["version"],
+                "description": migration["description"],
+                "applied_at": applied[migration["version"]].isoformat() if migration["version"] in applied else None,
+                "missing_extensions": [name for name in migration["requires"] if name not in available],
+            }
+            for migration in MIGRATIONS
+        ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or inspect database schema migrations")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    migrate = subcommands.add_parser("migrate", help="Apply pending migrations")
+    migrate.add_argument("--target", type=int, default=None, help="Stop after this version")
+    subcommands.add_parser("status", help="List migrations and whether they are applied")
+    args = parser.parse_args()
+
+    migrations = Migrations()
+    try:
+        if args.command == "migrate":
+            print(json.dumps({"applied": migrations.migrate(args.target)}))
+        else:
+            print(json.dumps(migrations.status(), indent=2))
+    except Exception as e:
+        logging.error("Migration command failed: %s", e)
+        sys.exit(1)
+    finally:
+        Connection.close_pool()
+
+if __name__ == "__main__":
+    main()
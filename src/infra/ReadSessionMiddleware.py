@@ -0,0 +1,42 @@
+from http.cookies import SimpleCookie
+
+from src.infra.ReplicaRouter import current_session, start_session, end_session
+
+COOKIE_NAME = "db_written_at"
+
+def read_written_at(headers):
+    for name, value in headers:
+        if name == b"cookie":
+            morsel = SimpleCookie(value.decode("latin-1")).get(COOKIE_NAME)
+            if morsel is not None:
+                try:
+                    return float(morsel.value)
+                except ValueError:
+                    return None
+    return None
+
+class ReadSessionMiddleware:
+    # Gives each request its own read session (see ReplicaRouter). A request that writes gets a cookie
+    # with the time of the write, so the client's next requests keep reading from the primary until
+    # replicas have caught up, even when they land on another worker.
+    def __init__(self, app, sticky_seconds=5.0):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        written_at = read_written_at(scope["headers"])
+        token = start_session(written_at)
+        session = current_session()
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and session.written_at is not None and session.written_at != written_at:
+                cookie = f"{COOKIE_NAME}={session.written_at:.3f}; Max-Age={max(int(self.sticky_seconds), 1)}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            end_session(token)
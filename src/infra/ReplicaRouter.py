@@ -0,0 +1,158 @@
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from psycopg_pool import ConnectionPool, AsyncConnectionPool, PoolTimeout
+import itertools
+import time
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+POLICIES = ("round_robin", "least_busy")
+
+@dataclass(slots=True)
+class ReadSession:
+    # When the session last committed a write (epoch seconds), and the replica its reads are pinned to.
+    written_at: float | None = None
+    replica: int | None = None
+
+_session = ContextVar("read_session", default=None)
+
+def current_session():
+    # The API starts a session per request (ReadSessionMiddleware); anywhere else a session lasts as
+    # long as the thread or task it was first used in. It is a mutable object, so copies of the
+    # context (thread pool calls, child tasks) share it.
+    session = _session.get()
+    if session is None:
+        session = ReadSession()
+        _session.set(session)
+    return session
+
+def start_session(written_at=None):
+    return _session.set(ReadSession(written_at))
+
+def end_session(token):
+    _session.reset(token)
+
+def record_write():
+    current_session().written_at = time.time()
+
+class WritePool(ConnectionPool):
+    # The primary's pool. Writes check out write_connection(): once its block commits, the session's
+    # next reads stay on the primary until replicas have had time to replay the write. A block that
+    # raises was rolled back and pins nothing, and plain connection() checkouts never do.
+    @contextmanager
+    def write_connection(self, timeout=None):
+        with self.connection(timeout) as conn:
+            yield conn
+        record_write()
+
+    def read_connection(self, timeout=None):
+        # For reads that must see the primary's latest state, without pinning the session to it.
+        return self.connection(timeout)
+
+class AsyncWritePool(AsyncConnectionPool):
+    @asynccontextmanager
+    async def write_connection(self, timeout=None):
+        async with self.connection(timeout) as conn:
+            yield conn
+        record_write()
+
+    def read_connection(self, timeout=None):
+        return self.connection(timeout)
+
+class ReplicaRouter:
+    # Hands out connections for reads: from a replica (round robin or the least busy one), or from the
+    # primary when none is configured, when the session wrote less than sticky_seconds ago, or when
+    # the replica cannot hand out a connection within timeout. A failed replica is skipped for
+    # retry_seconds, then tried again by the next read.
+    def __init__(self, primary, replicas, policy="round_robin", sticky_seconds=5.0, timeout=1.0, retry_seconds=10.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown replica policy: {policy}")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.policy = policy
+        self.sticky_seconds = sticky_seconds
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.failed_until = [0.0] * len(self.replicas)
+        self.turns = itertools.count()
+
+    def busy(self, index):
+        stats = self.replicas[index].get_stats()
+        return stats.get("pool_size", 0) - stats.get("pool_available", 0) + stats.get("requests_waiting", 0)
+
+    def choose(self):
+        # Index of the replica to read from, or None for the primary.
+        if not self.replicas:
+            return None
+        session = current_session()
+        if session.written_at is not None and time.time() - session.written_at < self.sticky_seconds:
+            return None
+        now = time.monotonic()
+        if session.replica is not None and self.failed_until[session.replica] <= now:
+            return session.replica
+        healthy = [index for index, until in enumerate(self.failed_until) if until <= now]
+        if not healthy:
+            return None
+        if self.policy == "least_busy":
+            index = min(healthy, key=self.busy)
+        else:
+            index = healthy[next(self.turns) % len(healthy)]
+        # All reads of a session go to one replica, so the table versions behind an ETag are never
+        # newer than the rows sent with it.
+        session.replica = index
+        return index
+
+    def mark_failed(self, index, error):
+        self.failed_until[index] = time.monotonic() + self.retry_seconds
+        current_session().replica = None
+        logging.warning("Replica %s unavailable, reading from the primary for %.0f s: %s", self.replicas[index].name, self.retry_seconds, error)
+
+    def get_status(self):
+        now = time.monotonic()
+        return {pool.name: until <= now for pool, until in zip(self.replicas, self.failed_until)}
+
+    @contextmanager
+    def connection(self):
+        index = self.choose()
+        if index is not None:
+            pool = self.replicas[index]
+            try:
+                conn = pool.getconn(timeout=self.timeout)
+            except PoolTimeout as e:
+                self.mark_failed(index, e)
+            else:
+                try:
+                    with conn:
+                        yield conn
+                finally:
+                    # A connection lost mid-query takes the replica out too; the query itself is not retried.
+                    if conn.broken:
+                        self.mark_failed(index, "connection lost")
+                    pool.putconn(conn)
+                return
+        with self.primary.read_connection() as conn:
+            yield conn
+
+class AsyncReplicaRouter(ReplicaRouter):
+    @asynccontextmanager
+    async def connection(self):
+        index = self.choose()
+        if index is not None:
+            pool = self.replicas[index]
+            try:
+                conn = await pool.getconn(timeout=self.timeout)
+            except PoolTimeout as e:
+                self.mark_failed(index, e)
+            else:
+                try:
+                    async with conn:
+                        yield conn
+                finally:
+                    if conn.broken:
+                        self.mark_failed(index, "connection lost")
+                    await pool.putconn(conn)
+                return
+        async with self.primary.read_connection() as conn:
+            yield conn
@@ -0,0 +1,70 @@
+import re
+
+# Name search runs in tiers, each one only while the result limit is not yet filled:
+#   1. prefix of the whole name, served in order by the btree on search_key(name) COLLATE "C";
+#   2. prefix of every typed word, ranked with full-text ts_rank over a GIN index;
+#   3. plain substring, ordered by match position, only where the pg_trgm index exists
+#      (without it the tier is a sequential scan of the whole table).
+# search_key() is created by migration 4 and folds case and accents, so "acao" finds "Ação".
+# Typeahead stops after tier 2, so every query it runs is index-backed.
+
+SEARCH_KEY = 'search_key(name) COLLATE "C"'
+SEARCH_VECTOR = "to_tsvector('simple', search_key(name))"
+# Only this many word matches are ranked, so a short common prefix cannot make ts_rank score the whole table.
+RANK_CANDIDATES = 1000
+TRIGRAM_INDEX_QUERY = "SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = %s)"
+
+def trigram_index_name(table):
+    return f"{table}_name_search_trgm_idx"
+
+def escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def word_query(text):
+    words = re.findall(r"\w+", text)
+    return " & ".join(f"{word}:*" for word in words)
+
+def search_queries(table, columns, text, typeahead=False, substring=True):
+    # Each query takes its own parameters, then the IDs already found and the remaining limit.
+    text = text.strip()
+    if not text:
+        return []
+    queries = [(
+        f"SELECT {columns} FROM {table}"
+        f" WHERE {SEARCH_KEY} LIKE search_key(%s) AND id <> ALL(%s)"
+        f" ORDER BY {SEARCH_KEY}, id LIMIT %s",
+        (escape_like(text) + "%",),
+    )]
+    words = word_query(text)
+    if words:
+        queries.append((
+            f"SELECT {columns} FROM ("
+            f" SELECT *, ts_rank({SEARCH_VECTOR}, query) AS rank"
+            f" FROM {table}, to_tsquery('simple', search_key(%s)) AS query"
+            f" WHERE {SEARCH_VECTOR} @@ query AND id <> ALL(%s) LIMIT {RANK_CANDIDATES}"
+            f") AS candidates ORDER BY rank DESC, id LIMIT %s",
+            (words,),
+        ))
+    if substring and not typeahead:
+        queries.append((
+            f"SELECT {columns} FROM {table}, search_key(%s) AS needle"
+            " WHERE search_key(name) LIKE search_key(%s) AND id <> ALL(%s)"
+            " ORDER BY strpos(search_key(name), needle), length(name), id LIMIT %s",
+            (text, "%" + escape_like(text) + "%"),
+        ))
+    return queries
+
+def distinct_prefix_query(table):
+    # Loose index scan: each step jumps to the next distinct key after the previous one,
+    # so repeated names (one row per asset) are skipped instead of read.
+    return (
+        "WITH RECURSIVE names AS ("
+        f" (SELECT {SEARCH_KEY} AS key, name FROM {table}"
+        f" WHERE {SEARCH_KEY} LIKE search_key(%s) ORDER BY {SEARCH_KEY} LIMIT 1)"
+        " UNION ALL"
+        " SELECT next.key, next.name FROM names, LATERAL ("
+        f" SELECT {SEARCH_KEY} AS key, name FROM {table}"
+        f" WHERE {SEARCH_KEY} LIKE search_key(%s) AND {SEARCH_KEY} > names.key ORDER BY {SEARCH_KEY} LIMIT 1"
+        " ) AS next"
+        ") SELECT name FROM names LIMIT %s"
+    )
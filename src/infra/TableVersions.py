@@ -0,0 +1,61 @@
+from email.utils import format_datetime
+from datetime import timezone
+from src.infra.Connection import Connection
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Validators for HTTP conditional GETs. Every write to assets, categories or indicators bumps
+# a counter in table_versions (migration 7), so reading the counters is a single primary-key
+# lookup that tells whether a cached response is still current without running its query.
+
+VERSIONS_QUERY = "SELECT name, version, modified_at FROM table_versions WHERE name = ANY(%s) ORDER BY name"
+
+def build_validators(versions, variant):
+    # Weak ETag: the same versions always give equivalent content, though row order may differ.
+    tag = "-".join(f"{name}.{version}" for name, version, _ in versions)
+    last_modified = max(modified_at for _, _, modified_at in versions)
+    return {
+        "ETag": f'W/"{tag};{variant}"',
+        "Last-Modified": format_datetime(last_modified.astimezone(timezone.utc), usegmt=True),
+        # Clients may keep the body but must revalidate before using it.
+        "Cache-Control": "no-cache",
+        "Vary": "Accept",
+    }
+
+def is_not_modified(request_headers, validators):
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison, as required for If-None-Match.
+        etag = validators["ETag"].removeprefix("W/")
+        return any(tag.strip() == "*" or tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+    # If-Modified-Since alone is not honoured: HTTP dates have one-second resolution, so two writes
+    # within the same second share a Last-Modified and the second one would be answered with a 304.
+    return False
+
+class TableVersions:
+    def __init__(self):
+        try:
+            self.read_pool = Connection().get_read_pool()
+            self.async_read_pool = Connection().get_async_read_pool()
+        except Exception as e:
+            logging.critical("Error initializing TableVersions: %s", e)
+            raise
+
+    def get_versions(self, tables):
+        try:
+            with self.read_pool.connection() as conn, conn.cursor() as cursor:
+                cursor.execute(VERSIONS_QUERY, (list(tables),))
+                return cursor.fetchall()
+        except Exception as e:
+            logging.error("Error fetching table versions (%s): %s", ", ".join(tables), e)
+            return []
+
+    async def get_versions_async(self, tables):
+        try:
+            async with self.async_read_pool.connection() as conn, conn.cursor() as cursor:
+                await cursor.execute(VERSIONS_QUERY, (list(tables),))
+                return await cursor.fetchall()
+        except Exception as e:
+            logging.error("Error fetching table versions (%s): %s", ", ".join(tables), e)
+            return []
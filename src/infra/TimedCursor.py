@@ -0,0 +1,77 @@
+from contextlib import contextmanager, asynccontextmanager
+from time import perf_counter
+import sys
+
+from psycopg import Cursor, AsyncCursor
+from src.infra.Metrics import Metrics
+
+# Cursors handed out by the pools (see Connection). Every execute and COPY is timed and
+# recorded under the repository method that ran it, so the repositories need no changes.
+
+# Classes whose methods name the recorded queries.
+QUERY_OWNERS = ("Repository.", "Migrations.", "TableVersions.")
+
+def query_label():
+    # Walks a few frames up to the repository method; COPY helpers in Columnar sit in between.
+    frame = sys._getframe(2)
+    for _ in range(8):
+        if frame is None:
+            break
+        name = frame.f_code.co_qualname
+        if any(owner in name for owner in QUERY_OWNERS):
+            return name
+        frame = frame.f_back
+    return "other"
+
+class TimedCursor(Cursor):
+    def execute(self, query, params=None, **kwargs):
+        # The pool's health check executes an empty query on every checkout; it is not a repository query.
+        if not query:
+            return super().execute(query, params, **kwargs)
+        label = query_label()
+        start = perf_counter()
+        error = True
+        try:
+            result = super().execute(query, params, **kwargs)
+            error = False
+            return result
+        finally:
+            Metrics.shared().observe_query(label, perf_counter() - start, self.rowcount, error, query, params)
+
+    @contextmanager
+    def copy(self, statement, params=None, **kwargs):
+        label = query_label()
+        start = perf_counter()
+        error = True
+        try:
+            with super().copy(statement, params, **kwargs) as copy:
+                yield copy
+            error = False
+        finally:
+            Metrics.shared().observe_query(label, perf_counter() - start, self.rowcount, error, statement, params)
+
+class AsyncTimedCursor(AsyncCursor):
+    async def execute(self, query, params=None, **kwargs):
+        if not query:
+            return await super().execute(query, params, **kwargs)
+        label = query_label()
+        start = perf_counter()
+        error = True
+        try:
+            result = await super().execute(query, params, **kwargs)
+            error = False
+            return result
+        finally:
+            Metrics.shared().observe_query(label, perf_counter() - start, self.rowcount, error, query, params)
+
+    @asynccontextmanager
+    async def copy(self, statement, params=None, **kwargs):
+        label = query_label()
+        start = perf_counter()
+        error = True
+        try:
+            async with super().copy(statement, params, **kwargs) as copy:
+                yield copy
+            error = False
+        finally:
+            Metrics.shared().observe_query(label, perf_counter() - start, self.rowcount, error, statement, params)
@@ -0,0 +1,30 @@
+from time import perf_counter
+
+from src.infra.Metrics import Metrics
+
+class TimingMiddleware:
+    # Plain ASGI middleware: it only wraps send, so streamed responses are timed until their last byte
+    # without buffering the body the way BaseHTTPMiddleware would.
+    def __init__(self, app, metrics=None):
+        self.app = app
+        self.metrics = metrics or Metrics.shared()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; labelling by its template
+            # (/assets/{asset_id}) keeps one series per route instead of one per ID.
+            route = scope.get("route")
+            self.metrics.observe_request(scope["method"], route.path if route else "unmatched", status, perf_counter() - start)
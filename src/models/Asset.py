@@ -1,7 +1,8 @@
-class Asset:
-    def __init__(self, asset_id, asset_name, asset_type, asset_category_id):
-        self.id = asset_id
-        self.name = asset_name
-        self.type = asset_type
-        self.category_id = asset_category_id
+from dataclasses import dataclass
 
+@dataclass(slots=True)
+class Asset:
+    id: int
+    name: str
+    type: str
+    category_id: int | None
@@ -1,7 +1,7 @@
-class Category:
-    def __init__(self, category_id, category_name, category_description):
-        self.id = category_id
-        self.name = category_name
-        self.description = category_description
-
+from dataclasses import dataclass
 
+@dataclass(slots=True)
+class Category:
+    id: int
+    name: str
+    description: str | None
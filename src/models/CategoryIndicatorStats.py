@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+@dataclass(slots=True)
+class CategoryIndicatorStats:
+    category_id: int
+    name: str
+    count: int
+    mean: float | None
+    stddev: float | None
+    min: float | None
+    p10: float | None
+    p25: float | None
+    median: float | None
+    p75: float | None
+    p90: float | None
+    max: float | None
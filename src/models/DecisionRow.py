@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(slots=True)
+class DecisionRow:
+    id: int
+    name: str
+    value: float | None
+    asset_id: int
+    asset_name: str
+    category_id: int | None
+    category_name: str | None
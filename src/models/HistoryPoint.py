@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass(slots=True)
+class HistoryPoint:
+    recorded_at: datetime
+    value: float | None
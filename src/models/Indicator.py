@@ -1,6 +1,8 @@
+from dataclasses import dataclass
+
+@dataclass(slots=True)
 class Indicator:
-    def __init__(self, indicator_id, indicator_name, indicator_value, asset_id):
-        self.id = indicator_id
-        self.name = indicator_name
-        self.value = indicator_value
-        self.asset_id = asset_id
+    id: int
+    name: str
+    value: float | None
+    asset_id: int | None
@@ -0,0 +1,39 @@
+import json
+
+import numpy as np
+import pyarrow as pa
+
+class IndicatorMatrix:
+    def __init__(self, asset_ids, asset_names, indicator_names, values):
+        self.asset_ids = asset_ids
+        self.asset_names = asset_names
+        self.indicators = indicator_names
+        self.values = values
+
+    def to_dict(self):
+        # JSON has no NaN, so missing values are sent as null.
+        values = np.where(np.isnan(self.values), None, self.values).tolist()
+        return {
+            "asset_ids": self.asset_ids,
+            "asset_names": self.asset_names,
+            "indicators": self.indicators,
+            "values": values,
+        }
+
+    def iter_json(self, rows_per_chunk=2000):
+        # Same document as to_dict, encoded a block of rows at a time so a large matrix never holds the
+        # GIL (and the event loop with it) for one multi-second json.dumps call.
+        head = {"asset_ids": self.asset_ids, "asset_names": self.asset_names, "indicators": self.indicators}
+        yield json.dumps(head)[:-1] + ', "values": ['
+        for start in range(0, len(self.values), rows_per_chunk):
+            block = self.values[start:start + rows_per_chunk]
+            rows = json.dumps(np.where(np.isnan(block), None, block).tolist())[1:-1]
+            yield rows if start == 0 else ", " + rows
+        yield "]}"
+
+    def to_table(self):
+        # Wide layout: one row per asset and one float column per indicator (null when missing).
+        columns = {"asset_id": pa.array(self.asset_ids, pa.int64()), "asset_name": pa.array(self.asset_names, pa.string())}
+        for index, name in enumerate(self.indicators):
+            columns[name] = pa.array(self.values[:, index], pa.float64(), from_pandas=True)
+        return pa.table(columns)
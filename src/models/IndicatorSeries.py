@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+from src.models.HistoryPoint import HistoryPoint
+
+@dataclass(slots=True)
+class IndicatorSeries:
+    indicator_id: int
+    name: str
+    points: list[HistoryPoint]
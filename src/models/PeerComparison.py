@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from src.models.CategoryIndicatorStats import CategoryIndicatorStats
+
+@dataclass(slots=True)
+class PeerComparison:
+    indicator_id: int
+    name: str
+    value: float | None
+    # Standard deviations from the category mean; None without peers to compare against.
+    z_score: float | None
+    peers: CategoryIndicatorStats | None
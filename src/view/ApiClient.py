@@ -0,0 +1,167 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import threading
+import json
+import time
+
+import httpx
+import pyarrow as pa
+
+import logging
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# Gateway errors are worth another try; other statuses are returned to the caller as they are.
+RETRY_STATUSES = (502, 503, 504)
+# Endpoint prefixes whose responses depend on each table, used to apply change events from /changes.
+ENTITY_ENDPOINTS = {
+    "assets": ("/assets", "/decision"),
+    "categories": ("/categories", "/decision"),
+    "indicators": ("/indicators", "/decision"),
+}
+
+class ApiClient:
+    # HTTP client for the Streamlit front end, meant to be shared by every session (st.cache_resource).
+    # Responses are memoized per endpoint and params for memo_ttl seconds. After that they are revalidated
+    # with their ETag, so unchanged data costs a 304. Any write through send() marks the memo as stale.
+    # After watch(), entries stay fresh until /changes reports a write to a table they depend on,
+    # and the TTL only applies again while that stream is disconnected.
+    def __init__(self, base_url, timeout=10.0, connect_timeout=3.0, retries=2, backoff=0.2, memo_ttl=10.0, max_memo_entries=100, max_workers=8):
+        # One extra connection for the /changes stream.
+        limits = httpx.Limits(max_connections=max_workers + 1, max_keepalive_connections=max_workers + 1)
+        # The transport retries failed connects, which never reached the API, so they are safe for writes too.
+        self.client = httpx.Client(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            transport=httpx.HTTPTransport(retries=retries, limits=limits),
+        )
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api_client")
+        self.retries = retries
+        self.backoff = backoff
+        self.memo_ttl = memo_ttl
+        self.max_memo_entries = max_memo_entries
+        # key -> (body, etag, fetched_at)
+        self.memo = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.watcher = None
+        self.watching = False
+        self.closed = False
+
+    def _get(self, endpoint, params, headers):
+        # Reads are also retried on timeouts and gateway errors; writes are not, since they may have been applied.
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.client.get(endpoint, params=params, headers=headers)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def fetch(self, endpoint, params=None, accept=None, parse=None):
+        key = (endpoint, repr(params), accept)
+        with self.lock:
+            entry = self.memo.get(key)
+            generation = self.generation
+        if entry and entry[2] > float("-inf") and (self.watching or time.monotonic() - entry[2] < self.memo_ttl):
+            return entry[0]
+
+        headers = {"Accept": accept} if accept else {}
+        if entry and entry[1]:
+            headers["If-None-Match"] = entry[1]
+        response = self._get(endpoint, params, headers)
+        if response.status_code == 304 and entry:
+            body, etag = entry[0], entry[1]
+        else:
+            response.raise_for_status()
+            body = parse(response) if parse else response
+            etag = response.headers.get("ETag")
+
+        with self.lock:
+            # A write that happened while this request was in flight makes the body stale at once.
+            fetched_at = time.monotonic() if generation == self.generation else float("-inf")
+            self.memo[key] = (body, etag, fetched_at)
+            self.memo.move_to_end(key)
+            while len(self.memo) > self.max_memo_entries:
+                self.memo.popitem(last=False)
+        return body
+
+    def get_json(self, endpoint, params=None):
+        return self.fetch(endpoint, params, parse=lambda response: response.json())
+
+    def get_frame(self, endpoint, params=None):
+        # The cached DataFrame is shared, so callers that modify it should take a copy.
+        return self.fetch(endpoint, params, ARROW_MEDIA_TYPE, lambda response: pa.ipc.open_stream(response.content).read_pandas())
+
+    def send(self, endpoint, params=None):
+        try:
+            response = self.client.get(endpoint, params=params)
+            return response.status_code == 200
+        finally:
+            self.invalidate()
+
+    def invalidate(self, entity=None):
+        # Bodies and ETags are kept so the next read can still be answered with a 304.
+        prefixes = ENTITY_ENDPOINTS.get(entity, ("/",))
+        with self.lock:
+            self.generation += 1
+            for key, (body, etag, _) in list(self.memo.items()):
+                if key[0].startswith(prefixes):
+                    self.memo[key] = (body, etag, float("-inf"))
+
+    def watch(self, read_timeout=45.0):
+        # Follows /changes on a daemon thread. The API sends a keepalive every 15 seconds,
+        # so a stream silent for read_timeout is treated as dead and reopened.
+        if self.watcher is None:
+            self.watcher = threading.Thread(target=self._follow_changes, args=(read_timeout,), name="api_client_changes", daemon=True)
+            self.watcher.start()
+
+    def _follow_changes(self, read_timeout):
+        last_event_id = None
+        while not self.closed:
+            try:
+                # Last-Event-ID makes the API replay what was missed while reconnecting, or send a resync.
+                headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+                with self.client.stream("GET", "/changes", headers=headers, timeout=httpx.Timeout(read_timeout, connect=self.client.timeout.connect)) as response:
+                    response.raise_for_status()
+                    if last_event_id is None:
+                        # Entries fetched before the stream opened may have missed events.
+                        self.invalidate()
+                    self.watching = True
+                    fields = {}
+                    for line in response.iter_lines():
+                        if line:
+                            name, _, value = line.partition(":")
+                            fields[name] = value.removeprefix(" ")
+                            continue
+                        if "data" in fields:
+                            change = json.loads(fields["data"])
+                            self.invalidate(None if change["op"] == "resync" else change["entity"])
+                            last_event_id = fields.get("id", last_event_id)
+                        fields = {}
+            except Exception as e:
+                if not self.closed:
+                    logging.error("Error following API changes: %s", e)
+            finally:
+                self.watching = False
+            if not self.closed:
+                time.sleep(self.backoff * 10)
+
+    def gather(self, *calls):
+        # Runs independent (function, *args) calls on the pool. A failed call returns its exception,
+        # so the caller can report it from the script thread.
+        futures = [self.executor.submit(function, *args) for function, *args in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        self.closed = True
+        self.executor.shutdown(wait=False)
+        self.client.close()
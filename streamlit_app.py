@@ -1,65 +1,90 @@
+import os
+import time
 import pandas as pd
 import plotly.express as px
-import requests
 import streamlit as st
+from src.view.ApiClient import ApiClient
 
 # url do app.py (tem que rodar o app.py antes de rodar o streamlit_app.py) 
-BASE_URL = "http://localhost:8000"
+BASE_URL = os.getenv("API_URL", "http://localhost:8000")
 
-def fetch_data(endpoint):
-    response = requests.get(f"{BASE_URL}{endpoint}")
-    if response.status_code == 200:
-        return response.json()
-    else:
-        st.error(f"Erro ao acessar {endpoint}: {response.status_code}")
-        return []
+st.set_page_config(page_title="Sistema de Decisão", layout="wide")
+
+@st.cache_resource
+def get_client():
+    # Um cliente só para todas as sessões: conexões keep-alive, timeouts, retentativas e respostas memorizadas.
+    # watch() acompanha /changes, então só as respostas das tabelas alteradas são buscadas de novo.
+    client = ApiClient(BASE_URL)
+    client.watch()
+    return client
+
+client = get_client()
+
+def load(*calls):
+    # Chamadas independentes rodam em paralelo; erros aparecem na página e viram valores vazios
+    results = client.gather(*[(getattr(client, kind), endpoint, params) for kind, endpoint, params in calls])
+    values = []
+    for (kind, endpoint, _), result in zip(calls, results):
+        if isinstance(result, Exception):
+            st.error(f"Erro ao acessar {endpoint}: {result}")
+            result = pd.DataFrame() if kind == "get_frame" else []
+        # Cópia, porque as páginas alteram o DataFrame e o guardado no cliente é compartilhado
+        values.append(result.copy() if isinstance(result, pd.DataFrame) else result)
+    return values
+
+def fetch_data(endpoint, params=None):
+    return load(("get_json", endpoint, params))[0]
+
+def fetch_frame(endpoint, params=None):
+    # Listas grandes chegam em Arrow e viram DataFrame sem passar por JSON
+    return load(("get_frame", endpoint, params))[0]
 
 def send_post_request(endpoint, params):
-    response = requests.get(f"{BASE_URL}{endpoint}", params=params)
-    return response.status_code == 200
+    # Toda escrita invalida as respostas memorizadas
+    try:
+        return client.send(endpoint, params)
+    except Exception as e:
+        st.error(f"Erro ao acessar {endpoint}: {e}")
+        return False
 
 def decision_page():
     st.header("📊 Invest+")
 
-    assets = fetch_data("/assets")
-    categories = fetch_data("/categories")
-    indicators = fetch_data("/indicators")
-        
-    if not assets or not categories or not indicators:
-        st.warning("Não foi possível carregar dados de ativos, categorias ou indicadores.")
-        return
+    df_assets, df_categories, indicator_names = load(
+        ("get_frame", "/assets", None),
+        ("get_frame", "/categories", None),
+        ("get_json", "/decision/indicator-names", None),
+    )
 
-    asset_options = {asset["name"]: asset["id"] for asset in assets}
-    category_options = {category["name"]: category["id"] for category in categories}
+    if df_assets.empty or df_categories.empty:
+        st.warning("Não foi possível carregar dados de ativos ou categorias.")
+        return
 
-    asset_category_map = {asset["id"]: asset["category_id"] for asset in assets}
-    category_map = {category["id"]: category["name"] for category in categories}
+    asset_options = dict(zip(df_assets["name"], df_assets["id"]))
+    category_options = dict(zip(df_categories["name"], df_categories["id"]))
 
     selected_assets = st.multiselect("Selecione um ou mais ativos:", options=asset_options.keys())
     selected_categories = st.multiselect("Selecione uma ou mais categorias:", options=category_options.keys())
+    selected_indicators = st.multiselect("Selecione um ou mais indicadores:", options=indicator_names)
+
+    # Filtros e junção com nomes de ativos e categorias são feitos no banco pela API
+    filters = {
+        "asset_ids": [int(asset_options[name]) for name in selected_assets],
+        "category_ids": [int(category_options[name]) for name in selected_categories],
+        "indicator_names": selected_indicators,
+    }
+    # Sem filtro a página carregaria todos os indicadores de todos os ativos
+    if not any(filters.values()):
+        st.info("Selecione ao menos um ativo, categoria ou indicador.")
+        return
+    # A matriz usa os mesmos filtros, então as duas chamadas saem juntas
+    df_indicators, df_matrix = load(("get_frame", "/decision/view", filters), ("get_frame", "/decision/matrix", filters))
 
-    if selected_assets:
-        selected_asset_ids = [asset_options[name] for name in selected_assets]
-        indicators = [indicator for indicator in indicators if indicator["asset_id"] in selected_asset_ids]
-    
-    if selected_categories:
-        selected_category_ids = [category_options[name] for name in selected_categories]
-        indicators = [indicator for indicator in indicators if asset_category_map[indicator["asset_id"]] in selected_category_ids]
-    
-    if assets:
-        df_assets = pd.DataFrame(assets)
-        
-        category_map = {category["id"]: category["name"] for category in categories}
-        df_assets["category_name"] = df_assets["category_id"].map(category_map)  
-
-        df_assets.index = range(1, len(df_assets) + 1)
-
-    if indicators:
-        df_indicators = pd.DataFrame(indicators)
-
-        asset_map = {asset["id"]: asset["name"] for asset in assets}
-        df_indicators["asset_name"] = df_indicators["asset_id"].map(asset_map)
+    category_map = dict(zip(df_categories["id"], df_categories["name"]))
+    df_assets["category_name"] = df_assets["category_id"].map(category_map)
+    df_assets.index = range(1, len(df_assets) + 1)
 
+    if not df_indicators.empty:
         df_indicators.index = range(1, len(df_indicators) + 1)
 
         cols = st.columns(2)
@@ -71,16 +96,18 @@ def decision_page():
             st.write("Tabela de Indicadores Filtrados")
             st.dataframe(df_indicators)
 
-        numeric_indicators = df_indicators[df_indicators["value"].apply(lambda x: isinstance(x, (int, float)))] 
+        # Matriz ativo x indicador: cada gráfico lê uma coluna, sem varrer as linhas de novo
+        if not df_matrix.empty:
+            df_matrix = df_matrix.drop(columns="asset_id").set_index("asset_name")
 
-        if not numeric_indicators.empty:
-            num_columns = len(numeric_indicators["name"].unique())
-            columns = st.columns(num_columns)
+        if not df_matrix.empty:
+            columns = st.columns(len(df_matrix.columns))
+            color_map = {name: px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)]
+                         for i, name in enumerate(selected_assets)}
 
-            for idx, indicator in enumerate(numeric_indicators["name"].unique()):
-                indicator_data = numeric_indicators[numeric_indicators["name"] == indicator]
-                color_map = {name: px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)]
-                             for i, name in enumerate(selected_assets)}
+            for idx, indicator in enumerate(df_matrix.columns):
+                indicator_data = df_matrix[indicator].dropna().rename_axis("asset_name").reset_index(name="value")
+                indicator_data["name"] = indicator
                 fig = px.bar(
                     indicator_data,
                     x="name",
@@ -100,13 +127,17 @@ def decision_page():
 # Gerenciamento
 def manage_page():
     st.header("📋 Gerenciar Ativos e Indicadores")
-    
+
+    df_categories, df_assets, df_indicators = load(
+        ("get_frame", "/categories", None),
+        ("get_frame", "/assets", None),
+        ("get_frame", "/indicators", None),
+    )
+
     categories_placeholder = st.expander("🗂️ Categorias")
-    categories = fetch_data("/categories")
-    if categories:
+    if not df_categories.empty:
         with categories_placeholder:
             st.write("Categorias Disponíveis")
-            df_categories = pd.DataFrame(categories)
             st.dataframe(df_categories)
 
     with st.form("Nova Categoria"):
@@ -115,63 +146,59 @@ def manage_page():
         if st.form_submit_button("Adicionar Categoria"):
             if send_post_request("/categories/new", {"name": category_name, "description": description}):
                 st.success("Categoria adicionada com sucesso.")
-                categories = fetch_data("/categories")
-                if categories:
-                    df_categories = pd.DataFrame(categories)
+                df_categories = fetch_frame("/categories")
+                if not df_categories.empty:
                     st.dataframe(df_categories)
             else:
                 st.error("Erro ao adicionar categoria.")
 
     assets_placeholder = st.expander("🏢 Ativos")
-    assets = fetch_data("/assets")
-    if assets:
+    if not df_assets.empty:
         with assets_placeholder:
             st.write("Ativos Disponíveis")
-            df_assets = pd.DataFrame(assets)
             st.dataframe(df_assets)
 
     with st.form("Novo Ativo"):
         name = st.text_input("Nome")
         type_ = st.text_input("Tipo")
-        category = st.selectbox("Categoria", options={category["name"]: category["id"] for category in categories})
+        # O valor escolhido é o ID; o nome só aparece na lista
+        category_names = dict(zip(df_categories.get("id", []), df_categories.get("name", [])))
+        category_id = st.selectbox("Categoria", options=list(category_names), format_func=category_names.get)
         if st.form_submit_button("Adicionar Ativo"):
-            if send_post_request("/assets/new", {"name": name, "type": type_, "category": category}):
+            if send_post_request("/assets/new", {"name": name, "type": type_, "category_id": int(category_id) if category_id is not None else None}):
                 st.success("Ativo adicionado com sucesso.")
-                assets = fetch_data("/assets")
-                if assets:
-                    df_assets = pd.DataFrame(assets)
+                df_assets = fetch_frame("/assets")
+                if not df_assets.empty:
                     st.dataframe(df_assets)
             else:
                 st.error("Erro ao adicionar ativo.")
 
     indicators_placeholder = st.expander("📈 Indicadores")
-    indicators = fetch_data("/indicators")
-    if indicators:
+    if not df_indicators.empty:
         with indicators_placeholder:
             st.write("Indicadores Disponíveis")
-            df_indicators = pd.DataFrame(indicators)
             st.dataframe(df_indicators)
 
     with st.form("Novo Indicador"):
         name = st.text_input("Nome do Indicador")
         value = st.number_input("Valor", step=1.0)
-        asset_id = st.selectbox("Ativo Relacionado", options={asset["id"]: asset["name"] for asset in assets})
+        asset_names = dict(zip(df_assets.get("id", []), df_assets.get("name", [])))
+        asset_id = st.selectbox("Ativo Relacionado", options=list(asset_names), format_func=asset_names.get)
         if st.form_submit_button("Adicionar Indicador"):
-            if send_post_request("/indicators/new", {"name": name, "value": value, "asset_id": asset_id}):
+            if send_post_request("/indicators/new", {"name": name, "value": value, "asset_id": int(asset_id) if asset_id is not None else None}):
                 st.success("Indicador adicionado com sucesso.")
-                indicators = fetch_data("/indicators")
-                if indicators:
-                    df_indicators = pd.DataFrame(indicators)
+                df_indicators = fetch_frame("/indicators")
+                if not df_indicators.empty:
                     st.dataframe(df_indicators)
             else:
                 st.error("Erro ao adicionar indicador.")
 
-st.set_page_config(page_title="Sistema de Decisão", layout="wide")
-
 tabs = {
     "Página Principal": decision_page,
     "Gerenciar Dados": manage_page
 }
 
 selected_tab = st.sidebar.selectbox("Navegação", list(tabs.keys()))
+render_start = time.perf_counter()
 tabs[selected_tab]()
+st.sidebar.caption(f"Página renderizada em {(time.perf_counter() - render_start) * 1000:.0f} ms")
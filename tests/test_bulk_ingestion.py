@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from src.controllers.BulkIngestion import BulkReport, RecordParser, iter_async_chunks, iter_lines, keep_known, to_int
+
+FIELDS = ("name", "value", "asset_id")
+
+def parse(format, body, chunk_size=None):
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] if chunk_size else [body]
+    return list(RecordParser(format, FIELDS).iter_records(iter_lines(chunks)))
+
+def test_ndjson_records_and_errors_keep_their_line_numbers():
+    body = b'{"name": "P/L", "value": 1.5, "asset_id": 1}\n\nnot json\n[1, 2]\n{"name": "ROE"}\n'
+    records = parse("ndjson", body)
+    assert [(line, record) for line, record, _ in records] == [
+        (1, {"name": "P/L", "value": 1.5, "asset_id": 1}),
+        (3, None),
+        (4, None),
+        (5, {"name": "ROE"}),
+    ]
+    assert records[2][2] == "Expected a JSON object"
+
+def test_csv_header_maps_fields_and_ragged_rows_are_rejected():
+    records = parse("csv", b"name,value,asset_id\nP/L,1.5,1\nROE,2\n\nROA,3,2\n")
+    assert records == [
+        (2, {"name": "P/L", "value": "1.5", "asset_id": "1"}, None),
+        (3, None, "Expected 3 columns, got 2"),
+        (5, {"name": "ROA", "value": "3", "asset_id": "2"}, None),
+    ]
+
+def test_csv_quoted_field_may_span_lines_and_chunks():
+    # The body arrives in chunks that cut through the quoted field and a multibyte character.
+    body = 'name,value,asset_id\n"Margem\nlíquida",1.5,1\nROE,2,1\n'.encode()
+    records = parse("csv", body, chunk_size=7)
+    assert records == [
+        (2, {"name": "Margem\nlíquida", "value": "1.5", "asset_id": "1"}, None),
+        (4, {"name": "ROE", "value": "2", "asset_id": "1"}, None),
+    ]
+
+def test_csv_header_without_required_columns_is_reported():
+    records = parse("csv", b"name,value\nP/L,1\n")
+    assert records[0] == (1, None, "CSV header is missing columns: asset_id")
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        RecordParser("xml", FIELDS)
+
+@pytest.mark.parametrize("value, expected", [(3, 3), ("3", 3), (" 42 ", 42), (3.0, 3), ("3.0", 3), ("-7", -7)])
+def test_to_int_accepts_whole_numbers(value, expected):
+    assert to_int(value) == expected
+
+@pytest.mark.parametrize("value", [3.7, "3.7", "abc", True, None, float("nan")])
+def test_to_int_rejects_fractions_and_non_numbers(value):
+    with pytest.raises((ValueError, TypeError)):
+        to_int(value)
+
+def test_keep_known_rejects_unknown_keys():
+    report = BulkReport()
+    batch = [(1, ("P/L", 1.0, 1)), (2, ("ROE", 2.0, 9)), (3, ("ROA", 3.0, None))]
+    assert keep_known(batch, 2, {1}, report, "asset_id") == [batch[0], batch[2]]
+    assert report.to_dict() == {"inserted": 0, "rejected_count": 1, "rejected": [{"line": 2, "error": "asset_id 9 does not exist"}]}
+
+def test_iter_async_chunks_reads_a_stream_from_a_thread():
+    async def body():
+        for chunk in (b"a\n", b"b\nc", b"\n"):
+            yield chunk
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        return await asyncio.to_thread(lambda: list(iter_lines(iter_async_chunks(body(), loop))))
+
+    assert asyncio.run(main()) == ["a\n", "b\n", "c\n"]
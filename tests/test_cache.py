@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from src.infra.Cache import Cache
+
+@pytest.fixture
+def cache():
+    return Cache(max_entries=3, ttls={"asset": 60.0, "category": 60.0, "indicator": 60.0}, negative_ttl=60.0)
+
+def test_get_or_load_loads_once(cache):
+    calls = []
+    load = lambda: calls.append(1) or "PETR4"
+    assert cache.get_or_load(("asset", 1), load) == "PETR4"
+    assert cache.get_or_load(("asset", 1), load) == "PETR4"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+def test_not_found_is_cached_as_a_negative_entry(cache):
+    calls = []
+    cache.get_or_load(("asset", 1), lambda: calls.append(1))
+    assert cache.get_or_load(("asset", 1), lambda: calls.append(1)) is None
+    assert len(calls) == 1
+    assert cache.stats()["negative_hits"] == 1
+
+def test_loader_errors_are_not_cached(cache):
+    def fail():
+        raise RuntimeError("database down")
+    with pytest.raises(RuntimeError):
+        cache.get_or_load(("asset", 1), fail)
+    assert cache.get_or_load(("asset", 1), lambda: "PETR4") == "PETR4"
+
+def test_load_overlapping_an_invalidation_is_not_stored(cache):
+    # The row changed while it was being read, so the value read may be the old one.
+    def load():
+        cache.invalidate(("asset", 1))
+        return "old"
+    assert cache.get_or_load(("asset", 1), load) == "old"
+    assert cache.get_or_load(("asset", 1), lambda: "new") == "new"
+
+def test_invalidate_entity_drops_derived_lists(cache):
+    cache.set(("asset", 1), "PETR4")
+    cache.set(("assets_by_category", 7), ["PETR4"])
+    cache.set(("indicators_by_asset", 1), ["P/L"])
+    cache.invalidate_entity("assets", [1])
+    assert cache.stats()["entries"] == 0
+
+def test_invalidate_namespace_negative_only(cache):
+    cache.set(("asset", 1), "PETR4")
+    cache.set(("asset", 2), None)
+    cache.invalidate_namespace("asset", negative_only=True)
+    assert cache.get_or_load(("asset", 1), lambda: "reloaded") == "PETR4"
+    assert cache.get_or_load(("asset", 2), lambda: "VALE3") == "VALE3"
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for id in (1, 2, 3):
+        cache.set(("asset", id), id)
+    cache.get(("asset", 1))
+    cache.set(("asset", 4), 4)
+    assert cache.get_or_load(("asset", 2), lambda: "reloaded") == "reloaded"
+    assert cache.get_or_load(("asset", 1), lambda: "reloaded") == 1
+    assert cache.stats()["evictions"] >= 1
+
+def test_expired_entries_are_reloaded():
+    cache = Cache(ttls={"asset": 0.0001, "category": 60.0, "indicator": 60.0})
+    cache.set(("asset", 1), "old")
+    time.sleep(0.001)
+    assert cache.get_or_load(("asset", 1), lambda: "new") == "new"
+
+def test_get_many_or_load_fetches_only_missing_ids(cache):
+    cache.set(("asset", 1), "PETR4")
+    requested = []
+    def load(ids):
+        requested.extend(ids)
+        return {2: "VALE3"}
+    assert cache.get_many_or_load("asset", [1, 2, 3], load) == {1: "PETR4", 2: "VALE3", 3: None}
+    assert requested == [2, 3]
+
+def test_observe_versions_invalidates_on_a_newer_version(cache):
+    cache.observe_versions([("assets", 5, None)])
+    cache.set(("asset", 1), "PETR4")
+    cache.observe_versions([("assets", 5, None), ("indicator_history", 9, None)])
+    assert cache.get_or_load(("asset", 1), lambda: "reloaded") == "PETR4"
+    cache.observe_versions([("assets", 6, None)])
+    assert cache.get_or_load(("asset", 1), lambda: "reloaded") == "reloaded"
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.controllers import Downsampling
+from src.controllers.IndicatorHistoryController import bucket_width
+
+def series(n, start=0):
+    x = np.arange(start, start + n, dtype=np.int64) * 1_000_000
+    return x, np.sin(np.arange(n) / 5.0)
+
+def test_short_series_is_kept_whole():
+    x, y = series(10)
+    assert Downsampling.downsample_indices(np.zeros(10, dtype=np.int64), x, y, 20).tolist() == list(range(10))
+
+def test_each_series_keeps_at_most_threshold_points_with_its_ends():
+    x1, y1 = series(1000)
+    x2, y2 = series(300)
+    ids = np.concatenate((np.full(1000, 1), np.full(300, 2)))
+    kept = Downsampling.downsample_indices(ids, np.concatenate((x1, x2)), np.concatenate((y1, y2)), 50)
+    first, second = kept[kept < 1000], kept[kept >= 1000]
+    assert len(first) == 50 and len(second) == 50
+    assert first[0] == 0 and first[-1] == 999
+    assert second[0] == 1000 and second[-1] == 1299
+    assert (np.diff(kept) > 0).all()
+
+def test_lttb_keeps_a_spike():
+    x, y = series(1000)
+    y = np.zeros(1000)
+    y[537] = 100.0
+    assert 537 in Downsampling.downsample_indices(np.zeros(1000, dtype=np.int64), x, y, 20)
+
+def test_empty_input():
+    empty = np.empty(0, dtype=np.int64)
+    assert Downsampling.downsample_indices(empty, empty, np.empty(0), 10).tolist() == []
+
+def test_bucket_width_covers_the_inclusive_end():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(hours=10)
+    width = bucket_width(start, end, 10)
+    assert width > timedelta(hours=1)
+    # A point at end still falls in the last of the `points` buckets.
+    assert (end - start) // width == 9
+
+def test_bucket_width_is_never_zero():
+    moment = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert bucket_width(moment, moment, 500) == timedelta(microseconds=1)
@@ -0,0 +1,110 @@
+import csv
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.controllers import FileImporter as importer
+
+class MemoryImportRepository:
+    # Stands in for ImportRepository: one asset, an empty journal, and the batches kept in memory.
+    def __init__(self):
+        self.batches = []
+
+    def get_keys(self, table):
+        return [(1, "Asset A")]
+
+    def get_imported_batches(self, job):
+        return {}
+
+    def copy_batch(self, table, columns, data, job, first_row, row_count, defer_stats=False):
+        self.batches.append((first_row, row_count, list(csv.reader(io.StringIO(data.decode())))))
+        return True
+
+    def refresh_category_stats(self):
+        return True
+
+@pytest.fixture
+def repository(monkeypatch):
+    repository = MemoryImportRepository()
+    monkeypatch.setattr(importer, "ImportRepository", lambda: repository)
+    return repository
+
+def read(path, entity="indicators"):
+    # Reads a file the way FileImporter.run does, returning the batches as Python rows.
+    format = importer.FORMATS[path.suffix]
+    report = importer.BulkReport()
+    batches = list(importer.READERS[format](str(path), importer.input_columns(entity), report))
+    return pa.Table.from_batches(batches).to_pylist() if batches else [], report
+
+def test_csv_columns_are_read_as_text_and_unused_ones_dropped(tmp_path):
+    path = tmp_path / "indicators.csv"
+    path.write_text("name,value,asset,extra\nP/L,1.5,PETR4,x\nROE,abc,,y\n")
+    rows, report = read(path)
+    assert rows == [{"name": "P/L", "value": "1.5", "asset": "PETR4"}, {"name": "ROE", "value": "abc", "asset": None}]
+    assert report.rejected_count == 0
+
+def test_csv_without_any_known_column_is_rejected(tmp_path):
+    path = tmp_path / "indicators.csv"
+    path.write_text("a,b\n1,2\n")
+    with pytest.raises(ValueError):
+        read(path)
+
+def test_ndjson_values_that_do_not_fit_become_null(tmp_path):
+    path = tmp_path / "indicators.ndjson"
+    path.write_text('{"name": "P/L", "value": 1.5, "asset_id": 1}\n{"name": "ROE", "value": "high", "asset_id": 2.5}\nnot json\n')
+    rows, _ = read(path)
+    assert rows == [
+        {"name": "P/L", "value": 1.5, "asset_id": 1, "asset": None},
+        {"name": "ROE", "value": None, "asset_id": None, "asset": None},
+        {"name": None, "value": None, "asset_id": None, "asset": None},
+    ]
+
+def test_parquet_reads_the_present_columns(tmp_path):
+    path = tmp_path / "assets.parquet"
+    pq.write_table(pa.table({"name": ["PETR4"], "type": ["Ação"], "category": ["Energia"], "extra": [1]}), path)
+    rows, _ = read(path, "assets")
+    assert rows == [{"name": "PETR4", "type": "Ação", "category": "Energia"}]
+
+def batches(sizes):
+    start = 0
+    for size in sizes:
+        yield pa.record_batch({"n": list(range(start, start + size))})
+        start += size
+
+def test_rebatch_cuts_fixed_size_batches_numbered_from_the_file_start():
+    cut = [(first, table["n"].to_pylist()) for first, table in importer.rebatch(batches([3, 5, 1, 4]), 4)]
+    assert cut == [(0, [0, 1, 2, 3]), (4, [4, 5, 6, 7]), (8, [8, 9, 10, 11]), (12, [12])]
+
+def test_rebatch_from_a_start_row_cuts_the_same_later_batches():
+    cut = [(first, table["n"].to_pylist()) for first, table in importer.rebatch(batches([3, 5, 1, 4]), 4, start_row=5)]
+    assert cut == [(5, [5, 6, 7, 8]), (9, [9, 10, 11, 12])]
+    assert list(importer.rebatch(batches([3]), 4, start_row=3)) == []
+
+def test_prepare_resolves_names_and_rejects_invalid_rows(repository):
+    unit = importer.FileImporter("indicators")
+    unit.load_references()
+    raw = pa.table({
+        "name": ["P/L", "", "ROE", "ROA"],
+        "value": ["1.5", "2", "x", "4"],
+        "asset_id": [None, "1", "1", "9"],
+        "asset": ["Asset A", None, None, None],
+    })
+    report = importer.BulkReport()
+    table = unit.prepare(raw, 100, report)
+    assert table.to_pylist() == [{"name": "P/L", "value": 1.5, "asset_id": 1}]
+    assert report.rejected_count == 3
+    assert [rejection["line"] for rejection in report.rejected] == [102, 103, 104]
+
+def test_ragged_row_is_rejected_and_the_rest_imported(tmp_path, repository):
+    path = tmp_path / "indicators.csv"
+    path.write_text("name,value,asset_id\nroe,1.5,1\nbad,2\nroa,3,1\n")
+
+    report = importer.FileImporter("indicators").run(str(path), workers=1)
+
+    assert report["inserted"] == 2
+    assert report["rejected_count"] == 1
+    assert report["rejected"] == [{"line": 2, "error": "Expected 3 columns, got 2"}]
+    assert report["failed_batches"] == []
+    assert [rows for _, _, rows in repository.batches] == [[["roe", "1.5", "1"], ["roa", "3", "1"]]]
@@ -0,0 +1,14 @@
+import json
+
+import pytest
+
+from benchmarks.explain_indexes import check_plans, database_available, uncovered_methods
+
+def test_every_repository_method_is_checked():
+    # A method added to a repository must get an entry in SYNC_CALLS / ASYNC_CALLS.
+    assert uncovered_methods() == []
+
+@pytest.mark.skipif(not database_available(), reason="database not reachable")
+def test_repository_queries_use_indexes():
+    failures = [result for result in check_plans() if result["status"] != "ok"]
+    assert not failures, json.dumps(failures, indent=2)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from src.controllers import Ranking
+
+# Three assets and two criteria: the first is better when higher, the second when lower.
+VALUES = np.array([[10.0, 1.0], [5.0, 5.0], [1.0, 10.0]])
+BENEFIT = np.array([True, False])
+
+def test_weighted_sum_normalizes_each_column_and_weights():
+    scores = Ranking.score(VALUES, [1, 1], BENEFIT, "weighted_sum")
+    assert scores == pytest.approx([1.0, 0.5, 0.0])
+
+def test_weighted_sum_follows_the_weights():
+    # With all the weight on the first criterion, only its min-max position counts.
+    scores = Ranking.score(VALUES, [3, 0], BENEFIT, "weighted_sum")
+    assert scores == pytest.approx([1.0, 4 / 9, 0.0])
+
+def test_weighted_sum_constant_column_adds_nothing():
+    values = np.array([[1.0, 7.0], [2.0, 7.0]])
+    scores = Ranking.score(values, [1, 1], np.array([True, False]), "weighted_sum")
+    assert scores == pytest.approx([0.0, 0.5])
+
+def test_topsis_scores_ideal_and_anti_ideal_assets():
+    scores = Ranking.score(VALUES, [1, 1], BENEFIT, "topsis")
+    assert scores[0] == pytest.approx(1.0)
+    assert scores[2] == pytest.approx(0.0)
+    assert 0.0 < scores[1] < 1.0
+
+def test_topsis_matches_the_textbook_steps():
+    values = np.array([[250.0, 16.0], [200.0, 16.0], [300.0, 32.0]])
+    weights = np.array([0.5, 0.5])
+    benefit = np.array([False, True])
+    weighted = values / np.sqrt((values ** 2).sum(axis=0)) * weights
+    ideal = np.array([weighted[:, 0].min(), weighted[:, 1].max()])
+    anti_ideal = np.array([weighted[:, 0].max(), weighted[:, 1].min()])
+    to_ideal = np.linalg.norm(weighted - ideal, axis=1)
+    to_anti_ideal = np.linalg.norm(weighted - anti_ideal, axis=1)
+    assert Ranking.score(values, [1, 1], benefit, "topsis") == pytest.approx(to_anti_ideal / (to_ideal + to_anti_ideal))
+
+def test_weights_without_a_positive_one_are_rejected():
+    with pytest.raises(ValueError):
+        Ranking.score(VALUES, [0, 0], BENEFIT, "topsis")
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        Ranking.score(VALUES, [1, 1], BENEFIT, "electre")
+
+def test_top_k_orders_the_best_scores():
+    scores = np.array([0.2, 0.9, 0.5, 0.8, 0.1])
+    assert Ranking.top_k(scores, 3).tolist() == [1, 3, 2]
+    assert Ranking.top_k(scores, 10).tolist() == [1, 3, 2, 0, 4]
+    assert Ranking.top_k(scores, 0).tolist() == []
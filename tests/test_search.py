@@ -0,0 +1,40 @@
+from src.infra.Search import RANK_CANDIDATES, escape_like, search_queries, word_query
+
+def test_escape_like_escapes_wildcards_and_the_escape_character():
+    assert escape_like("100%_a\\b") == "100\\%\\_a\\\\b"
+    assert escape_like("PETR4") == "PETR4"
+
+def test_word_query_matches_a_prefix_of_every_word():
+    assert word_query("margem líquida") == "margem:* & líquida:*"
+    # Punctuation cannot reach to_tsquery, where it would be operator syntax.
+    assert word_query("P/L & (ROE)!") == "P:* & L:* & ROE:*"
+    assert word_query("  !? ") == ""
+
+def test_search_runs_prefix_word_and_substring_tiers():
+    queries = search_queries("assets", "id, name", "  petr 4 ")
+    assert len(queries) == 3
+    (prefix, prefix_params), (words, words_params), (substring, substring_params) = queries
+    assert "LIKE search_key(%s)" in prefix and "ORDER BY search_key(name)" in prefix
+    assert prefix_params == ("petr 4%",)
+    assert "ts_rank" in words and f"LIMIT {RANK_CANDIDATES}" in words
+    assert words_params == ("petr:* & 4:*",)
+    assert "strpos" in substring
+    assert substring_params == ("petr 4", "%petr 4%")
+    # Every query ends with the IDs already found and the remaining limit.
+    assert all(query.count("%s") == len(params) + 2 for query, params in queries)
+
+def test_typeahead_and_missing_trigram_index_skip_the_substring_tier():
+    assert len(search_queries("assets", "id, name", "petr", typeahead=True)) == 2
+    assert len(search_queries("assets", "id, name", "petr", substring=False)) == 2
+
+def test_wildcards_in_the_text_are_matched_literally():
+    (prefix, params), *_ = search_queries("indicators", "id, name", "10%_")
+    assert params == ("10\\%\\_%",)
+
+def test_text_without_words_skips_the_word_tier():
+    queries = search_queries("assets", "id, name", "%%")
+    assert len(queries) == 2
+    assert all("ts_rank" not in query for query, _ in queries)
+
+def test_blank_text_runs_nothing():
+    assert search_queries("assets", "id, name", "   ") == []
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, timezone
+
+from src.infra.TableVersions import build_validators, is_not_modified
+
+MODIFIED = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+VERSIONS = [("assets", 12, MODIFIED), ("indicators", 40, MODIFIED + timedelta(seconds=5))]
+
+def test_validators_combine_the_table_versions_and_variant():
+    validators = build_validators(VERSIONS, "arrow")
+    assert validators["ETag"] == 'W/"assets.12-indicators.40;arrow"'
+    assert validators["Last-Modified"] == "Wed, 01 May 2024 12:30:05 GMT"
+    assert validators["Cache-Control"] == "no-cache"
+    assert validators["Vary"] == "Accept"
+
+def test_variants_and_versions_give_different_etags():
+    json = build_validators(VERSIONS, "json")["ETag"]
+    assert json != build_validators(VERSIONS, "arrow")["ETag"]
+    assert json != build_validators([("assets", 13, MODIFIED), VERSIONS[1]], "json")["ETag"]
+
+def test_if_none_match_uses_weak_comparison():
+    validators = build_validators(VERSIONS, "json")
+    etag = validators["ETag"]
+    assert is_not_modified({"if-none-match": etag}, validators)
+    assert is_not_modified({"if-none-match": etag.removeprefix("W/")}, validators)
+    assert is_not_modified({"if-none-match": f'"other", {etag}'}, validators)
+    assert is_not_modified({"if-none-match": "*"}, validators)
+    assert not is_not_modified({"if-none-match": 'W/"assets.11-indicators.40;json"'}, validators)
+
+def test_if_modified_since_alone_is_not_honoured():
+    validators = build_validators(VERSIONS, "json")
+    assert not is_not_modified({"if-modified-since": validators["Last-Modified"]}, validators)
+    assert not is_not_modified({}, validators)
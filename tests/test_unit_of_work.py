@@ -0,0 +1,74 @@
+import pytest
+
+from src.data_acess.UnitOfWork import Ref, build_operation, changed_entities, group_runs, locked_tables
+
+def build(operations):
+    return [build_operation(kind, entity, id, values, position) for position, (kind, entity, id, values) in enumerate(operations)]
+
+def test_insert_update_and_delete_operations():
+    assert build_operation("insert", "assets", None, {"name": "PETR4", "type": "Ação"}, 0) == ("insert", "assets", ("name", "type"), ["PETR4", "Ação"], None)
+    # Fields left as None keep their value, so they are not part of the update.
+    assert build_operation("update", "indicators", 7, {"value": 2.5, "name": None}, 0) == ("update", "indicators", ("value",), [2.5, 7], 7)
+    assert build_operation("delete", "categories", 3, {}, 0) == ("delete", "categories", (), [3], 3)
+
+@pytest.mark.parametrize("kind, entity, id, values", [
+    ("insert", "users", None, {"name": "x"}),
+    ("insert", "assets", None, {"price": 1}),
+    ("insert", "assets", None, {}),
+    ("update", "assets", None, {"name": "x"}),
+    ("merge", "assets", 1, {}),
+])
+def test_invalid_operations_are_rejected(kind, entity, id, values):
+    with pytest.raises(ValueError):
+        build_operation(kind, entity, id, values, 0)
+
+def test_references_must_point_to_an_earlier_operation():
+    build_operation("insert", "indicators", None, {"name": "P/L", "asset_id": Ref(0)}, 1)
+    with pytest.raises(ValueError):
+        build_operation("insert", "indicators", None, {"name": "P/L", "asset_id": Ref(1)}, 1)
+    with pytest.raises(ValueError):
+        build_operation("delete", "assets", Ref(3), {}, 2)
+
+def test_consecutive_operations_of_the_same_shape_share_a_run():
+    operations = build([
+        ("insert", "assets", None, {"name": "PETR4", "type": "Ação"}),
+        ("insert", "assets", None, {"name": "VALE3", "type": "Ação"}),
+        ("insert", "indicators", None, {"name": "P/L", "value": 1, "asset_id": Ref(0)}),
+        ("insert", "indicators", None, {"name": "P/L", "value": 2, "asset_id": Ref(1)}),
+        ("update", "assets", 5, {"type": "FII"}),
+        ("update", "assets", 6, {"type": "FII"}),
+        ("update", "assets", 7, {"name": "X"}),
+    ])
+    assert group_runs(operations) == [
+        (("insert", "assets", ("name", "type")), [0, 1]),
+        (("insert", "indicators", ("name", "value", "asset_id")), [2, 3]),
+        (("update", "assets", ("type",)), [4, 5]),
+        (("update", "assets", ("name",)), [6]),
+    ]
+
+def test_reference_into_the_current_run_starts_a_new_one():
+    # Operation 1 needs the ID inserted by operation 0, which is only known once that run executes.
+    operations = build([
+        ("insert", "assets", None, {"name": "PETR4", "category_id": 1}),
+        ("update", "assets", Ref(0), {"name": "PETR3"}),
+        ("update", "assets", 9, {"name": "VALE3"}),
+    ])
+    assert [indices for _, indices in group_runs(operations)] == [[0], [1, 2]]
+    operations = build([
+        ("update", "assets", 9, {"name": "VALE3"}),
+        ("update", "assets", Ref(0), {"name": "VALE5"}),
+    ])
+    assert [indices for _, indices in group_runs(operations)] == [[0], [1]]
+
+def test_changed_entities_follow_deletes_through_cascades():
+    operations = build([
+        ("update", "indicators", 1, {"value": 2}),
+        ("update", "assets", 2, {"name": None}),
+        ("delete", "categories", 3, {}),
+    ])
+    assert changed_entities(operations, [1, 2, 3]) == {"indicators": {1}, "categories": {3}, "assets": None}
+
+def test_locked_tables_cover_cascades_and_shared_statistics_locks():
+    assert locked_tables(build([("update", "categories", 1, {"name": "x"})])) == ["categories"]
+    assert locked_tables(build([("insert", "indicators", None, {"name": "P/L"})])) == ["assets", "indicators"]
+    assert locked_tables(build([("delete", "categories", 1, {})])) == ["assets", "categories", "indicators"]